@@ -0,0 +1,54 @@
+# coding: utf-8
+
+# ancestors.py -- build time, size and query latency of the precomputed
+# ancestor index (programming/wordnet/ancestors.py) against SAP on the
+# WordNet hypernym graph.
+#
+#   python -m bench.ancestors -H data/hypernyms.txt -q 20000
+
+import os
+import random
+import tempfile
+from argparse import ArgumentParser
+
+from bench.util import timed, best_of, report
+from bench.sap import random_pairs, sibling_pairs, set_pairs, run
+from programming.wordnet.ancestors import AncestorIndex
+from programming.wordnet.sap import SAP
+from programming.wordnet.wdgraph import hypernym_graph
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='ancestor index benchmark')
+    parser.add_argument('-H', '--hypernyms', default='data/hypernyms.txt')
+    parser.add_argument('-q', '--queries', type=int, default=20000)
+    parser.add_argument('-r', '--repeat', type=int, default=3)
+    args = vars(parser.parse_args())
+
+    graph = hypernym_graph(args['hypernyms'])
+    index, secs = timed(AncestorIndex.build, graph)
+    print("== V=%d, %d closure entries (%.1f per synset)"
+          % (graph.V, len(index.targets),
+             len(index.targets) / float(graph.V)))
+    report("build", secs, index.nbytes())
+    fd, fname = tempfile.mkstemp(suffix='.anc')
+    os.close(fd)
+    try:
+        _, secs = timed(index.save, fname)
+        report("save", secs, os.path.getsize(fname), "(file size)")
+        index, secs = best_of(args['repeat'], AncestorIndex.load, fname)
+        report("load", secs)
+    finally:
+        os.remove(fname)
+
+    n, rnd = args['queries'], random.Random(0)
+    sap = SAP(graph)
+    for name, pairs in [('random', random_pairs(graph, n, rnd)),
+                        ('sibling', sibling_pairs(graph, n, rnd)),
+                        ('sets', set_pairs(graph, n, rnd))]:
+        print("== %s pairs, %d queries" % (name, n))
+        expected, secs = best_of(args['repeat'], run, sap, pairs)
+        report("SAP", secs, extra="%.1fus/query" % (secs / n * 1e6))
+        lengths, secs = best_of(args['repeat'], run, index, pairs)
+        report("index", secs, extra="%.1fus/query" % (secs / n * 1e6))
+        assert lengths == expected
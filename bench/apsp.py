@@ -0,0 +1,59 @@
+# coding: utf-8
+
+# apsp.py -- distance matrices: many_to_many on one process and on a pool
+# for a random sparse digraph, then all pairs of a small dense digraph by
+# Floyd-Warshall (numpy and pure Python) and by many_to_many.
+#
+#   python -m bench.apsp -V 20000 -E 100000 -S 200 -T 200 -p 4 -d 150
+
+from argparse import ArgumentParser
+from multiprocessing import cpu_count
+
+from bench.util import random_edges, report, timed
+from src import apsp
+from src.apsp import many_to_many, floyd_warshall
+from src.weighted_digraph import WeightedDigraph
+
+
+def dense(V, density, seed=0):
+    tails, heads, weights = random_edges(V, int(density * V * V), seed,
+                                         weights=True)
+    return WeightedDigraph.from_edges(V, tails, heads, weights)
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='distance matrix benchmark')
+    parser.add_argument('-V', type=int, default=10000)
+    parser.add_argument('-E', type=int, default=50000)
+    parser.add_argument('-S', '--sources', type=int, default=100)
+    parser.add_argument('-T', '--targets', type=int, default=100)
+    parser.add_argument('-p', '--processes', type=int, default=cpu_count())
+    parser.add_argument('-d', '--dense-V', type=int, default=100)
+    args = vars(parser.parse_args())
+
+    V, E = args['V'], args['E']
+    tails, heads, weights = random_edges(V, E, weights=True)
+    graph = WeightedDigraph.from_edges(V, tails, heads, weights)
+    sources = range(0, V, V // args['sources'])[:args['sources']]
+    targets = range(1, V, V // args['targets'])[:args['targets']]
+    print("== many to many V=%d E=%d, %dx%d" % (V, E, len(sources),
+                                               len(targets)))
+    for processes in sorted(set([1, args['processes']])):
+        _, secs = timed(many_to_many, graph, sources, targets,
+                        processes=processes)
+        report("%d process(es)" % processes, secs)
+
+    V = args['dense_V']
+    graph = dense(V, 0.5)
+    print("== all pairs V=%d E=%d" % (V, graph.E))
+    if apsp.numpy is not None:
+        _, secs = timed(floyd_warshall, graph)
+        report("floyd-warshall numpy", secs)
+    numpy, apsp.numpy = apsp.numpy, None
+    try:
+        _, secs = timed(floyd_warshall, graph)
+        report("floyd-warshall python", secs)
+    finally:
+        apsp.numpy = numpy
+    _, secs = timed(many_to_many, graph, graph.vertices(), processes=1)
+    report("many_to_many, 1 process", secs)
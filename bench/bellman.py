@@ -0,0 +1,117 @@
+# coding: utf-8
+
+# bellman.py -- queue-based Bellman-Ford (plain, SLF, LLL, both) against
+# the list-queue version with a WeightedDirectedCycle rebuild every V
+# edges it replaced, on tinyEWDnc.txt-style inputs and on large random
+# graphs with negative weights: one free of negative cycles (the weights
+# are shifted by random vertex potentials) and the same graph with a
+# negative cycle planted far from the source.
+#
+#   python -m bench.bellman -V 100000 -E 500000
+
+import random
+from argparse import ArgumentParser
+from itertools import product
+
+from bench.util import best_of, random_edges, report
+from src.sp import SP, BellmanFord
+from src.weighted_digraph import WeightedDigraph, WeightedDirectedCycle
+
+
+class ListBellmanFord(SP):
+    "the former BellmanFord, kept here for reference"
+    def __init__(self, graph, source):
+        super(ListBellmanFord, self).__init__(graph, source)
+        self._on_queue = bytearray(graph.V)
+        self._q = [source]
+        self._on_queue[source] = True
+        self._cost = 0
+        self._cycle = []
+        while len(self._q) != 0 and not self.has_negative_cycle():
+            v = self._q.pop()
+            self._on_queue[v] = False
+            self.relax(graph, v)
+
+    def has_negative_cycle(self):
+        return bool(self._cycle)
+
+    def negative_cycle(self):
+        return self._cycle
+
+    def relax(self, graph, v):
+        for e in graph.adj(v):
+            w = e.target()
+            if self.dist_to(w) > self.dist_to(v) + e.weight:
+                self._dist_to[w] = self.dist_to(v) + e.weight
+                self._edge_to[w] = e
+                if not self._on_queue[w]:
+                    self._on_queue[w] = True
+                    self._q = [w] + self._q
+            self._find_negative_cycle(graph)
+            if self.has_negative_cycle():
+                return
+
+    def _find_negative_cycle(self, graph):
+        self._cost += 1
+        if self._cost % graph.V == 0:
+            wdg = WeightedDigraph(graph.V)
+            for v in graph.vertices():
+                if self._edge_to[v]:
+                    e = self._edge_to[v]
+                    wdg.add_edge(e.origin(), e.target(), e.weight)
+            self._cycle = WeightedDirectedCycle(wdg).cycle()
+
+
+def potential_graph(V, E, seed=0):
+    """
+    Random digraph with weights uniform(0, 1) + p[v] - p[w] for random
+    potentials p: many negative edges, no negative cycle.
+    """
+    tails, heads, weights = random_edges(V, E, seed, weights=True)
+    rnd = random.Random(seed + 1)
+    p = [rnd.uniform(0.0, 2.0) for _ in range(V)]
+    for i in range(E):
+        weights[i] += p[tails[i]] - p[heads[i]]
+    return WeightedDigraph.from_edges(V, tails, heads, weights)
+
+
+def plant_cycle(graph, length, seed=0):
+    "adds a negative cycle through `length` random vertices"
+    rnd = random.Random(seed)
+    ring = rnd.sample(range(1, graph.V), length)
+    for v, w in zip(ring, ring[1:] + ring[:1]):
+        graph.add_edge(v, w, -1.0)
+    return graph
+
+
+def compare(name, graph, repeat, reference):
+    print("== %s V=%d E=%d" % (name, graph.V, graph.E))
+    runs = [('list queue', ListBellmanFord, {})] if reference else []
+    for slf, lll in product((False, True), repeat=2):
+        label = "+".join(h for h, on in (('slf', slf), ('lll', lll)) if on)
+        runs.append((label or 'deque', BellmanFord,
+                     {'slf': slf, 'lll': lll}))
+    for label, cls, kwargs in runs:
+        sp, secs = best_of(repeat, cls, graph, 0, **kwargs)
+        cycle = sp.negative_cycle()
+        report(label, secs, extra="negative cycle of %d edges" % len(cycle)
+               if cycle else "")
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Bellman-Ford benchmark')
+    parser.add_argument('-f', '--fname', default='data/tinyEWDnc.txt')
+    parser.add_argument('-V', type=int, default=20000)
+    parser.add_argument('-E', type=int, default=100000)
+    parser.add_argument('-r', '--repeat', type=int, default=3)
+    parser.add_argument('-R', '--reference-V', type=int, default=5000,
+                        help='largest V the list-queue version is run on')
+    args = vars(parser.parse_args())
+
+    V, E = args['V'], args['E']
+    reference = V <= args['reference_V']
+    compare(args['fname'], WeightedDigraph.from_file(args['fname']),
+            args['repeat'], True)
+    compare("potentials", potential_graph(V, E), args['repeat'], reference)
+    compare("potentials + cycle", plant_cycle(potential_graph(V, E), 10),
+            args['repeat'], reference)
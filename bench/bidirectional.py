@@ -0,0 +1,66 @@
+# coding: utf-8
+
+# bidirectional.py -- point-to-point queries answered by the early-exit
+# shortest_path and by BidirectionalDijkstraSP, both on reused
+# workspaces: mean settled vertices and latency per query, on a file
+# like mediumEWD.txt and on the grid of bench.p2p.
+#
+#   python -m bench.bidirectional -f data/mediumEWD.txt -n 200 -q 200
+
+import random
+from argparse import ArgumentParser
+
+from bench.p2p import grid
+from bench.util import timed, report
+from src.sp import BidirectionalDijkstraSP, SPWorkspace
+from src.weighted_digraph import WeightedDigraph
+
+
+def unidirectional(graph, queries):
+    workspace = SPWorkspace(graph)
+    dists, settled = [], 0
+    for s, t in queries:
+        dists.append(workspace.search(s, t))
+        settled += workspace.settled
+    return dists, settled
+
+
+def bidirectional(graph, queries):
+    workspaces = BidirectionalDijkstraSP.workspaces(graph)
+    dists, settled = [], 0
+    for s, t in queries:
+        sp = BidirectionalDijkstraSP(graph, s, t, workspaces)
+        dists.append(sp.dist_to(t))
+        settled += sp.settled
+    return dists, settled
+
+
+def compare(name, graph, Q):
+    rnd = random.Random(1)
+    queries = [(rnd.randrange(graph.V), rnd.randrange(graph.V))
+               for _ in range(Q)]
+    graph.reverse()                     # built once, outside the timings
+    print("== %s V=%d E=%d, %d queries" % (name, graph.V, graph.E, Q))
+    expected = None
+    for label, f in [('dijkstra', unidirectional),
+                     ('bidirectional', bidirectional)]:
+        (dists, settled), secs = timed(f, graph, queries)
+        report(label, secs, extra="%.2fms/query, %.0f settled/query" %
+               (secs / Q * 1e3, settled / float(Q)))
+        if expected is not None:
+            assert all(abs(a - b) < 1e-6 for a, b in zip(dists, expected))
+        expected = dists
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='bidirectional Dijkstra')
+    parser.add_argument('-f', '--fname', default='data/mediumEWD.txt')
+    parser.add_argument('-n', type=int, default=150, help='grid side')
+    parser.add_argument('-q', '--queries', type=int, default=100)
+    args = vars(parser.parse_args())
+
+    compare(args['fname'], WeightedDigraph.from_file(args['fname']),
+            args['queries'])
+    if args['n']:
+        compare("grid %dx%d" % (args['n'], args['n']), grid(args['n']),
+                args['queries'])
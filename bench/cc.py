@@ -0,0 +1,39 @@
+# coding: utf-8
+
+# cc.py -- connected components of a random undirected edge list: DFS on
+# the built graph against the union-find modes of src/cc.py, single
+# process and partitioned over a process pool.
+#
+#   python -m bench.cc -V 1000000 -E 10000000 -p 1 2 4 8
+
+from argparse import ArgumentParser
+from multiprocessing import cpu_count
+
+from bench.util import timed, random_edges, report
+from src.cc import ConnectedComponents, UnionFindCC, ParallelCC
+from src.csr import CSRGraph
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='connected components benchmark')
+    parser.add_argument('-V', type=int, default=500000)
+    parser.add_argument('-E', type=int, default=2000000)
+    parser.add_argument('-p', '--processes', type=int, nargs='+',
+                        default=[1, 2, 4])
+    args = vars(parser.parse_args())
+
+    V, E = args['V'], args['E']
+    tails, heads, _ = random_edges(V, E)
+    print("== V=%d E=%d, %d CPUs" % (V, E, cpu_count()))
+    graph, secs = timed(CSRGraph.from_edges, V, tails, heads)
+    report("build csr graph", secs)
+    reference, secs = timed(ConnectedComponents, graph)
+    report("dfs", secs, extra="%d components" % reference.count())
+    del graph
+    cc, secs = timed(UnionFindCC.from_edges, V, tails, heads)
+    report("union-find", secs)
+    assert cc.ids == reference.ids
+    for n in args['processes']:
+        cc, secs = timed(ParallelCC.from_edges, V, tails, heads, n)
+        report("parallel union-find, %d procs" % n, secs)
+        assert cc.ids == reference.ids and cc.size == reference.size
@@ -0,0 +1,74 @@
+# coding: utf-8
+
+# ch.py -- contraction hierarchies: preprocessing time and size, then the
+# latency of random point-to-point queries against the early-exit and
+# bidirectional Dijkstra of src/sp.py, on a file like mediumEWD.txt and
+# on the grid of bench.p2p.
+#
+#   python -m bench.ch -f data/mediumEWD.txt -n 60 -q 500
+
+import os
+import random
+import tempfile
+from argparse import ArgumentParser
+
+from bench.p2p import grid
+from bench.util import timed, report
+from src.ch import ContractionHierarchy, CHQuery
+from src.sp import BidirectionalDijkstraSP, SPWorkspace
+from src.weighted_digraph import WeightedDigraph
+
+
+def queries_of(query, pairs):
+    return [query(s, t) for s, t in pairs]
+
+
+def compare(name, graph, Q):
+    print("== %s V=%d E=%d, %d queries" % (name, graph.V, graph.E, Q))
+    hierarchy, secs = timed(ContractionHierarchy.build, graph)
+    report("preprocessing", secs, hierarchy.nbytes(),
+           "%d shortcuts" % (len(hierarchy.up) + len(hierarchy.down) -
+                             graph.E))
+    fd, fname = tempfile.mkstemp()
+    os.close(fd)
+    try:
+        _, secs = timed(hierarchy.save, fname)
+        report("save", secs)
+        _, secs = timed(ContractionHierarchy.load, fname)
+        report("load", secs)
+    finally:
+        os.remove(fname)
+
+    rnd = random.Random(1)
+    pairs = [(rnd.randrange(graph.V), rnd.randrange(graph.V))
+             for _ in range(Q)]
+    workspace = SPWorkspace(graph)
+    workspaces = BidirectionalDijkstraSP.workspaces(graph)
+    ch = CHQuery(hierarchy)
+    expected = None
+    for label, query in [
+            ('dijkstra', workspace.search),
+            ('bidirectional', lambda s, t: BidirectionalDijkstraSP(
+                graph, s, t, workspaces).dist_to(t)),
+            ('ch distance', ch.distance),
+            ('ch path', lambda s, t: ch.shortest_path(s, t)[0])]:
+        dists, secs = timed(queries_of, query, pairs)
+        report(label, secs, extra="%.3fms/query" % (secs / Q * 1e3))
+        if expected is not None:
+            assert all(abs(a - b) < 1e-9 * max(1.0, b)
+                       for a, b in zip(dists, expected) if b != float('inf'))
+        expected = dists
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='contraction hierarchies')
+    parser.add_argument('-f', '--fname', default='data/mediumEWD.txt')
+    parser.add_argument('-n', type=int, default=40, help='grid side')
+    parser.add_argument('-q', '--queries', type=int, default=200)
+    args = vars(parser.parse_args())
+
+    compare(args['fname'], WeightedDigraph.from_file(args['fname']),
+            args['queries'])
+    if args['n']:
+        compare("grid %dx%d" % (args['n'], args['n']), grid(args['n']),
+                args['queries'])
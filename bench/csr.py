@@ -0,0 +1,66 @@
+# coding: utf-8
+
+# csr.py -- memory and traversal throughput of the list-of-lists graphs
+# against their frozen CSR counterparts (src/csr.py).
+#
+#   python -m bench.csr -f data/mediumEWD.txt
+#   python -m bench.csr -V 1000000 -E 10000000
+
+from argparse import ArgumentParser
+
+from bench.util import timed, best_of, sizeof, random_edges, populate, report
+from src.bfs import BreadthFirstSearch
+from src.sp import DijkstraSP
+from src.weighted_digraph import WeightedDigraph
+from src.digraph import Digraph
+from src.csr import CSRDigraph
+
+
+def scan(graph):
+    "touches every adjacency entry once"
+    n = 0
+    for v in range(graph.V):
+        for _ in graph.adj(v):
+            n += 1
+    return n
+
+
+def bench_file(fname, repeat):
+    print("== %s" % fname)
+    graph, secs = timed(WeightedDigraph.from_file, fname)
+    report("lists: load", secs, sizeof(graph))
+    csr, secs = timed(WeightedDigraph.from_file, fname, True)
+    report("csr: load", secs, sizeof(csr))
+    for name, g in [("lists", graph), ("csr", csr)]:
+        _, secs = best_of(repeat, scan, g)
+        report(name + ": scan", secs)
+        _, secs = best_of(repeat, DijkstraSP, g, 0)
+        report(name + ": dijkstra", secs)
+
+
+def bench_synthetic(V, E, repeat):
+    print("== random digraph V=%d E=%d" % (V, E))
+    tails, heads, _ = random_edges(V, E)
+    graph, secs = timed(populate, Digraph(V), tails, heads)
+    report("lists: build", secs, sizeof(graph))
+    csr, secs = timed(CSRDigraph.from_edges, V, tails, heads)
+    report("csr: build", secs, sizeof(csr))
+    for name, g in [("lists", graph), ("csr", csr)]:
+        _, secs = best_of(repeat, scan, g)
+        report(name + ": scan", secs, extra="%.0f edges/s" % (E / secs))
+        _, secs = best_of(repeat, BreadthFirstSearch, g, 0)
+        report(name + ": bfs", secs, extra="%.0f edges/s" % (E / secs))
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='CSR benchmark')
+    parser.add_argument('-f', '--fname')
+    parser.add_argument('-V', type=int, default=1000000)
+    parser.add_argument('-E', type=int, default=10000000)
+    parser.add_argument('-r', '--repeat', type=int, default=3)
+    args = vars(parser.parse_args())
+
+    if args['fname']:
+        bench_file(args['fname'], args['repeat'])
+    else:
+        bench_synthetic(args['V'], args['E'], args['repeat'])
@@ -0,0 +1,76 @@
+# coding: utf-8
+
+# dfs.py -- the explicit-stack DFS engine (src.dfs.depth_first) against
+# the recursive formulation it replaced.
+#
+#   python -m bench.dfs -V 10000000         # path graph, iterative only
+#   python -m bench.dfs -V 100000 -E 1000000 -R 50000
+
+import sys
+from argparse import ArgumentParser
+
+from bench.util import timed, best_of, path_edges, random_edges, report
+from src.csr import CSRDigraph
+from src.dfs import DepthFirstOrder
+
+
+class RecursiveDepthFirstOrder(object):
+    "the recursive DepthFirstOrder, kept here for reference"
+    def __init__(self, graph):
+        self._marked = set()
+        self.pre, self.post = [None] * graph.V, [None] * graph.V
+        self.preorder, self.postorder = [], []
+        for v in graph.vertices():
+            if v not in self._marked:
+                self.dfs(graph, v)
+
+    def dfs(self, graph, v):
+        self._marked.add(v)
+        self.pre[v] = len(self.preorder)
+        self.preorder.append(v)
+        for w in graph.adj(v):
+            if w not in self._marked:
+                self.dfs(graph, w)
+        self.post[v] = len(self.postorder)
+        self.postorder.append(v)
+
+
+def recursive(graph):
+    "runs the recursive version with a recursion limit deep enough for graph"
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(limit, graph.V + 100))
+    try:
+        return RecursiveDepthFirstOrder(graph)
+    finally:
+        sys.setrecursionlimit(limit)
+
+
+def compare(name, graph, repeat, with_recursive):
+    print("== %s V=%d E=%d" % (name, graph.V, graph.E))
+    iterative, secs = best_of(repeat, DepthFirstOrder, graph)
+    report("iterative", secs, extra="%.0f vertices/s" % (graph.V / secs))
+    if with_recursive:
+        reference, secs = best_of(repeat, recursive, graph)
+        report("recursive", secs, extra="%.0f vertices/s" % (graph.V / secs))
+        assert reference.postorder == iterative.postorder
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='DFS benchmark')
+    parser.add_argument('-V', type=int, default=10000000)
+    parser.add_argument('-E', type=int, default=0,
+                        help='edges of an extra random digraph over V')
+    parser.add_argument('-R', '--recursive-max', type=int, default=20000,
+                        help='largest path the recursive version is run on')
+    parser.add_argument('-r', '--repeat', type=int, default=1)
+    args = vars(parser.parse_args())
+
+    V, limit = args['V'], args['recursive_max']
+    for n in sorted(set([min(V, limit), V])):
+        path, secs = timed(CSRDigraph.from_edges, n, *path_edges(n))
+        compare("path", path, args['repeat'], n <= limit)
+        del path
+    if args['E']:
+        tails, heads, _ = random_edges(V, args['E'])
+        graph = CSRDigraph.from_edges(V, tails, heads)
+        compare("random", graph, args['repeat'], V <= limit)
@@ -0,0 +1,64 @@
+# coding: utf-8
+
+# engines.py -- the single-source engines of src/sp.py on synthetic
+# integer-weight digraphs (small and large weight ranges) and on real
+# weights: DijkstraSP, Dial, radix heap and delta-stepping, plus the one
+# engine_for picks.
+#
+#   python -m bench.engines -V 200000 -E 1000000
+
+import random
+from argparse import ArgumentParser
+
+from bench.util import best_of, random_edges, report
+from src.sp import DijkstraSP, DialSP, RadixHeapSP, DeltaSteppingSP
+from src.sp import engine_for, weight_stats
+from src.weighted_digraph import WeightedDigraph
+
+ENGINES = [('dijkstra', DijkstraSP), ('dial', DialSP),
+           ('radix heap', RadixHeapSP), ('delta-stepping', DeltaSteppingSP)]
+
+
+def integer_graph(V, E, C, seed=0):
+    "random digraph with integer weights uniform in 0..C"
+    tails, heads, _ = random_edges(V, E, seed)
+    rnd = random.Random(seed)
+    weights = [float(rnd.randint(0, C)) for _ in range(E)]
+    return WeightedDigraph.from_edges(V, tails, heads, weights)
+
+
+def compare(name, graph, repeat):
+    stats = weight_stats(graph)
+    print("== %s V=%d E=%d weights %g..%g%s" % (
+        name, graph.V, graph.E, stats[0], stats[1],
+        " integral" if stats[2] else ""))
+    expected = None
+    for label, engine in ENGINES:
+        try:
+            sp, secs = best_of(repeat, engine, graph, 0)
+        except ValueError:
+            continue            # integer engines on real weights
+        report(label, secs)
+        dists = [sp.dist_to(v) for v in graph.vertices()]
+        if expected is not None:
+            assert all(abs(a - b) < 1e-6 for a, b in zip(dists, expected)
+                       if b != float('inf'))
+        expected = dists
+    print("engine_for picks %s" % engine_for(graph, stats).__name__)
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='single-source engines')
+    parser.add_argument('-V', type=int, default=50000)
+    parser.add_argument('-E', type=int, default=250000)
+    parser.add_argument('-r', '--repeat', type=int, default=1)
+    args = vars(parser.parse_args())
+
+    V, E = args['V'], args['E']
+    for C in (10, 1000, 1000000):
+        compare("weights 0..%d" % C, integer_graph(V, E, C), args['repeat'])
+    tails, heads, weights = random_edges(V, E, weights=True, low=1.0,
+                                         high=10.0)
+    compare("real weights", WeightedDigraph.from_edges(V, tails, heads,
+                                                       weights),
+            args['repeat'])
@@ -0,0 +1,74 @@
+# coding: utf-8
+
+# loader.py -- per-edge text loading against the bulk parser and the
+# binary CSR cache (src/loader.py).
+#
+#   python -m bench.loader -f data/mediumEWD.txt
+#   python -m bench.loader -V 1000000 -E 10000000
+
+import os
+import tempfile
+from argparse import ArgumentParser
+
+from bench.util import best_of, random_edges, report
+from src.weighted_digraph import WeightedDigraph
+from src.loader import read_edges, save, load
+
+
+def per_edge(fname):
+    "the line by line, add_edge per edge loader this module replaced"
+    with open(fname, 'r') as f:
+        graph = WeightedDigraph(int(next(f)))
+        next(f)
+        for line in f:
+            line = line.strip().split()
+            graph.add_edge(int(line[0]), int(line[1]), float(line[2]))
+    return graph
+
+
+def write_edges(fname, V, E):
+    tails, heads, weights = random_edges(V, E, weights=True)
+    with open(fname, 'w') as f:
+        f.write("%d\n%d\n" % (V, E))
+        for i in range(E):
+            f.write("%d %d %.5f\n" % (tails[i], heads[i], weights[i]))
+
+
+def bench(fname, repeat):
+    print("== %s (%.1fMB)" % (fname, os.path.getsize(fname) / 1048576.0))
+    _, secs = best_of(repeat, per_edge, fname)
+    report("text: add_edge per edge", secs)
+    _, secs = best_of(repeat, read_edges, fname)
+    report("text: bulk parse", secs)
+    _, secs = best_of(repeat, WeightedDigraph.from_file, fname)
+    report("text: bulk to list-of-lists", secs)
+    _, secs = best_of(repeat, WeightedDigraph.from_file, fname, True)
+    report("text: bulk to csr", secs)
+    fd, binary = tempfile.mkstemp(suffix='.csr')
+    os.close(fd)
+    try:
+        save(WeightedDigraph.from_file(fname, compact=True), binary)
+        _, secs = best_of(repeat, load, binary)
+        report("binary: load", secs)
+    finally:
+        os.remove(binary)
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='loader benchmark')
+    parser.add_argument('-f', '--fname')
+    parser.add_argument('-V', type=int, default=1000000)
+    parser.add_argument('-E', type=int, default=10000000)
+    parser.add_argument('-r', '--repeat', type=int, default=3)
+    args = vars(parser.parse_args())
+
+    if args['fname']:
+        bench(args['fname'], args['repeat'])
+    else:
+        fd, fname = tempfile.mkstemp(suffix='.txt')
+        os.close(fd)
+        try:
+            write_edges(fname, args['V'], args['E'])
+            bench(fname, args['repeat'])
+        finally:
+            os.remove(fname)
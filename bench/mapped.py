@@ -0,0 +1,71 @@
+# coding: utf-8
+
+# mapped.py -- startup cost and per-process memory of the WordNet
+# hypernym graph when every worker parses the text, loads the binary
+# file, or maps it (src/mapped.py).
+#
+#   python -m bench.mapped -H data/hypernyms.txt -p 8 -q 200
+
+import os
+import random
+import tempfile
+from argparse import ArgumentParser
+from multiprocessing import Pool
+
+from bench.util import timed, report
+from programming.wordnet.sap import SAP
+from programming.wordnet.wdgraph import hypernym_graph
+from src.loader import save, load
+from src.mapped import open_graph
+
+OPENERS = {'text': hypernym_graph, 'binary': load, 'mapped': open_graph}
+
+
+def statm():
+    "(resident, shared) bytes of the current process (Linux only)"
+    with open('/proc/self/statm', 'r') as f:
+        fields = f.read().split()
+    page = os.sysconf('SC_PAGE_SIZE')
+    return int(fields[1]) * page, int(fields[2]) * page
+
+
+def worker(job):
+    how, fname, queries, seed = job
+    graph, startup = timed(OPENERS[how], fname)
+    sap = SAP(graph)
+    rnd = random.Random(seed)
+    _, secs = timed(lambda: [sap.length(rnd.randrange(graph.V),
+                                        rnd.randrange(graph.V))
+                             for _ in range(queries)])
+    resident, shared = statm()
+    return startup, secs, resident - shared
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='mapped graph benchmark')
+    parser.add_argument('-H', '--hypernyms', default='data/hypernyms.txt')
+    parser.add_argument('-p', '--processes', type=int, default=4)
+    parser.add_argument('-q', '--queries', type=int, default=50)
+    args = vars(parser.parse_args())
+
+    fd, binary = tempfile.mkstemp(suffix='.csr')
+    os.close(fd)
+    try:
+        save(hypernym_graph(args['hypernyms']), binary)
+        files = {'text': args['hypernyms'], 'binary': binary,
+                 'mapped': binary}
+        n = args['processes']
+        for how in ('text', 'binary', 'mapped'):
+            pool = Pool(n)
+            jobs = [(how, files[how], args['queries'], i) for i in range(n)]
+            results = pool.map(worker, jobs, chunksize=1)
+            pool.close()
+            pool.join()
+            startup = max(r[0] for r in results)
+            queries = sum(r[1] for r in results) / n
+            private = sum(r[2] for r in results) / n
+            report("%s: startup" % how, startup, private,
+                   "(%d procs, private RSS per proc)" % n)
+            report("%s: %d SAP queries" % (how, args['queries']), queries)
+    finally:
+        os.remove(binary)
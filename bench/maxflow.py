@@ -0,0 +1,96 @@
+# coding: utf-8
+
+# maxflow.py -- FordFulkerson over FlowEdge objects against the array
+# engines (Edmonds-Karp, Dinic, push-relabel) on generated networks: a
+# unit-capacity bipartite matching network and a grid with random
+# capacities fed along its left column and drained from its right one.
+#
+#   python -m bench.maxflow -l 2000 -d 4 -n 60
+
+import random
+from argparse import ArgumentParser
+from array import array
+
+from bench.util import timed, report
+from src.maxflow import FlowNetwork, FordFulkerson, ResidualGraph
+from src.maxflow import EdmondsKarp, Dinic, PushRelabel
+
+
+def bipartite(L, degree, seed=0):
+    """
+    s = 0 -> left 1..L -> right L+1..2L -> t = 2L+1, `degree` random right
+    neighbours per left vertex, all capacities 1: the max flow is the size
+    of a maximum matching. Returns (V, s, t, tails, heads, capacities).
+    """
+    rnd = random.Random(seed)
+    s, t = 0, 2 * L + 1
+    tails, heads = array('i'), array('i')
+    for v in range(1, L + 1):
+        tails.extend((s, L + v))
+        heads.extend((v, t))
+        for w in rnd.sample(range(L + 1, 2 * L + 1), degree):
+            tails.append(v)
+            heads.append(w)
+    return 2 * L + 2, s, t, tails, heads, array('d', [1.0]) * len(tails)
+
+
+def grid(n, seed=0):
+    """
+    n x n grid, vertex r * n + c, arcs to the right and both ways along
+    the columns with integral capacities in 1..100; s = n * n feeds the
+    left column and t = n * n + 1 drains the right one, uncapped.
+    """
+    rnd = random.Random(seed)
+    s, t = n * n, n * n + 1
+    tails, heads, capacities = array('i'), array('i'), array('d')
+
+    def arc(v, w, capacity=None):
+        tails.append(v)
+        heads.append(w)
+        capacities.append(capacity or rnd.randint(1, 100))
+
+    for r in range(n):
+        arc(s, r * n, 100.0 * n)
+        arc(r * n + n - 1, t, 100.0 * n)
+        for c in range(n):
+            v = r * n + c
+            if c + 1 < n:
+                arc(v, v + 1)
+            if r + 1 < n:
+                arc(v, v + n)
+                arc(v + n, v)
+    return n * n + 2, s, t, tails, heads, capacities
+
+
+def compare(name, V, s, t, tails, heads, capacities, objects=True):
+    print("== %s V=%d E=%d" % (name, V, len(tails)))
+    residual, secs = timed(ResidualGraph, V, tails, heads, capacities)
+    report('residual graph', secs)
+    values = []
+    if objects:
+        network = FlowNetwork.from_edges(V, tails, heads, capacities)
+        ff, secs = timed(FordFulkerson, network, s, t)
+        report('FordFulkerson (objects)', secs, extra="%.0f" % ff.value())
+        values.append(ff.value())
+    for engine in (EdmondsKarp, Dinic, PushRelabel):
+        maxflow, secs = timed(engine, residual, s, t)
+        report(engine.__name__, secs, extra="%.0f" % maxflow.value())
+        values.append(maxflow.value())
+    assert max(values) - min(values) < 1e-6
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='max flow engines')
+    parser.add_argument('-l', '--left', type=int, default=2000,
+                        help='bipartite side')
+    parser.add_argument('-d', '--degree', type=int, default=4)
+    parser.add_argument('-n', type=int, default=60, help='grid side')
+    parser.add_argument('--no-objects', action='store_true',
+                        help='skip FordFulkerson')
+    args = vars(parser.parse_args())
+
+    objects = not args['no_objects']
+    compare("bipartite %d+%d" % (args['left'], args['left']),
+            *bipartite(args['left'], args['degree']), objects=objects)
+    compare("grid %dx%d" % (args['n'], args['n']), *grid(args['n']),
+            objects=objects)
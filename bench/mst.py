@@ -0,0 +1,95 @@
+# coding: utf-8
+
+# mst.py -- the three MSTs of src/mst.py, plus Kruskal and lazy Prim on
+# the locking Queue.PriorityQueue they used before, on mediumEWG.txt and a
+# synthetic graph.
+#
+#   python -m bench.mst -f data/mediumEWG.txt -V 100000 -E 1000000
+
+from argparse import ArgumentParser
+from Queue import PriorityQueue
+
+from bench.util import best_of, random_edges, report
+from src.mst import MST, KruskalMST, LazyPrimMST, EagerPrimtMST
+from src.union_find import UnionFind
+from src.weighted_graph import WeightedGraph
+
+
+class QueueKruskalMST(MST):
+    "KruskalMST on Queue.PriorityQueue, kept here for reference"
+    def __init__(self, graph):
+        super(QueueKruskalMST, self).__init__(graph)
+        q = PriorityQueue()
+        for e in graph.edges():
+            q.put(e)
+        uf = UnionFind(graph.V)
+        while len(self.edges()) != graph.V - 1 and not q.empty():
+            e = q.get()
+            v = e.either()
+            w = e.other(v)
+            if not uf.connected(v, w):
+                uf.union(v, w)
+                self.mst.append(e)
+
+
+class QueueLazyPrimMST(LazyPrimMST):
+    "LazyPrimMST on Queue.PriorityQueue, kept here for reference"
+    def prim(self, graph, source):
+        self._q = PriorityQueue()
+        self.visit(graph, source)
+        while not self._q.empty():
+            e = self._q.get()
+            v = e.either()
+            w = e.other(v)
+            if self.marked(v) and self.marked(w):
+                continue
+            self.mst.append(e)
+            if not self.marked(v):
+                self.visit(graph, v)
+            if not self.marked(w):
+                self.visit(graph, w)
+
+    def visit(self, graph, v):
+        self._marked.add(v)
+        for e in graph.adj(v):
+            if not self.marked(e.other(v)):
+                self._q.put(e)
+
+
+ALGORITHMS = [('kruskal (PriorityQueue)', QueueKruskalMST),
+              ('kruskal', KruskalMST),
+              ('lazy prim (PriorityQueue)', QueueLazyPrimMST),
+              ('lazy prim', LazyPrimMST),
+              ('eager prim', EagerPrimtMST)]
+
+
+def compare(name, graph, repeat, skip):
+    print("== %s V=%d E=%d" % (name, graph.V, graph.E))
+    weight = None
+    for label, cls in ALGORITHMS:
+        if skip and 'PriorityQueue' in label:
+            continue
+        mst, secs = best_of(repeat, cls, graph)
+        report(label, secs, extra="weight %.5f" % mst.weight())
+        if weight is not None:
+            assert abs(mst.weight() - weight) < 1e-6 * max(1.0, weight)
+        weight = mst.weight()
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='MST benchmark')
+    parser.add_argument('-f', '--fname', default='data/mediumEWG.txt')
+    parser.add_argument('-V', type=int, default=100000)
+    parser.add_argument('-E', type=int, default=1000000)
+    parser.add_argument('-r', '--repeat', type=int, default=1)
+    parser.add_argument('-q', '--skip-queue', action='store_true',
+                        help='skip the PriorityQueue versions')
+    args = vars(parser.parse_args())
+
+    compare(args['fname'], WeightedGraph.from_file(args['fname']),
+            args['repeat'], args['skip_queue'])
+    if args['E']:
+        tails, heads, weights = random_edges(args['V'], args['E'],
+                                             weights=True)
+        graph = WeightedGraph.from_edges(args['V'], tails, heads, weights)
+        compare("random", graph, args['repeat'], args['skip_queue'])
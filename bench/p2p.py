@@ -0,0 +1,68 @@
+# coding: utf-8
+
+# p2p.py -- point-to-point queries: a full DijkstraSP per query against
+# shortest_path stopping at the target (fresh or reused SPWorkspace) and
+# A* with a Manhattan heuristic, on a grid road network whose edge
+# weights are at least the distance they cover.
+#
+#   python -m bench.p2p -n 200 -q 100
+
+import random
+from argparse import ArgumentParser
+
+from bench.util import timed, report
+from src.sp import DijkstraSP, SPWorkspace, shortest_path
+from src.weighted_digraph import WeightedDigraph
+
+
+def grid(n, seed=0):
+    "n x n grid, both directions, weights uniform(1, 2)"
+    rnd = random.Random(seed)
+    graph = WeightedDigraph(n * n)
+    for r in range(n):
+        for c in range(n):
+            v = r * n + c
+            for w in ([v + 1] if c + 1 < n else []) + \
+                    ([v + n] if r + 1 < n else []):
+                graph.add_edge(v, w, rnd.uniform(1.0, 2.0))
+                graph.add_edge(w, v, rnd.uniform(1.0, 2.0))
+    return graph
+
+
+def manhattan(n):
+    def heuristic(v, t):
+        return abs(v // n - t // n) + abs(v % n - t % n)
+    return heuristic
+
+
+def full(graph, queries):
+    return [DijkstraSP(graph, s).dist_to(t) for s, t in queries]
+
+
+def early_exit(graph, queries, heuristic=None, reuse=True):
+    workspace = SPWorkspace(graph) if reuse else None
+    return [shortest_path(graph, s, t, heuristic, workspace)[0]
+            for s, t in queries]
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='point-to-point shortest paths')
+    parser.add_argument('-n', type=int, default=100, help='grid side')
+    parser.add_argument('-q', '--queries', type=int, default=50)
+    args = vars(parser.parse_args())
+
+    n, Q = args['n'], args['queries']
+    graph = grid(n)
+    rnd = random.Random(1)
+    queries = [(rnd.randrange(n * n), rnd.randrange(n * n))
+               for _ in range(Q)]
+    print("== grid %dx%d V=%d E=%d, %d queries" % (n, n, graph.V, graph.E, Q))
+    expected, secs = timed(full, graph, queries)
+    report("full dijkstra", secs)
+    for label, kwargs in [('early exit', {'reuse': False}),
+                          ('early exit, workspace', {}),
+                          ('a* manhattan, workspace',
+                           {'heuristic': manhattan(n)})]:
+        dists, secs = timed(early_exit, graph, queries, **kwargs)
+        report(label, secs)
+        assert all(abs(a - b) < 1e-6 for a, b in zip(dists, expected))
@@ -0,0 +1,77 @@
+# coding: utf-8
+
+# pqueue.py -- Dijkstra and eager Prim on the indexed heap
+# (src.pqueue.IndexMinPQ, binary and 4-ary) against the lazy-deletion
+# pqueue they used before, on dense random graphs.
+#
+#   python -m bench.pqueue -V 2000 -E 1000000
+
+from argparse import ArgumentParser
+
+from bench.util import best_of, random_edges, report
+from src.mst import EagerPrimtMST
+from src.pqueue import pqueue
+from src.sp import DijkstraSP
+from src.weighted_digraph import WeightedDigraph
+from src.weighted_graph import WeightedGraph
+
+
+class LazyDijkstraSP(DijkstraSP):
+    "DijkstraSP on the lazy pqueue, kept here for reference"
+    def __init__(self, graph, source):
+        super(DijkstraSP, self).__init__(graph, source)
+        self._q = pqueue()
+        self._q.enqueue((0.0, source))
+        self.peak = 0
+        while len(self._q) != 0:
+            self.peak = max(self.peak, len(self._q.heap))
+            v = self._q.dequeue()
+            for e in graph.adj(v):
+                self.relax(e)
+
+
+class LazyEagerPrimtMST(EagerPrimtMST):
+    "EagerPrimtMST on the lazy pqueue, kept here for reference"
+    def __init__(self, graph):
+        self._q = None
+        super(LazyEagerPrimtMST, self).__init__(graph)
+
+    def prim(self, graph, source):
+        self._q = pqueue()
+        self._dist_to[source] = 0.0
+        self._q.enqueue((0.0, source))
+        while not self._q.empty():
+            self.visit(graph, self._q.dequeue())
+
+
+def with_arity(cls, arity):
+    return type("%s%d" % (cls.__name__, arity), (cls,), {'arity': arity})
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='priority queue benchmark')
+    parser.add_argument('-V', type=int, default=2000)
+    parser.add_argument('-E', type=int, default=500000)
+    parser.add_argument('-r', '--repeat', type=int, default=3)
+    args = vars(parser.parse_args())
+
+    V, E = args['V'], args['E']
+    tails, heads, weights = random_edges(V, E, weights=True)
+    digraph = WeightedDigraph.from_edges(V, tails, heads, weights)
+    graph = WeightedGraph.from_edges(V, tails, heads, weights)
+    print("== V=%d E=%d" % (V, E))
+    lazy, secs = best_of(args['repeat'], LazyDijkstraSP, digraph, 0)
+    report("dijkstra: lazy pqueue", secs,
+           extra="heap peaked at %d entries for V=%d" % (lazy.peak, V))
+    for arity in (2, 4):
+        sp, secs = best_of(args['repeat'], with_arity(DijkstraSP, arity),
+                           digraph, 0)
+        report("dijkstra: %d-ary IndexMinPQ" % arity, secs)
+        assert sp._dist_to == lazy._dist_to
+    lazy, secs = best_of(args['repeat'], LazyEagerPrimtMST, graph)
+    report("eager prim: lazy pqueue", secs)
+    for arity in (2, 4):
+        mst, secs = best_of(args['repeat'],
+                            with_arity(EagerPrimtMST, arity), graph)
+        report("eager prim: %d-ary IndexMinPQ" % arity, secs)
+        assert abs(mst.weight() - lazy.weight()) < 1e-6
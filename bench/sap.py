@@ -0,0 +1,104 @@
+# coding: utf-8
+
+# sap.py -- shortest ancestral path queries per second on the WordNet
+# hypernym graph: the bounded two-frontier search in SAP against two full
+# BFSes and a scan of everything they reach. Random pairs mostly meet
+# near the root; "sibling" pairs share a direct hypernym; "sets" queries
+# are random groups of synsets, as nouns with several senses give.
+# "repeated" queries draw from a small pool of synsets, as a production
+# workload with popular nouns would, and compare SAP's caches.
+#
+#   python -m bench.sap -H data/hypernyms.txt -q 20000
+
+import random
+from argparse import ArgumentParser
+
+from bench.util import best_of, report
+from programming.wordnet.sap import SAP
+from programming.wordnet.wdgraph import hypernym_graph
+from src.bfs import BFSWorkspace
+
+
+class FullSAP(object):
+    "searches both sides to the end, as SAP did before the bounded search"
+    def __init__(self, graph):
+        self._bfs_v = BFSWorkspace(graph)
+        self._bfs_w = BFSWorkspace(graph)
+
+    def length(self, v, w):
+        bfs_v, bfs_w = self._bfs_v.search(v), self._bfs_w.search(w)
+        common = [(bfs_v.dist_to[x] + bfs_w.dist_to[x], x)
+                  for x in bfs_v.touched if bfs_w.has_path(x)]
+        return int(min(common)[0]) if common else -1
+
+
+def random_pairs(graph, n, rnd):
+    return [(rnd.randrange(graph.V), rnd.randrange(graph.V))
+            for _ in range(n)]
+
+
+def sibling_pairs(graph, n, rnd):
+    hyponyms = graph.reverse()
+    pairs = []
+    while len(pairs) < n:
+        v = rnd.randrange(graph.V)
+        parents = list(graph.adj(v))
+        if parents:
+            siblings = list(hyponyms.adj(rnd.choice(parents)))
+            pairs.append((v, rnd.choice(siblings)))
+    return pairs
+
+
+def set_pairs(graph, n, rnd):
+    return [(rnd.sample(xrange(graph.V), rnd.randint(1, 4)),
+             rnd.sample(xrange(graph.V), rnd.randint(1, 4)))
+            for _ in range(n)]
+
+
+def repeated_pairs(graph, n, rnd, pool=300):
+    synsets = rnd.sample(xrange(graph.V), pool)
+    return [(rnd.choice(synsets), rnd.choice(synsets)) for _ in range(n)]
+
+
+def run(sap, pairs):
+    return [sap.length(v, w) for v, w in pairs]
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='SAP benchmark')
+    parser.add_argument('-H', '--hypernyms', default='data/hypernyms.txt')
+    parser.add_argument('-q', '--queries', type=int, default=20000)
+    parser.add_argument('-r', '--repeat', type=int, default=3)
+    parser.add_argument('-c', '--cache-size', type=int, default=100000)
+    args = vars(parser.parse_args())
+
+    graph = hypernym_graph(args['hypernyms'])
+    n, rnd = args['queries'], random.Random(0)
+    workloads = [('random', random_pairs(graph, n, rnd)),
+                 ('sibling', sibling_pairs(graph, n, rnd)),
+                 ('sets', set_pairs(graph, n, rnd))]
+    for name, pairs in workloads:
+        print("== %s pairs, %d queries" % (name, n))
+        expected, secs = best_of(args['repeat'], run, FullSAP(graph), pairs)
+        report("full searches", secs, extra="%.0f queries/s" % (n / secs))
+        lengths, secs = best_of(args['repeat'], run, SAP(graph), pairs)
+        report("bounded search", secs, extra="%.0f queries/s" % (n / secs))
+        assert lengths == expected
+
+    pairs = repeated_pairs(graph, n, rnd)
+    size = args['cache_size']
+    print("== repeated pairs, %d queries" % n)
+    expected, secs = best_of(args['repeat'], run, SAP(graph), pairs)
+    report("no cache", secs, extra="%.0f queries/s" % (n / secs))
+    for name, kwargs in [('pair cache', dict(cache_size=size)),
+                         ('ancestor cache', dict(ancestor_cache_size=size))]:
+        saps = []
+
+        def cold_run():
+            saps.append(SAP(graph, **kwargs))
+            return run(saps[-1], pairs)
+        lengths, secs = best_of(args['repeat'], cold_run)
+        cache = saps[-1].cache or saps[-1].ancestor_cache
+        report(name, secs, extra="%.0f queries/s, %d hits, %d misses"
+               % (n / secs, cache.hits, cache.misses))
+        assert lengths == expected
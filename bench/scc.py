@@ -0,0 +1,36 @@
+# coding: utf-8
+
+# scc.py -- time and peak memory of Kosaraju-Sharir (two passes, builds
+# the reverse digraph) against Tarjan (one pass) on a random digraph.
+#
+#   python -m bench.scc -V 1000000 -E 5000000
+
+from argparse import ArgumentParser
+
+from bench.util import timed, peak_memory, random_edges, report
+from src.digraph import Digraph
+from src.dfs import KosarajuSharirSCC, TarjanSCC
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='SCC benchmark')
+    parser.add_argument('-V', type=int, default=200000)
+    parser.add_argument('-E', type=int, default=1000000)
+    args = vars(parser.parse_args())
+
+    V, E = args['V'], args['E']
+    tails, heads, _ = random_edges(V, E)
+    for kind in ('digraph', 'csr'):
+        graph = Digraph.from_edges(V, tails, heads)
+        if kind == 'csr':
+            graph = graph.freeze()
+        print("== %s V=%d E=%d" % (kind, V, E))
+        for name, cls in [('kosaraju', KosarajuSharirSCC),
+                          ('tarjan', TarjanSCC)]:
+            secs, nbytes = peak_memory(cls, graph)
+            report(name, secs, nbytes, "(peak growth)")
+        tarjan = TarjanSCC(graph)
+        _, secs = timed(tarjan.condensation)
+        report("tarjan condensation", secs,
+               extra="%d components" % tarjan.count)
+        assert KosarajuSharirSCC(graph).count == tarjan.count
@@ -0,0 +1,61 @@
+# coding: utf-8
+
+# topo.py -- keeping a topological order while edges stream in: a
+# DynamicDAG updated per edge against a TopologicalSort recomputed after
+# every insert. The edges follow a hidden random order, so the DAG stays
+# acyclic while most inserts disagree with the order known so far.
+#
+#   python -m bench.topo -V 100000 -E 500000 -R 2000
+
+import random
+from argparse import ArgumentParser
+
+from bench.util import timed, report
+from src.digraph import Digraph, DynamicDAG
+from src.dfs import TopologicalSort
+
+
+def dag_edges(V, E, seed=0):
+    rnd = random.Random(seed)
+    hidden = list(range(V))
+    rnd.shuffle(hidden)
+    edges = []
+    while len(edges) < E:
+        a, b = rnd.randrange(V), rnd.randrange(V)
+        if a != b:
+            a, b = min(a, b), max(a, b)
+            edges.append((hidden[a], hidden[b]))
+    return edges
+
+
+def stream(graph, edges):
+    for v, w in edges:
+        graph.add_edge(v, w)
+    return graph
+
+
+def recompute(graph, edges):
+    for v, w in edges:
+        graph.add_edge(v, w)
+        TopologicalSort(graph)
+    return graph
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='dynamic topological order')
+    parser.add_argument('-V', type=int, default=20000)
+    parser.add_argument('-E', type=int, default=100000)
+    parser.add_argument('-R', type=int, default=500,
+                        help='edges streamed into the recomputing baseline')
+    args = vars(parser.parse_args())
+
+    V, E, R = args['V'], args['E'], args['R']
+    edges = dag_edges(V, E)
+    print("== V=%d E=%d" % (V, E))
+    dag, secs = timed(stream, DynamicDAG(V), edges)
+    report("dynamic", secs, extra="%.1f us/edge" % (secs / E * 1e6))
+    _, secs = timed(recompute, Digraph(V), edges[:R])
+    report("recompute", secs, extra="%.1f us/edge (first %d edges)" %
+           (secs / R * 1e6, R))
+    rank = dag.rank
+    assert all(rank(v) < rank(w) for v, w in edges)
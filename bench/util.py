@@ -0,0 +1,112 @@
+# coding: utf-8
+
+# util.py -- timing, memory and synthetic-graph helpers shared by the
+# benchmark scripts in this package. Run the scripts from the repository
+# root, e.g. `python -m bench.csr -f data/mediumEWD.txt`.
+
+import os
+import random
+import resource
+import sys
+import time
+from array import array
+
+
+def timed(f, *args, **kwargs):
+    "returns (result, seconds) of a single call"
+    start = time.time()
+    result = f(*args, **kwargs)
+    return result, time.time() - start
+
+
+def best_of(n, f, *args, **kwargs):
+    "returns (result, seconds) of the fastest out of n calls"
+    best, result = float("inf"), None
+    for _ in range(n):
+        result, elapsed = timed(f, *args, **kwargs)
+        best = min(best, elapsed)
+    return result, best
+
+
+def sizeof(obj):
+    """
+    Deep size in bytes of obj: containers, instance dicts and the objects
+    they reference are followed, shared objects are counted once.
+    """
+    seen, total, stack = set(), 0, [obj]
+    while stack:
+        x = stack.pop()
+        if id(x) in seen or isinstance(x, type):
+            continue
+        seen.add(id(x))
+        total += sys.getsizeof(x)
+        if isinstance(x, dict):
+            stack.extend(x.keys())
+            stack.extend(x.values())
+        elif isinstance(x, (list, tuple, set, frozenset)):
+            stack.extend(x)
+        elif hasattr(x, '__dict__'):
+            stack.append(x.__dict__)
+    return total
+
+
+def random_edges(V, E, seed=0, weights=False, low=0.0, high=1.0):
+    "E random edges over V vertices as (tails, heads, weights) arrays"
+    rnd = random.Random(seed)
+    tails = array('i', [rnd.randrange(V) for _ in range(E)])
+    heads = array('i', [rnd.randrange(V) for _ in range(E)])
+    ws = None
+    if weights:
+        ws = array('d', [rnd.uniform(low, high) for _ in range(E)])
+    return tails, heads, ws
+
+
+def path_edges(V):
+    "edges 0->1->...->V-1 as (tails, heads) arrays"
+    return array('i', range(V - 1)), array('i', range(1, V))
+
+
+def populate(graph, tails, heads, weights=None):
+    "adds an edge list to a mutable graph one edge at a time"
+    if weights is None:
+        for i in range(len(tails)):
+            graph.add_edge(tails[i], heads[i])
+    else:
+        for i in range(len(tails)):
+            graph.add_edge(tails[i], heads[i], weights[i])
+    return graph
+
+
+def peak_memory(f, *args, **kwargs):
+    """
+    Runs f in a forked child and returns (seconds, bytes) of its run time
+    and of how far its peak resident set grew past the size it started
+    with (Linux only: reads /proc/self/statm and ru_maxrss). The parent's
+    memory is untouched, so several measurements do not interfere.
+    """
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read)
+        with open('/proc/self/statm', 'r') as statm:
+            start = int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        _, secs = timed(f, *args, **kwargs)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        os.write(write, "%r %d" % (secs, peak - start))
+        os._exit(0)
+    os.close(write)
+    with os.fdopen(read, 'r') as result:
+        secs, nbytes = result.read().split()
+    os.waitpid(pid, 0)
+    return float(secs), int(nbytes)
+
+
+def mb(nbytes):
+    return nbytes / float(1 << 20)
+
+
+def report(name, seconds, nbytes=None, extra=""):
+    line = "%-32s %10.4fs" % (name, seconds)
+    if nbytes is not None:
+        line += " %10.3fMB" % mb(nbytes)
+    print(line + ((" " + extra) if extra else ""))
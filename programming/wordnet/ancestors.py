@@ -0,0 +1,135 @@
+# coding: utf-8
+
+# ancestors.py -- precomputed ancestor closure of a digraph, for SAP
+# queries on graphs whose closure is small, like WordNet's hypernym DAG.
+#
+# Row v lists every vertex reachable from v (v itself included) in
+# increasing id order, next to its distance from v: the CSR layout of
+# src/csr.py over the closure instead of the edges. A query is then a
+# sorted merge of two rows, no traversal. The binary file is
+#
+#   header     32 bytes: magic, version, flags, V, entries (struct HEADER)
+#   offsets    (V + 1) int64
+#   targets    entries int32, the ancestor ids
+#   dists      entries uint16
+
+import struct
+import sys
+from array import array
+
+from src.bfs import BFSWorkspace
+from src.loader import OFFSET_TYPECODE, VERTEX_TYPECODE, BIG_ENDIAN
+from src.marks import INF
+from programming.wordnet.sap import nearest
+
+MAGIC = b'ANCI'
+VERSION = 1
+HEADER = struct.Struct('<4sBBBBqq8x')
+DIST_TYPECODE = 'H'
+
+
+class AncestorIndex(object):
+    """
+    Answers `length`/`ancestor` like SAP (same arguments, same tie
+    breaking towards the lowest id) from the closure rows. Build it once
+    with `build`, `save` it and `load` it in the processes serving queries.
+    """
+    def __init__(self, V, offsets, targets, dists):
+        self.V = V
+        self.offsets = offsets
+        self.targets = targets
+        self.dists = dists
+
+    @classmethod
+    def build(cls, graph):
+        """
+        One BFS per vertex, every row sorted as it is written. Distances
+        are stored in 16 bits, plenty for any taxonomy.
+        """
+        bfs = BFSWorkspace(graph)
+        offsets = array(OFFSET_TYPECODE, [0])
+        targets = array(VERTEX_TYPECODE)
+        dists = array(DIST_TYPECODE)
+        for v in graph.vertices():
+            bfs.search(v)
+            dist_to = bfs.dist_to
+            row = sorted(bfs.touched)
+            targets.extend(row)
+            dists.extend(int(dist_to[x]) for x in row)
+            offsets.append(len(targets))
+        return cls(graph.V, offsets, targets, dists)
+
+    def save(self, fname):
+        flags = BIG_ENDIAN if sys.byteorder == 'big' else 0
+        with open(fname, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, flags, 0, 0,
+                                self.V, len(self.targets)))
+            array(OFFSET_TYPECODE, self.offsets).tofile(f)
+            array(VERTEX_TYPECODE, self.targets).tofile(f)
+            array(DIST_TYPECODE, self.dists).tofile(f)
+
+    @classmethod
+    def load(cls, fname):
+        with open(fname, 'rb') as f:
+            magic, version, flags, _, _, V, entries = HEADER.unpack(
+                f.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("%s is not an ancestor index" % fname)
+            offsets = array(OFFSET_TYPECODE)
+            targets = array(VERTEX_TYPECODE)
+            dists = array(DIST_TYPECODE)
+            offsets.fromfile(f, V + 1)
+            targets.fromfile(f, entries)
+            dists.fromfile(f, entries)
+        if bool(flags & BIG_ENDIAN) != (sys.byteorder == 'big'):
+            for a in (offsets, targets, dists):
+                a.byteswap()
+        return cls(V, offsets, targets, dists)
+
+    def nbytes(self):
+        return sum(len(a) * a.itemsize
+                   for a in (self.offsets, self.targets, self.dists))
+
+    def _row(self, v):
+        "(ancestors, dists, start, end) of a vertex or a vertex set"
+        if not hasattr(v, '__iter__'):
+            return self.targets, self.dists, \
+                self.offsets[v], self.offsets[v + 1]
+        vs = list(v)
+        if len(vs) == 1:
+            return self._row(vs[0])
+        dists = nearest([self.ancestors(u) for u in vs])
+        row = sorted(dists)
+        return row, [dists[x] for x in row], 0, len(row)
+
+    def ancestors(self, v):
+        "{ancestor: distance} from v, or from the nearest vertex of v"
+        ancestors, dists, i, end = self._row(v)
+        return dict(zip(ancestors[i:end], dists[i:end]))
+
+    def _sap(self, v, w):
+        "(length, ancestor), or (-1, -1): a merge of the two sorted rows"
+        ancestors_v, dists_v, i, end_v = self._row(v)
+        ancestors_w, dists_w, j, end_w = self._row(w)
+        best, ancestor = INF, -1
+        while i < end_v and j < end_w:
+            x, y = ancestors_v[i], ancestors_w[j]
+            if x < y:
+                i += 1
+            elif y < x:
+                j += 1
+            else:
+                d = dists_v[i] + dists_w[j]
+                if d < best:
+                    best, ancestor = d, x
+                i += 1
+                j += 1
+        if ancestor == -1:
+            return -1, -1
+        return best, ancestor
+
+    def length(self, v, w):
+        return self._sap(v, w)[0]
+
+    def ancestor(self, v, w):
+        return self._sap(v, w)[1]
@@ -3,7 +3,7 @@
 import argparse
 import signal
 import sys
-from collections import defaultdict
+from multiprocessing import Pool
 
 from programming.wordnet.wdgraph import WordNet
 
@@ -14,13 +14,44 @@ class Outcast(object):
 
     def outcast(self, nouns):
         "find out which noun is least to related to the bunch"
-        dists = defaultdict(int)
-        for n in nouns:
-            for m in nouns:
-                if n != m:
-                    dists[n] += self.wordnet.dist(n, m)
-        print(sorted(dists.items(), key=lambda x: x[1]))
-        return max(dists.items(), key=lambda x: x[1])[0]
+        dists = self.wordnet.distance_matrix(nouns)
+        totals = [sum(row) for row in dists]
+        return nouns[totals.index(max(totals))]
+
+
+# the Outcast batch hands to its forked workers
+_outcast = None
+
+
+def _solve(line):
+    return _outcast.outcast(line.split())
+
+
+def batch(fname, synsets, hypernyms, processes=None, index=None):
+    """
+    Outcast of every line of fname (space separated nouns, blank lines
+    skipped), in order, computed by a pool of processes. The WordNet is
+    loaded once, here, and the forked workers inherit it copy-on-write
+    instead of each parsing the files again (Unix only).
+    """
+    global _outcast
+    with open(fname, 'r') as f:
+        lines = [l.strip() for l in f if l.strip()]
+    _outcast = Outcast(WordNet(synsets, hypernyms, index=index))
+    try:
+        pool = Pool(processes)
+    finally:
+        _outcast = None
+    try:
+        outcasts = pool.map(_solve, lines, chunksize=64)
+    except BaseException:
+        pool.terminate()
+        raise
+    else:
+        pool.close()
+    finally:
+        pool.join()
+    return outcasts
 
 
 if __name__ == '__main__':
@@ -28,9 +59,22 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='WordNet')
     parser.add_argument('-s', '--synsets')
     parser.add_argument('-H', '--hypernyms')
+    parser.add_argument('-i', '--index', help='ancestor index file')
+    parser.add_argument('-b', '--batch',
+                        help='file of queries, one per line; prints the '
+                        'outcast of each')
+    parser.add_argument('-p', '--processes', type=int,
+                        help='batch workers (default: one per CPU)')
     args = vars(parser.parse_args())
 
-    wordnet = WordNet(args['synsets'], args['hypernyms'])
+    if args['batch']:
+        for outcast in batch(args['batch'], args['synsets'],
+                             args['hypernyms'], args['processes'],
+                             args['index']):
+            print(outcast)
+        sys.exit(0)
+
+    wordnet = WordNet(args['synsets'], args['hypernyms'], index=args['index'])
     outcast = Outcast(wordnet)
 
     while True:
@@ -3,43 +3,175 @@ import argparse
 import signal
 import sys
 
-from src.bfs import BreadthFirstSearch
+from src.bfs import BFSWorkspace
+from src.cache import LRUCache
+from src.marks import INF
 from src.digraph import Digraph
+from src.loader import is_binary
+from src.mapped import open_graph
+
+
+def nearest(maps):
+    "merges {ancestor: distance} maps keeping the shortest distances"
+    dists = {}
+    for ancestors in maps:
+        for x, d in ancestors.iteritems():
+            if d < dists.get(x, INF):
+                dists[x] = d
+    return dists
+
+
+def join(dists_v, dists_w):
+    """
+    (length, ancestor) of the shortest ancestral path between the
+    {ancestor: distance} maps of two searches, or (-1, -1)
+    """
+    if len(dists_w) < len(dists_v):
+        dists_v, dists_w = dists_w, dists_v
+    common = [(d + dists_w[x], x) for x, d in dists_v.iteritems()
+              if x in dists_w]
+    return min(common) if common else (-1, -1)
 
 
 class SAP(object):
-    def __init__(self, graph):
+    """
+    Shortest ancestral paths in a digraph: the common ancestor x of v and
+    w minimizing dist(v, x) + dist(w, x). v and w may also be iterables of
+    vertices, searched from all at once. Ties go to the lowest vertex id.
+
+    With `cache_size`, answers are kept in an LRU cache keyed by the pair
+    of vertex sets, in either order, and shared by `length` and
+    `ancestor`. With `ancestor_cache_size`, queries are answered instead
+    by joining per-vertex {ancestor: distance} maps, themselves kept in an
+    LRU cache, so queries over overlapping vertices share their searches.
+    Both caches assume the graph is not modified afterwards.
+    """
+    def __init__(self, graph, cache_size=0, ancestor_cache_size=0):
+        "the two BFS workspaces are reused by every query on this SAP"
         self.graph = graph
+        self._bfs_v = BFSWorkspace(graph)
+        self._bfs_w = BFSWorkspace(graph)
+        self.cache = LRUCache(cache_size) if cache_size else None
+        self.ancestor_cache = None
+        if ancestor_cache_size:
+            self.ancestor_cache = LRUCache(ancestor_cache_size)
 
-    def _ancestor(self, v, w, bfs_v, bfs_w):
-        ancestors = []
-        for x in range(self.graph.V):  # TODO: iterate over v ancestors
-            if bfs_v.has_path(x) and bfs_w.has_path(x):
-                ancestors.append(x)
-        if ancestors:
-            return min(ancestors,
-                       key=lambda x: bfs_v.dist_to[x] + bfs_w.dist_to[x])
-        else:
-            return -1
+    def _query(self, v, w):
+        "(length, ancestor) of v and w, through the caches if enabled"
+        if self.cache is None and self.ancestor_cache is None:
+            return self._sap(v, w)
+        vs = frozenset(v) if hasattr(v, '__iter__') else frozenset([v])
+        ws = frozenset(w) if hasattr(w, '__iter__') else frozenset([w])
+        if self.cache is None:
+            return self._join(vs, ws)
+        key = frozenset([vs, ws])
+        result = self.cache.get(key)
+        if result is None:
+            if self.ancestor_cache is None:
+                result = self._sap(vs, ws)
+            else:
+                result = self._join(vs, ws)
+            self.cache[key] = result
+        return result
 
-    def length(self, v, w):
-        bfs_v = BreadthFirstSearch(self.graph, v)
-        bfs_w = BreadthFirstSearch(self.graph, w)
-        ancestor = self._ancestor(v, w, bfs_v, bfs_w)
+    def ancestors(self, v):
+        """
+        {ancestor: distance} for every vertex reachable from v (v itself
+        at 0), or from the nearest vertex of v if it is iterable. Single
+        vertices are cached when `ancestor_cache_size` is set; callers
+        must not modify the result.
+        """
+        if hasattr(v, '__iter__'):
+            maps = [self.ancestors(u) for u in v]
+            return maps[0] if len(maps) == 1 else nearest(maps)
+        cache = self.ancestor_cache
+        if cache is not None:
+            dists = cache.get(v)
+            if dists is not None:
+                return dists
+        bfs = self._bfs_v.search(v)
+        dist_to = bfs.dist_to
+        dists = dict((x, int(dist_to[x])) for x in bfs.touched)
+        if cache is not None:
+            cache[v] = dists
+        return dists
+
+    def _join(self, vs, ws):
+        return join(self.ancestors(vs), self.ancestors(ws))
+
+    def _sap(self, v, w):
+        """
+        Returns (length, ancestor), or (-1, -1) if there is none.
+
+        Both searches advance a level at a time, the one with the smaller
+        frontier first. A vertex not yet reached from v is at least kv + 1
+        away from it, where kv is the depth of v's frontier, and the same
+        holds for w; so once the best candidate beats min(kv + 1, kw + 1)
+        nothing left to discover can match it and the search stops. An
+        exhausted side's depth is infinite: everything is reached from it.
+        """
+        bfs_v, bfs_w = self._bfs_v, self._bfs_w
+        frontier_v, frontier_w = bfs_v.start(v), bfs_w.start(w)
+        best, ancestor = INF, -1
+        shared = [x for x in frontier_v if bfs_w.has_path(x)]
+        if shared:
+            best, ancestor = 0, min(shared)
+        kv = kw = 0
+        while frontier_v or frontier_w:
+            if best < kv + 1 and best < kw + 1:
+                break
+            if frontier_v and (not frontier_w or
+                               len(frontier_v) <= len(frontier_w)):
+                frontier_v, best, ancestor = self._step(
+                    bfs_v, frontier_v, kv + 1, bfs_w, best, ancestor)
+                kv = kv + 1 if frontier_v else INF
+            else:
+                frontier_w, best, ancestor = self._step(
+                    bfs_w, frontier_w, kw + 1, bfs_v, best, ancestor)
+                kw = kw + 1 if frontier_w else INF
         if ancestor == -1:
-            return -1
-        return bfs_v.dist_to[ancestor] + bfs_w.dist_to[ancestor]
+            return -1, -1
+        return int(best), ancestor
+
+    @staticmethod
+    def _step(bfs, frontier, depth, other, best, ancestor):
+        """
+        Expands frontier into the next level of bfs, at depth, checking
+        each vertex reached against the other search on the way; returns
+        the new frontier and the updated best (length, ancestor).
+        """
+        stamps, epoch = bfs._marked.stamps, bfs._marked.epoch
+        edge_to, dist_to, touched = bfs.edge_to, bfs.dist_to, bfs.touched
+        other_stamps, other_epoch = other._marked.stamps, other._marked.epoch
+        other_dist = other.dist_to
+        adj = bfs.graph.adj
+        start = len(touched)
+        for v in frontier:
+            for x in adj(v):
+                if stamps[x] != epoch:
+                    stamps[x] = epoch
+                    edge_to[x] = v
+                    dist_to[x] = depth
+                    touched.append(x)
+                    if other_stamps[x] == other_epoch:
+                        d = depth + other_dist[x]
+                        if d < best or d == best and x < ancestor:
+                            best, ancestor = d, x
+        return touched[start:], best, ancestor
+
+    def length(self, v, w):
+        return self._query(v, w)[0]
 
     def ancestor(self, v, w):
-        bfs_v = BreadthFirstSearch(self.graph, v)
-        bfs_w = BreadthFirstSearch(self.graph, w)
-        return self._ancestor(v, w, bfs_v, bfs_w)
+        return self._query(v, w)[1]
 
     def hyperlength(self, vs, ws):
-        pass
+        "length of the shortest ancestral path between any v in vs and w in ws"
+        return self.length(list(vs), list(ws))
 
     def hyperancestor(self, vs, ws):
-        pass
+        "common ancestor on the path `hyperlength` measures"
+        return self.ancestor(list(vs), list(ws))
 
 
 if __name__ == '__main__':
@@ -50,7 +182,10 @@ if __name__ == '__main__':
     parser.add_argument('-f', '--fname')
     args = vars(parser.parse_args())
 
-    graph = Digraph.from_file(args['fname'])
+    if is_binary(args['fname']):
+        graph = open_graph(args['fname'])
+    else:
+        graph = Digraph.from_file(args['fname'])
     sap = SAP(graph)
 
     def process_input(prompt):
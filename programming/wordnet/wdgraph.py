@@ -5,10 +5,19 @@ import argparse
 import signal
 import sys
 
+from array import array
 from collections import defaultdict
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 from src.digraph import Digraph, DirectedCycle
-from programming.wordnet.sap import SAP
+from src.loader import is_binary, save
+from src.mapped import open_graph
+from programming.wordnet.sap import SAP, join
+from programming.wordnet.ancestors import AncestorIndex
 
 
 def check_csv(fname):
@@ -38,6 +47,18 @@ def read_hypernyms(fname):
             yield int(hypopnym), [int(h) for h in hypernyms]
 
 
+def hypernym_graph(fname):
+    "the hyponym -> hypernym digraph, one vertex per line of fname"
+    tails, heads = array('i'), array('i')
+    V = 0
+    for hyponym, hypernyms in read_hypernyms(fname):
+        V += 1
+        for hyp in hypernyms:
+            tails.append(hyponym)
+            heads.append(hyp)
+    return Digraph.from_edges(V, tails, heads)
+
+
 class SynsetNode(object):
     def __init__(self, synset_id, synsets, gloss=None):
         self.synset_id = synset_id
@@ -50,21 +71,31 @@ class SynsetNode(object):
 
 
 class WordNet(object):
-    def __init__(self, synsets, hypernyms):
-        hypernyms = {h: hs for h, hs in read_hypernyms(hypernyms)}
-        self.synsets = [None] * len(hypernyms)
-        self.graph = Digraph(len(self.synsets))
+    def __init__(self, synsets, hypernyms, cache_size=4096,
+                 ancestor_cache_size=0, index=None):
+        """
+        `hypernyms` is either the hypernyms csv or the same graph compiled
+        with `-c`, which is memory-mapped read-only and so shared by every
+        process that opens it. The cache sizes are passed on to SAP: the
+        first bounds the cache of noun pair answers `dist` and `sap` share,
+        the second enables the per-synset ancestor cache (see SAP).
+        `index` is an ancestor index file built with `-x`; if given, it
+        answers the queries instead of SAP.
+        """
+        if is_binary(hypernyms):
+            self.graph = open_graph(hypernyms)
+        else:
+            self.graph = hypernym_graph(hypernyms)
+        self.synsets = [None] * self.graph.V
         self.noun2synsets = defaultdict(list)
         for synset_id, synsets, gloss in read_synsets(synsets):
             self.synsets[synset_id] = SynsetNode(synset_id, synsets, gloss)
             for synset in synsets:
                 self.noun2synsets[synset].append(synset_id)
-            try:
-                for hyp in hypernyms[synset_id]:
-                    self.graph.add_edge(synset_id, hyp)
-            except KeyError:
-                continue
-        self._sap = SAP(self.graph)
+        if index is not None:
+            self._sap = AncestorIndex.load(index)
+        else:
+            self._sap = SAP(self.graph, cache_size, ancestor_cache_size)
 
     def is_rooted_dag(self):
         cycles = DirectedCycle(self.graph)
@@ -87,6 +118,26 @@ class WordNet(object):
         synsets_b = self.noun2synsets[noun_b]
         return self._sap.length(synsets_a, synsets_b)
 
+    def distance_matrix(self, nouns):
+        """
+        Matrix of `dist` between every pair of nouns, -1 where there is no
+        path; a numpy int array if numpy is installed, else a list of
+        lists. Each noun is searched once and each unordered pair is a
+        join of the two {ancestor: distance} maps.
+        """
+        maps = [self._sap.ancestors(self.noun2synsets.get(noun, []))
+                for noun in nouns]
+        n = len(nouns)
+        dists = [[0] * n for _ in range(n)]
+        for i in range(n):
+            if not maps[i]:
+                dists[i][i] = -1
+            for j in range(i + 1, n):
+                dists[i][j] = dists[j][i] = join(maps[i], maps[j])[0]
+        if numpy is None:
+            return dists
+        return numpy.array(dists, dtype=int)
+
     def sap(self, noun_a, noun_b):
         if not self.noun2synsets[noun_a] or not self.noun2synsets[noun_b]:
             return "Ancestor not found"
@@ -101,9 +152,26 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='WordNet')
     parser.add_argument('-s', '--synsets')
     parser.add_argument('-H', '--hypernyms')
+    parser.add_argument('-c', '--compile',
+                        help='write the hypernym graph to this binary file')
+    parser.add_argument('-x', '--build-index',
+                        help='write the ancestor index to this file')
+    parser.add_argument('-i', '--index', help='answer queries from this index')
+    parser.add_argument('--cache-size', type=int, default=4096)
+    parser.add_argument('--ancestor-cache-size', type=int, default=0)
     args = vars(parser.parse_args())
 
-    wordnet = WordNet(args['synsets'], args['hypernyms'])
+    if args['compile']:
+        save(hypernym_graph(args['hypernyms']), args['compile'])
+        sys.exit(0)
+    if args['build_index']:
+        graph = hypernym_graph(args['hypernyms'])
+        AncestorIndex.build(graph).save(args['build_index'])
+        sys.exit(0)
+
+    wordnet = WordNet(args['synsets'], args['hypernyms'],
+                      args['cache_size'], args['ancestor_cache_size'],
+                      args['index'])
 
     def process_input(prompt):
         words = prompt.strip().split(' ')
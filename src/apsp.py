@@ -0,0 +1,188 @@
+# coding: utf-8
+
+# apsp.py -- distance matrices: many sources by many targets over a pool
+# of processes, and Floyd-Warshall for all pairs of small dense graphs.
+#
+# Both return a dense float matrix, rows indexed like the sources and
+# columns like the targets, INF where there is no path: a numpy array if
+# numpy is installed, else a list of array('d') rows.
+
+from array import array
+from multiprocessing import Pool, cpu_count
+
+from src.loader import WEIGHT_TYPECODE
+from src.marks import INF
+from src.sp import AcyclicSP, SPWorkspace
+from src.weighted_dfs import WeightedTopologicalSort
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+ALGORITHMS = ('dijkstra', 'acyclic')
+
+# the graph many_to_many hands to its forked workers with, for
+# 'acyclic', its topological order, computed once before forking; for
+# 'dijkstra' each worker has its own SPWorkspace over the graph
+_graph = None
+_order = None
+_workspace = None
+
+
+def _init_worker(algorithm):
+    global _workspace
+    if algorithm == 'dijkstra':
+        _workspace = SPWorkspace(_graph)
+
+
+def _topological_order(graph):
+    order = WeightedTopologicalSort(graph).order
+    if order is None:
+        raise ValueError("Weighted Digraph has cycles")
+    return order
+
+
+def _distances(graph, algorithm, source, targets, workspace, order):
+    if algorithm == 'acyclic':
+        sp = AcyclicSP(graph, source, order)
+        return [sp.dist_to(t) for t in targets]
+    return workspace.distances(source, targets)
+
+
+def _rows(job):
+    "distance rows of a slice of the sources, as array bytes"
+    algorithm, sources, targets = job
+    rows = array(WEIGHT_TYPECODE)
+    for s in sources:
+        rows.extend(_distances(_graph, algorithm, s, targets, _workspace,
+                               _order))
+    return rows.tostring()
+
+
+def _matrix(rows, n, m):
+    "the n x m matrix of the concatenated rows (array('d') or bytes)"
+    if numpy is not None:
+        return numpy.frombuffer(rows, dtype=numpy.float64).reshape(n, m) \
+            .copy()
+    if not isinstance(rows, array):
+        rows = array(WEIGHT_TYPECODE, rows)
+    return [rows[i * m:(i + 1) * m] for i in range(n)]
+
+
+def many_to_many(graph, sources, targets=None, algorithm='dijkstra',
+                 processes=None, chunks=None):
+    """
+    Distance matrix from every vertex of sources to every vertex of
+    targets (default: all vertices). One search per source: a Dijkstra
+    that stops once all targets are settled, or AcyclicSP on a DAG with
+    algorithm='acyclic' (negative weights allowed). The sources are split
+    into `chunks` slices (default: four per process) answered by a pool
+    of `processes` forked workers, which inherit the graph copy-on-write
+    so that only the rows travel back (Unix only). processes=1 runs in
+    this process.
+    """
+    global _graph, _order
+    if algorithm not in ALGORITHMS:
+        raise ValueError("algorithm must be one of %s" % (ALGORITHMS,))
+    sources = list(sources)
+    targets = list(graph.vertices() if targets is None else targets)
+    processes = processes or cpu_count()
+    if processes == 1:
+        workspace = order = None
+        if algorithm == 'acyclic':
+            order = _topological_order(graph)
+        else:
+            workspace = SPWorkspace(graph)
+        rows = array(WEIGHT_TYPECODE)
+        for s in sources:
+            rows.extend(_distances(graph, algorithm, s, targets, workspace,
+                                   order))
+        return _matrix(rows, len(sources), len(targets))
+    chunks = min(chunks or 4 * processes, len(sources)) or 1
+    bounds = [len(sources) * i // chunks for i in range(chunks + 1)]
+    jobs = [(algorithm, sources[bounds[i]:bounds[i + 1]], targets)
+            for i in range(chunks)]
+    _graph = graph
+    if algorithm == 'acyclic':
+        _order = _topological_order(graph)
+    try:
+        pool = Pool(processes, _init_worker, (algorithm,))
+    finally:
+        _graph = _order = None
+    try:
+        rows = b''.join(pool.map(_rows, jobs))
+    except BaseException:
+        pool.terminate()
+        raise
+    else:
+        pool.close()
+    finally:
+        pool.join()
+    return _matrix(rows, len(sources), len(targets))
+
+
+def floyd_warshall(graph):
+    """
+    V x V matrix of all shortest path distances, O(V^3): for small dense
+    graphs, where it beats V Dijkstras. With numpy each round over an
+    intermediate vertex k is one vectorized minimum over the matrix.
+    Negative weights are fine; a negative cycle raises ValueError.
+    """
+    V = graph.V
+    rows = [array(WEIGHT_TYPECODE, [INF]) * V for _ in range(V)]
+    for v in range(V):
+        rows[v][v] = 0.0
+        row = rows[v]
+        for e in graph.adj(v):
+            w = e.target()
+            if e.weight < row[w]:
+                row[w] = e.weight
+    if numpy is not None:
+        dist = _matrix(b''.join(row.tostring() for row in rows), V, V)
+        for k in range(V):
+            numpy.minimum(dist, dist[:, k, None] + dist[None, k, :], out=dist)
+        negative = bool((dist.diagonal() < 0).any())
+    else:
+        dist = rows
+        for k in range(V):
+            row_k = dist[k]
+            for row in dist:
+                d_k = row[k]
+                if d_k == INF:
+                    continue
+                for w in range(V):
+                    d = d_k + row_k[w]
+                    if d < row[w]:
+                        row[w] = d
+        negative = any(dist[v][v] < 0 for v in range(V))
+    if negative:
+        raise ValueError("graph has a negative cycle")
+    return dist
+
+
+if __name__ == '__main__':
+    from argparse import ArgumentParser
+    from src.weighted_digraph import WeightedDigraph
+
+    parser = ArgumentParser(description='distance matrices')
+    parser.add_argument('-f', '--fname')
+    parser.add_argument('-S', '--sources', type=int, nargs='+')
+    parser.add_argument('-T', '--targets', type=int, nargs='+')
+    parser.add_argument('-a', '--algorithm', default='dijkstra',
+                        choices=ALGORITHMS + ('floyd',))
+    parser.add_argument('-p', '--processes', type=int)
+    args = vars(parser.parse_args())
+
+    graph = WeightedDigraph.from_file(args['fname'])
+    sources = args['sources'] or graph.vertices()
+    targets = args['targets'] or graph.vertices()
+    if args['algorithm'] == 'floyd':
+        dist = floyd_warshall(graph)
+        matrix = [[dist[s][t] for t in targets] for s in sources]
+    else:
+        matrix = many_to_many(graph, sources, targets, args['algorithm'],
+                              args['processes'])
+    print("      " + " ".join("%7d" % t for t in targets))
+    for s, row in zip(sources, matrix):
+        print("%5d " % s + " ".join("%7.2f" % d for d in row))
@@ -2,44 +2,79 @@
 
 from collections import deque
 
-INF = float("inf")
+from marks import Marks, INF, distances, vertex_slots
 
 
-class BreadthFirstSearch(object):
-    def __init__(self, graph, source):
-        self._marked = set()
-        self.edge_to = [None] * graph.V
-        self.dist_to = [INF] * graph.V
-        if hasattr(source, '__iter__'):
-            self.hyperbfs(graph, source)
-        else:
-            self.bfs(graph, source)
-
-    def _bfs_loop(self, graph, q):
+class BFSWorkspace(object):
+    """
+    Breadth-first search state bound to one graph and reused across
+    searches: buffers are allocated once, and each `search` only resets
+    the vertices the previous one reached (`touched`). Not safe to share
+    between threads; use one workspace per searcher.
+    """
+    def __init__(self, graph):
+        self.graph = graph
+        self._marked = Marks(graph.V)
+        self.edge_to = vertex_slots(graph.V)
+        self.dist_to = distances(graph.V)
+        self.touched = []
+
+    def _reset(self):
+        edge_to, dist_to = self.edge_to, self.dist_to
+        for v in self.touched:
+            edge_to[v] = -1
+            dist_to[v] = INF
+        del self.touched[:]
+        self._marked.reset()
+
+    def search(self, source, targets=None):
+        """
+        BFS from source, or from every vertex in it at distance 0 if it is
+        iterable. Given `targets`, the search stops as soon as all of them
+        have been reached, at which point their distances are final.
+        """
+        q = deque(self.start(source))
+        stamps, epoch = self._marked.stamps, self._marked.epoch
+        edge_to, dist_to, touched = self.edge_to, self.dist_to, self.touched
+        pending = None
+        if targets is not None:
+            pending = set(targets)
+            pending.difference_update(touched)
+            if not pending:
+                return self
+        adj = self.graph.adj
         while len(q) != 0:
             v = q.popleft()
-            for w in graph.adj(v):
-                if w not in self._marked:
-                    assert self.dist_to[v] != INF
-                    self.edge_to[w] = v
-                    self.dist_to[w] = self.dist_to[v] + 1
-                    self._marked.add(w)
+            d = dist_to[v] + 1
+            for w in adj(v):
+                if stamps[w] != epoch:
+                    edge_to[w] = v
+                    dist_to[w] = d
+                    stamps[w] = epoch
+                    touched.append(w)
                     q.append(w)
+                    if pending is not None and w in pending:
+                        pending.discard(w)
+                        if not pending:
+                            return self
+        return self
 
-    def bfs(self, graph, v):
-        q = deque()
-        self.dist_to[v] = 0
-        self._marked.add(v)
-        q.append(v)
-        self._bfs_loop(graph, q)
-
-    def hyperbfs(self, graph, vs):
-        q = deque()
-        for v in vs:
-            self._marked.add(v)
-            self.dist_to[v] = 0
-            q.append(v)
-        self._bfs_loop(graph, q)
+    def start(self, source):
+        """
+        Resets the workspace and marks source (a vertex or an iterable of
+        vertices) at distance 0; returns them, the first frontier of a
+        level by level search.
+        """
+        self._reset()
+        sources = source if hasattr(source, '__iter__') else [source]
+        stamps, epoch = self._marked.stamps, self._marked.epoch
+        dist_to, touched = self.dist_to, self.touched
+        for v in sources:
+            if stamps[v] != epoch:
+                stamps[v] = epoch
+                dist_to[v] = 0
+                touched.append(v)
+        return touched[:]
 
     def has_path(self, v):
         return v in self._marked
@@ -54,3 +89,10 @@ class BreadthFirstSearch(object):
             x = self.edge_to[x]
         path.appendleft(x)
         return path
+
+
+class BreadthFirstSearch(BFSWorkspace):
+    "one-off search from source (a vertex or an iterable of vertices)"
+    def __init__(self, graph, source):
+        super(BreadthFirstSearch, self).__init__(graph)
+        self.search(source)
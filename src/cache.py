@@ -0,0 +1,47 @@
+# coding: utf-8
+
+from collections import OrderedDict
+
+
+class LRUCache(object):
+    """
+    Dictionary of at most `maxsize` entries that evicts the least recently
+    used one to make room. `hits` and `misses` count `get` lookups.
+    """
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, key, default=None):
+        entries = self._entries
+        if key not in entries:
+            self.misses += 1
+            return default
+        self.hits += 1
+        value = entries.pop(key)
+        entries[key] = value            # back to the most recent end
+        return value
+
+    def __setitem__(self, key, value):
+        entries = self._entries
+        if key in entries:
+            del entries[key]
+        entries[key] = value
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+
+    def __contains__(self, key):
+        "membership test; neither counted nor refreshing the entry"
+        return key in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def __str__(self):
+        return "<LRUCache size=%d/%d, hits=%d, misses=%d>" % \
+            (len(self), self.maxsize, self.hits, self.misses)
@@ -1,31 +1,37 @@
 # coding: utf-8
 
+from array import array
+from multiprocessing import Pool, cpu_count
+
+from dfs import depth_first, PRE
+from marks import Marks, filled, vertex_slots
+from union_find import IntUnionFind
+
 
 class ConnectedComponents(object):
     def __init__(self, graph):
-        self._marked = set()
-        self.ids = [None] * graph.V
-        self.size = [0] * graph.V
+        self._marked = Marks(graph.V)
+        self.ids = vertex_slots(graph.V)
+        self.size = filled('l', graph.V, 0)
         self._count = 0
         for v in range(graph.V):
             if v not in self._marked:
                 self.dfs(graph, v)
                 self._count += 1
 
-    def dfs(self, graph, v):
-        self._marked.add(v)
-        self.ids[v] = self._count
-        self.size[self._count] += 1
-        for w in graph.adj(v):
-            if w not in self._marked:
-                self.dfs(graph, w)
+    def dfs(self, graph, source):
+        events = depth_first(graph, source, self._marked, nontree=False)
+        for event, v, w, e in events:
+            if event == PRE:
+                self.ids[v] = self._count
+                self.size[self._count] += 1
 
     def connected(self, v, w):
         return self.ids[v] == self.ids[w]
 
     def components(self):
         cs = [[] for c in range(self._count)]
-        for v in range(len(self._marked)):
+        for v in range(len(self.ids)):
             cs[self.ids[v]].append(v)
         return cs
 
@@ -34,3 +40,122 @@ class ConnectedComponents(object):
 
     def count(self):
         return self._count
+
+
+def edge_arrays(graph):
+    "(tails, heads) arrays with every edge of an unweighted graph"
+    if hasattr(graph, 'targets'):       # CSR: both arrays are at hand
+        return graph._tails(), graph.targets
+    tails, heads = array('l'), array('l')
+    for v in range(graph.V):
+        adj = graph.adj(v)
+        tails.extend([v] * len(adj))
+        heads.extend(adj)
+    return tails, heads
+
+
+class UnionFindCC(ConnectedComponents):
+    """
+    ConnectedComponents from a single bulk pass of an IntUnionFind over the
+    edge list instead of a traversal. Component ids are numbered by their
+    smallest vertex, as the DFS numbers them, so both give the same ids.
+    """
+    def __init__(self, graph):
+        self._label(graph.V, self._forest(graph.V, *edge_arrays(graph)))
+
+    @classmethod
+    def from_edges(cls, V, tails, heads):
+        "components of an edge list (e.g. src.loader.read_edges), no graph"
+        cc = cls.__new__(cls)
+        cc._label(V, cc._forest(V, tails, heads))
+        return cc
+
+    def _forest(self, V, tails, heads):
+        uf = IntUnionFind(V)
+        uf.union_many(tails, heads, n_sets=1)
+        return uf
+
+    def _label(self, V, uf):
+        self.ids = vertex_slots(V)
+        self.size = filled('l', V, 0)
+        self._count = 0
+        roots = uf.find_many(range(V))
+        label = vertex_slots(V)
+        for v in range(V):
+            root = roots[v]
+            if label[root] == -1:
+                label[root] = self._count
+                self._count += 1
+            self.ids[v] = label[root]
+            self.size[label[root]] += 1
+
+    def marked(self, v):
+        return True     # every vertex is labelled
+
+
+# edge arrays ParallelCC hands to its forked workers
+_edges = None
+
+
+def _partial_forest(job):
+    """
+    union-finds one slice of the shared edge list; returns the vertices it
+    joined to another and their roots, as (vertices, roots) array bytes
+    """
+    V, start, end = job
+    tails, heads = _edges
+    uf = IntUnionFind(V)
+    uf.union_many(tails[start:end], heads[start:end])
+    parents, find = uf.parents, uf.find
+    vertices, roots = array('l'), array('l')
+    for v in range(V):
+        if parents[v] != v:
+            vertices.append(v)
+            roots.append(find(v))
+    return vertices.tostring(), roots.tostring()
+
+
+class ParallelCC(UnionFindCC):
+    """
+    UnionFindCC over a pool of processes: every worker union-finds one
+    chunk of the edge list into a partial forest, and the forests, a pair
+    (v, root) for each vertex a chunk joined, are merged in a final
+    union-find. Workers are forked and inherit the edge arrays, so nothing
+    but the forests is copied between processes (Unix only).
+    """
+    def __init__(self, graph, processes=None, chunks=None):
+        self.processes, self.chunks = processes, chunks
+        super(ParallelCC, self).__init__(graph)
+
+    @classmethod
+    def from_edges(cls, V, tails, heads, processes=None, chunks=None):
+        cc = cls.__new__(cls)
+        cc.processes, cc.chunks = processes, chunks
+        cc._label(V, cc._forest(V, tails, heads))
+        return cc
+
+    def _forest(self, V, tails, heads):
+        global _edges
+        processes = self.processes or cpu_count()
+        chunks = self.chunks or processes
+        E = len(tails)
+        bounds = [E * i // chunks for i in range(chunks + 1)]
+        jobs = [(V, bounds[i], bounds[i + 1]) for i in range(chunks)]
+        _edges = (tails, heads)
+        try:
+            pool = Pool(processes)
+        finally:
+            _edges = None
+        try:
+            forests = pool.imap_unordered(_partial_forest, jobs)
+            uf = IntUnionFind(V)
+            for vertices, roots in forests:
+                uf.union_many(array('l', vertices), array('l', roots))
+        except BaseException:
+            pool.terminate()        # no workers left behind on a failure
+            raise
+        else:
+            pool.close()
+        finally:
+            pool.join()
+        return uf
@@ -0,0 +1,372 @@
+# coding: utf-8
+
+# ch.py -- contraction hierarchies: shortest path queries on a static
+# edge-weighted digraph (non-negative weights) after offline preprocessing.
+#
+# Vertices are contracted one at a time, least important first; removing
+# v adds a shortcut u->w (weight u->v->w, middle vertex v) for every pair
+# of neighbours whose only shortest path ran through v. Every edge is then
+# stored with the endpoint contracted first, so that both searches of a
+# query only climb: `up` row v lists the edges v->w and `down` row v the
+# edges u->v, towards vertices w and u of higher rank. Each row is the CSR
+# layout of src/csr.py plus the middle vertex of every entry (-1 for an
+# original edge), which is all a shortcut needs to be unpacked. The binary
+# file is
+#
+#   header     32 bytes: magic, version, flags, V, up, down (struct HEADER)
+#   rank       V int32
+#   up         (V + 1) int64 offsets, then int32 targets, float64 weights
+#              and int32 middles, up entries each
+#   down       the same, down entries each
+
+import heapq
+import struct
+import sys
+from array import array
+
+from src.loader import OFFSET_TYPECODE, VERTEX_TYPECODE, WEIGHT_TYPECODE
+from src.loader import BIG_ENDIAN
+from src.marks import INF, distances, vertex_slots
+from src.pqueue import IndexMinPQ
+from src.weighted_digraph import DirectedEdge
+
+MAGIC = b'CHIE'
+VERSION = 1
+HEADER = struct.Struct('<4sBBBBqqq')
+SETTLE_LIMIT = 64
+
+
+class Rows(object):
+    "CSR rows of (target, weight, middle) entries"
+    def __init__(self, offsets, targets, weights, middles):
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+        self.middles = middles
+
+    @classmethod
+    def from_lists(cls, rows):
+        "from one list of (target, weight, middle) per vertex"
+        offsets = array(OFFSET_TYPECODE, [0])
+        targets, middles = array(VERTEX_TYPECODE), array(VERTEX_TYPECODE)
+        weights = array(WEIGHT_TYPECODE)
+        for row in rows:
+            for w, weight, middle in row:
+                targets.append(w)
+                weights.append(weight)
+                middles.append(middle)
+            offsets.append(len(targets))
+        return cls(offsets, targets, weights, middles)
+
+    def __len__(self):
+        return len(self.targets)
+
+    def arrays(self):
+        return self.offsets, self.targets, self.weights, self.middles
+
+    def find(self, v, w):
+        "slot of the entry of row v with target w"
+        targets = self.targets
+        for i in range(self.offsets[v], self.offsets[v + 1]):
+            if targets[i] == w:
+                return i
+        raise KeyError((v, w))
+
+
+class Contraction(object):
+    """
+    The preprocessing state: the remaining graph as per-vertex dicts of
+    {neighbour: (weight, middle)}, the in-edges mirrored so that both
+    sides of a vertex are at hand, and the rows recorded so far. Witness
+    searches stop after `settle_limit` vertices; when one gives up the
+    shortcut is added anyway, which costs space but never correctness.
+    """
+    def __init__(self, graph, settle_limit=SETTLE_LIMIT):
+        self.V = graph.V
+        self.settle_limit = settle_limit
+        self.out = [dict() for _ in range(graph.V)]
+        self.into = [dict() for _ in range(graph.V)]
+        for v in graph.vertices():
+            for e in graph.adj(v):
+                w = e.target()
+                if w != v and e.weight < self.out[v].get(w, (INF,))[0]:
+                    self.out[v][w] = self.into[w][v] = (e.weight, -1)
+        self.rank = vertex_slots(graph.V)
+        self.deleted = array('l', [0]) * graph.V
+        self.up, self.down = [None] * graph.V, [None] * graph.V
+        self.shortcuts = 0
+
+    def _witnesses(self, u, v, targets, limit):
+        "distances from u avoiding v, up to limit or settle_limit vertices"
+        out, settle_limit = self.out, self.settle_limit
+        dist = {u: 0.0}
+        heap, settled, pending = [(0.0, u)], 0, len(targets)
+        while heap and pending and settled < settle_limit:
+            d, x = heapq.heappop(heap)
+            if d > dist[x]:
+                continue
+            if d > limit:
+                break
+            settled += 1
+            if x in targets:
+                pending -= 1
+            for y, (weight, _) in out[x].iteritems():
+                if y == v:
+                    continue
+                dy = d + weight
+                if dy < dist.get(y, INF):
+                    dist[y] = dy
+                    heapq.heappush(heap, (dy, y))
+        return dist
+
+    def shortcuts_of(self, v):
+        "the (u, w, weight) shortcuts contracting v would need"
+        out_v = self.out[v]
+        needed = []
+        for u, (weight_u, _) in self.into[v].iteritems():
+            vias = dict((w, weight_u + weight_w)
+                        for w, (weight_w, _) in out_v.iteritems() if w != u)
+            if not vias:
+                continue
+            dist = self._witnesses(u, v, vias, max(vias.itervalues()))
+            for w, via in vias.iteritems():
+                if dist.get(w, INF) > via:
+                    needed.append((u, w, via))
+        return needed
+
+    def priority(self, v, shortcuts):
+        """
+        Twice the edge difference (shortcuts added less edges removed)
+        plus the contracted neighbours, which spreads the contraction
+        evenly over the graph: lower goes first.
+        """
+        removed = len(self.out[v]) + len(self.into[v])
+        return 2 * (len(shortcuts) - removed) + self.deleted[v]
+
+    def contract(self, v, shortcuts, rank):
+        out, into = self.out, self.into
+        self.rank[v] = rank
+        self.up[v] = [(w, weight, m) for w, (weight, m) in out[v].iteritems()]
+        self.down[v] = [(u, weight, m)
+                        for u, (weight, m) in into[v].iteritems()]
+        for w in out[v]:
+            del into[w][v]
+            self.deleted[w] += 1
+        for u in into[v]:
+            del out[u][v]
+            self.deleted[u] += 1
+        out[v], into[v] = {}, {}
+        for u, w, via in shortcuts:
+            if via < out[u].get(w, (INF,))[0]:
+                out[u][w] = into[w][u] = (via, v)
+                self.shortcuts += 1
+
+    def run(self):
+        """
+        Lazy updates: the vertex on top of the queue gets its priority
+        recomputed and is only contracted if it is still the smallest.
+        """
+        queue = IndexMinPQ(self.V)
+        for v in range(self.V):
+            queue.insert(v, self.priority(v, self.shortcuts_of(v)))
+        rank = 0
+        while queue.size:
+            v = queue.del_min()
+            shortcuts = self.shortcuts_of(v)
+            priority = self.priority(v, shortcuts)
+            if queue.size and priority > queue.keys[queue.pq[0]]:
+                queue.insert(v, priority)
+                continue
+            self.contract(v, shortcuts, rank)
+            rank += 1
+        return self
+
+
+class ContractionHierarchy(object):
+    """
+    The contracted graph: `rank` (the contraction order) and the `up` and
+    `down` Rows. Build it once with `build`, `save` it and `load` it
+    where queries are served; queries go through a CHQuery.
+    """
+    def __init__(self, V, rank, up, down):
+        self.V = V
+        self.rank = rank
+        self.up = up
+        self.down = down
+
+    @classmethod
+    def build(cls, graph, settle_limit=SETTLE_LIMIT):
+        contraction = Contraction(graph, settle_limit).run()
+        return cls(graph.V, array(VERTEX_TYPECODE, contraction.rank),
+                   Rows.from_lists(contraction.up),
+                   Rows.from_lists(contraction.down))
+
+    def save(self, fname):
+        flags = BIG_ENDIAN if sys.byteorder == 'big' else 0
+        with open(fname, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, flags, 0, 0,
+                                self.V, len(self.up), len(self.down)))
+            array(VERTEX_TYPECODE, self.rank).tofile(f)
+            for rows in (self.up, self.down):
+                for a in rows.arrays():
+                    a.tofile(f)
+
+    @classmethod
+    def load(cls, fname):
+        with open(fname, 'rb') as f:
+            magic, version, flags, _, _, V, n_up, n_down = HEADER.unpack(
+                f.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("%s is not a contraction hierarchy" % fname)
+            rank = array(VERTEX_TYPECODE)
+            rank.fromfile(f, V)
+            tables = [rank]
+            for n in (n_up, n_down):
+                rows = (array(OFFSET_TYPECODE), array(VERTEX_TYPECODE),
+                        array(WEIGHT_TYPECODE), array(VERTEX_TYPECODE))
+                for a, size in zip(rows, (V + 1, n, n, n)):
+                    a.fromfile(f, size)
+                tables.append(Rows(*rows))
+        if bool(flags & BIG_ENDIAN) != (sys.byteorder == 'big'):
+            rank.byteswap()
+            for rows in tables[1:]:
+                for a in rows.arrays():
+                    a.byteswap()
+        return cls(V, *tables)
+
+    def nbytes(self):
+        return len(self.rank) * self.rank.itemsize + \
+            sum(len(a) * a.itemsize
+                for rows in (self.up, self.down) for a in rows.arrays())
+
+    def unpack(self, u, w, weight, middle):
+        "the original DirectedEdges behind the entry u->w"
+        up, down = self.up, self.down
+        edges, stack = [], [(u, w, weight, middle)]
+        while stack:
+            u, w, weight, m = stack.pop()
+            if m == -1:
+                edges.append(DirectedEdge(u, w, weight))
+                continue
+            i, j = down.find(m, u), up.find(m, w)       # u->m, m->w
+            stack.append((m, w, up.weights[j], up.middles[j]))
+            stack.append((u, m, down.weights[i], down.middles[i]))
+        return edges
+
+
+class CHQuery(object):
+    """
+    Query engine over a ContractionHierarchy: a forward search climbing
+    `up` from the source and a backward one climbing `down` from the
+    target, each stopping once its queue top reaches the best meeting
+    distance. Buffers are reused across queries, like SPWorkspace's; one
+    CHQuery per thread. `settled` counts the vertices of the last query.
+    """
+    arity = 4       # of the IndexMinPQ heaps
+
+    def __init__(self, hierarchy):
+        self.hierarchy = hierarchy
+        V = hierarchy.V
+        self._sides = []            # (rows, dist_to, pred, slot, touched, q)
+        for rows in (hierarchy.up, hierarchy.down):
+            self._sides.append((rows, distances(V), vertex_slots(V),
+                                vertex_slots(V), [],
+                                IndexMinPQ(V, self.arity)))
+        self.settled = 0
+        self._meet = -1
+
+    def _reset(self):
+        for _, dist_to, pred, slot, touched, q in self._sides:
+            for v in touched:
+                dist_to[v] = INF
+                pred[v] = slot[v] = -1
+            del touched[:]
+            q.clear()
+        self.settled = 0
+
+    def distance(self, source, target):
+        "length of a shortest source->target path, INF if there is none"
+        self._reset()
+        for (_, dist_to, _, _, touched, q), s in zip(self._sides,
+                                                     (source, target)):
+            dist_to[s] = 0.0
+            touched.append(s)
+            q.insert(s, 0.0)
+        forward, backward = self._sides
+        best, self._meet = INF, -1
+        while True:
+            qf, qb = forward[5], backward[5]
+            top_f = qf.keys[qf.pq[0]] if qf.size else INF
+            top_b = qb.keys[qb.pq[0]] if qb.size else INF
+            if min(top_f, top_b) >= best:
+                break
+            side, other = (forward, backward) if top_f <= top_b \
+                else (backward, forward)
+            rows, dist_to, pred, slot, touched, q = side
+            v = q.del_min()
+            self.settled += 1
+            dist_v = dist_to[v]
+            if dist_v + other[1][v] < best:
+                best, self._meet = dist_v + other[1][v], v
+            targets, weights = rows.targets, rows.weights
+            for i in range(rows.offsets[v], rows.offsets[v + 1]):
+                w = targets[i]
+                dist = dist_v + weights[i]
+                if dist_to[w] > dist:
+                    if dist_to[w] == INF:
+                        touched.append(w)
+                    dist_to[w] = dist
+                    pred[w], slot[w] = v, i
+                    q.update(dist, w)
+        return best
+
+    def shortest_path(self, source, target):
+        """
+        (distance, edges) like src.sp.shortest_path: the edges are the
+        original DirectedEdges, shortcuts unpacked; (INF, None) if there
+        is no path.
+        """
+        dist = self.distance(source, target)
+        if dist == INF:
+            return INF, None
+        (up, _, pred_f, slot_f, _, _), (down, _, pred_b, slot_b, _, _) = \
+            self._sides
+        unpack = self.hierarchy.unpack
+        halves, x = [], self._meet
+        while pred_f[x] != -1:                  # source ... -> meet
+            i = slot_f[x]
+            halves.append(unpack(pred_f[x], x, up.weights[i], up.middles[i]))
+            x = pred_f[x]
+        halves.reverse()
+        x = self._meet
+        while pred_b[x] != -1:                  # meet -> ... target
+            i = slot_b[x]
+            halves.append(unpack(x, pred_b[x], down.weights[i],
+                                 down.middles[i]))
+            x = pred_b[x]
+        return dist, [e for edges in halves for e in edges]
+
+
+if __name__ == '__main__':
+    from argparse import ArgumentParser
+    from src.weighted_digraph import WeightedDigraph
+
+    parser = ArgumentParser(description='contraction hierarchies')
+    parser.add_argument('-f', '--fname', help='edge list to contract')
+    parser.add_argument('-o', '--output', help='hierarchy file to write')
+    parser.add_argument('-i', '--index', help='hierarchy file to query')
+    parser.add_argument('-q', '--query', type=int, nargs=2,
+                        metavar=('SOURCE', 'TARGET'))
+    args = vars(parser.parse_args())
+
+    if args['index']:
+        hierarchy = ContractionHierarchy.load(args['index'])
+    else:
+        hierarchy = ContractionHierarchy.build(
+            WeightedDigraph.from_file(args['fname']))
+    if args['output']:
+        hierarchy.save(args['output'])
+    if args['query']:
+        dist, path = CHQuery(hierarchy).shortest_path(*args['query'])
+        print("%d to %d (%.2f): %s" % (args['query'][0], args['query'][1],
+                                       dist, "\t".join(map(str, path or []))))
@@ -0,0 +1,210 @@
+# coding: utf-8
+
+# csr.py -- frozen, compressed sparse row versions of the graph classes.
+#
+# The adjacency of vertex v lives in targets[offsets[v]:offsets[v + 1]]
+# (and weights[...] for edge-weighted graphs), all held in flat typed
+# arrays. Weighted variants build their Edge/DirectedEdge objects on the
+# fly in `adj`, so the algorithms written against the mutable classes run
+# unchanged on the frozen ones.
+
+from array import array
+
+from src.loader import OFFSET_TYPECODE, VERTEX_TYPECODE, WEIGHT_TYPECODE
+from src.loader import read_edges
+from src.graph import Graph
+from src.digraph import Digraph
+from src.weighted_graph import WeightedGraph, Edge
+from src.weighted_digraph import WeightedDigraph, DirectedEdge
+
+
+def compress(V, tails, heads, weights=None, directed=True):
+    """
+    Counting sort of the edge list (tails[i], heads[i]) into CSR arrays.
+    Undirected edges are stored in both endpoints' rows. Rows keep the
+    insertion order of the edge list, as the list-of-lists graphs do.
+    """
+    offsets = array(OFFSET_TYPECODE, [0]) * (V + 1)
+    for v in tails:
+        offsets[v + 1] += 1
+    if not directed:
+        for w in heads:
+            offsets[w + 1] += 1
+    for v in range(V):
+        offsets[v + 1] += offsets[v]
+    size = offsets[V]
+    targets = array(VERTEX_TYPECODE, [0]) * size
+    ws = None if weights is None else array(WEIGHT_TYPECODE, [0.0]) * size
+    fill = offsets[:V]
+    for i in range(len(tails)):
+        v, w = tails[i], heads[i]
+        if not directed:        # mirrors Graph.add_edge: w's row first
+            slot = fill[w]
+            fill[w] = slot + 1
+            targets[slot] = v
+            if ws is not None:
+                ws[slot] = weights[i]
+        slot = fill[v]
+        fill[v] = slot + 1
+        targets[slot] = w
+        if ws is not None:
+            ws[slot] = weights[i]
+    return offsets, targets, ws
+
+
+class CSRGraph(Graph):
+    "immutable undirected graph in compressed sparse row form"
+    directed = False
+    weighted = False
+
+    def __init__(self, V, offsets, targets, weights=None, E=None):
+        self.V = V
+        self.E = E if E is not None else len(targets) // 2
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+
+    @classmethod
+    def from_edges(cls, V, tails, heads, weights=None):
+        if not cls.weighted:
+            weights = None
+        elif weights is None:
+            weights = array(WEIGHT_TYPECODE, [0.0]) * len(tails)
+        offsets, targets, weights = \
+            compress(V, tails, heads, weights, directed=cls.directed)
+        return cls(V, offsets, targets, weights, E=len(tails))
+
+    @classmethod
+    def from_graph(cls, graph):
+        "copies the rows of a list-of-lists graph, keeping adjacency order"
+        offsets = array(OFFSET_TYPECODE, [0]) * (graph.V + 1)
+        targets = array(VERTEX_TYPECODE)
+        weights = array(WEIGHT_TYPECODE) if cls.weighted else None
+        for v in range(graph.V):
+            for x in graph.adj(v):
+                w, weight = cls._unpack(v, x)
+                targets.append(w)
+                if weights is not None:
+                    weights.append(weight)
+            offsets[v + 1] = len(targets)
+        return cls(graph.V, offsets, targets, weights, E=graph.E)
+
+    @staticmethod
+    def _unpack(v, w):
+        return w, None
+
+    @classmethod
+    def from_file(cls, fname, compact=True):
+        V, tails, heads, weights = read_edges(fname)
+        return cls.from_edges(V, tails, heads, weights)
+
+    @classmethod
+    def _frozen_class(cls):
+        return cls
+
+    def freeze(self):
+        return self
+
+    def add_edge(self, v, w, *args, **kwargs):
+        raise TypeError("%s is immutable" % type(self).__name__)
+
+    def adj(self, v):
+        self._validate_vertex(v)
+        return self.targets[self.offsets[v]:self.offsets[v + 1]]
+
+    def degree(self, v):
+        self._validate_vertex(v)
+        return self.offsets[v + 1] - self.offsets[v]
+
+    def edges(self):
+        edges = []
+        for v in range(self.V):
+            self_loops = 0
+            for w in self.adj(v):
+                if w > v:
+                    edges.append((v, w))
+                elif w == v:
+                    if self_loops % 2 == 0:  # self loops will be consecutive
+                        edges.append((v, w))
+                    self_loops += 1
+        return edges
+
+    def _tails(self):
+        "origin vertex of every slot in `targets`"
+        tails = array(VERTEX_TYPECODE, [0]) * len(self.targets)
+        for v in range(self.V):
+            for i in range(self.offsets[v], self.offsets[v + 1]):
+                tails[i] = v
+        return tails
+
+    def __str__(self):
+        s = str(self.V) + " vertices, " + str(self.E) + " edges"
+        s += "\n"
+        for v in range(self.V):
+            s += str(v) + ": " + " ".join([str(x) for x in self.adj(v)])
+            s += "\n"
+        return s
+
+
+class CSRDigraph(CSRGraph, Digraph):
+    "immutable digraph in compressed sparse row form"
+    directed = True
+
+    def edges(self):
+        return [(v, w) for v in range(self.V) for w in self.adj(v)]
+
+    def _build_reverse(self):
+        return self._frozen_class().from_edges(
+            self.V, self.targets, self._tails(), self.weights)
+
+    def _count_indegrees(self):
+        indegree = array(OFFSET_TYPECODE, [0]) * self.V
+        for w in self.targets:
+            indegree[w] += 1
+        return indegree
+
+
+class CSRWeightedGraph(CSRGraph, WeightedGraph):
+    "immutable edge-weighted graph; `adj` yields fresh Edge objects"
+    weighted = True
+
+    @staticmethod
+    def _unpack(v, e):
+        return e.other(v), e.weight
+
+    def adj(self, v):
+        self._validate_vertex(v)
+        targets, weights = self.targets, self.weights
+        return [Edge(v, targets[i], weights[i])
+                for i in range(self.offsets[v], self.offsets[v + 1])]
+
+    def edges(self):
+        edges = []
+        for v in range(self.V):
+            self_loops = 0
+            for e in self.adj(v):
+                if e.w > v:
+                    edges.append(e)
+                elif e.w == v:
+                    if self_loops % 2 == 0:
+                        edges.append(e)
+                    self_loops += 1
+        return edges
+
+
+class CSRWeightedDigraph(CSRDigraph, WeightedDigraph):
+    "immutable edge-weighted digraph; `adj` yields fresh DirectedEdge objects"
+    weighted = True
+
+    @staticmethod
+    def _unpack(v, e):
+        return e.target(), e.weight
+
+    def adj(self, v):
+        self._validate_vertex(v)
+        targets, weights = self.targets, self.weights
+        return [DirectedEdge(v, targets[i], weights[i])
+                for i in range(self.offsets[v], self.offsets[v + 1])]
+
+    def edges(self):
+        return [e for v in range(self.V) for e in self.adj(v)]
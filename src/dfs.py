@@ -1,22 +1,67 @@
 # coding: utf-8
+from array import array
 from collections import deque
 
+from marks import Marks, vertex_slots
+
+PRE, POST, TREE, NONTREE = 'pre', 'post', 'tree', 'nontree'
+
+
+def depth_first(graph, source, marked, other=None, nontree=True):
+    """
+    Explicit-stack depth-first search from `source`, so path-like graphs
+    of any length are fine with the default recursion limit. `marked` is
+    a src.marks.Marks and is updated in place. The traversal yields
+    (event, v, w, e) tuples in the order of the classic recursive version:
+    -> (PRE, v, None, None) when v is first reached
+    -> (TREE, v, w, e) right before descending along e from v to unmarked w
+    -> (NONTREE, v, w, e) for an edge e from v to an already marked w
+    -> (POST, v, None, None) once all of v's edges have been explored
+    `other(v, e)` maps an adjacency entry of v to its far endpoint; by
+    default the entries are the neighbouring vertices themselves. Callers
+    that don't look at NONTREE events can skip them with nontree=False.
+    """
+    stamps, epoch = marked.stamps, marked.epoch
+    stamps[source] = epoch
+    yield PRE, source, None, None
+    stack = [(source, iter(graph.adj(source)))]
+    while stack:
+        v, entries = stack[-1]
+        for e in entries:
+            w = e if other is None else other(v, e)
+            if stamps[w] != epoch:
+                yield TREE, v, w, e
+                stamps[w] = epoch
+                yield PRE, w, None, None
+                stack.append((w, iter(graph.adj(w))))
+                break
+            if nontree:
+                yield NONTREE, v, w, e
+        else:
+            stack.pop()
+            yield POST, v, None, None
+
+
+def edge_target(v, e):
+    "far endpoint of a directed weighted edge"
+    return e.target()
+
 
 class DepthFirstSearch(object):
     def __init__(self, graph, source):
-        self._marked = set()
+        self._marked = Marks(graph.V)
         self._count = 0
+        self._V = graph.V
         self.dfs(graph, source)
 
     def dfs(self, graph, source):
-        self._count += 1
-        self._marked.add(source)
-        for v in graph.adj(source):
-            if v not in self._marked:
-                self.dfs(graph, v)
+        events = depth_first(graph, source, self._marked, nontree=False)
+        for event, v, w, e in events:
+            if event == PRE:
+                self._count += 1
 
     def connected(self):
-        return self._count == len(self._marked)  # graph.V
+        return self._count == self._V
 
     def marked(self, v):
         return v in self._marked
@@ -27,17 +72,16 @@ class DepthFirstSearch(object):
 
 class DepthFirstPaths(object):
     def __init__(self, graph, source):
-        self._marked = set()
-        self.edge_to = [None] * graph.V
+        self._marked = Marks(graph.V)
+        self.edge_to = vertex_slots(graph.V)
         self.source = source
         self.dfs(graph, source)
 
-    def dfs(self, graph, v):
-        self._marked.add(v)
-        for w in graph.adj(v):
-            if v not in self._marked:
+    def dfs(self, graph, source):
+        events = depth_first(graph, source, self._marked, nontree=False)
+        for event, v, w, e in events:
+            if event == TREE:
                 self.edge_to[w] = v
-                self.dfs(graph, w)
 
     def has_path(self, v):
         return v in self._marked
@@ -54,27 +98,39 @@ class DepthFirstPaths(object):
         return path
 
     def marked(self, v):
-        return v in self._marked[v]
+        return v in self._marked
 
     def count(self, v):
-        return self._count
+        return len(self._marked)
 
 
 class Cycle(object):
+    """
+    Whether an undirected graph has a cycle. Every edge is seen from both
+    ends, so the one entry of v leading back to its DFS parent is the
+    tree edge itself; any other edge to a marked vertex, a second
+    (parallel) edge to the parent or a self-loop closes a cycle.
+    """
     def __init__(self, graph):
-        self._marked = set()
+        self._marked = Marks(graph.V)
         self._has_cycle = False
+        self._parent = vertex_slots(graph.V)
+        self._up = bytearray(graph.V)   # whether v's tree edge was seen
         for v in graph.vertices():
             if v not in self._marked:
-                self.dfs(graph, v, v)
-
-    def dfs(self, graph, v, u):
-        self._marked.add(v)
-        for w in graph.adj(v):
-            if w not in self._marked:
-                self.dfs(graph, w, v)
-            elif w == u:
-                self._has_cycle = True
+                self.dfs(graph, v, -1)
+
+    def dfs(self, graph, source, u):
+        parent, up = self._parent, self._up
+        parent[source] = u
+        for event, v, w, e in depth_first(graph, source, self._marked):
+            if event == TREE:
+                parent[w] = v
+            elif event == NONTREE:
+                if w == parent[v] and not up[v]:
+                    up[v] = True
+                else:
+                    self._has_cycle = True
 
     def has_cycle(self):
         return self._has_cycle
@@ -82,14 +138,12 @@ class Cycle(object):
 
 class DirectedDFS(object):
     def __init__(self, graph, source):
-        self._marked = set()
+        self._marked = Marks(graph.V)
         self.dfs(graph, source)
 
-    def dfs(self, graph, v):
-        self._marked.add(v)
-        for w in graph.adj(v):
-            if w not in self._marked:
-                self.dfs(graph, w)
+    def dfs(self, graph, source):
+        for _ in depth_first(graph, source, self._marked, nontree=False):
+            pass
 
     @classmethod
     def from_sources(cls, graph, sources):
@@ -103,9 +157,11 @@ class DirectedDFS(object):
 
 
 class DepthFirstOrder(object):
+    _other = None
+
     def __init__(self, graph):
-        self._marked = set()
-        self.pre, self.post = [None] * graph.V, [None] * graph.V
+        self._marked = Marks(graph.V)
+        self.pre, self.post = vertex_slots(graph.V), vertex_slots(graph.V)
         self.preorder, self.postorder = [], []
         for v in graph.vertices():
             if not self.marked(v):
@@ -114,15 +170,16 @@ class DepthFirstOrder(object):
     def marked(self, v):
         return v in self._marked
 
-    def dfs(self, graph, v):
-        self._marked.add(v)
-        self.pre[v] = len(self.preorder)
-        self.preorder.append(v)
-        for w in graph.adj(v):
-            if not self.marked(w):
-                self.dfs(graph, w)
-        self.post[v] = len(self.postorder)
-        self.postorder.append(v)
+    def dfs(self, graph, source):
+        events = depth_first(graph, source, self._marked, self._other,
+                             nontree=False)
+        for event, v, w, e in events:
+            if event == PRE:
+                self.pre[v] = len(self.preorder)
+                self.preorder.append(v)
+            elif event == POST:
+                self.post[v] = len(self.postorder)
+                self.postorder.append(v)
 
     def reverse_post(self):
         return self.postorder[::-1]
@@ -132,19 +189,107 @@ class DepthFirstOrder(object):
         assert self.postorder == [self.post[i] for i in graph.vertices()]
 
 
+def in_degrees(graph, other=None):
+    """
+    A fresh array of every in-degree, copied from the digraph's cached
+    counts when it keeps them, else counted over the adjacency lists.
+    """
+    if hasattr(graph, 'indegrees'):
+        return array('l', graph.indegrees())
+    indegree = array('l', [0]) * graph.V
+    for v in graph.vertices():
+        for e in graph.adj(v):
+            indegree[e if other is None else other(v, e)] += 1
+    return indegree
+
+
+def topological(graph, indegree, other=None):
+    """
+    Kahn's algorithm as a generator: yields (v, entries) for every vertex
+    in topological order, entries being graph.adj(v) so that callers can
+    scan the edges of v without asking for them twice. `indegree` (see
+    in_degrees) is consumed in place: once the generator is exhausted the
+    vertices left with a positive in-degree are exactly those on or
+    behind a cycle.
+    """
+    queue = [v for v in graph.vertices() if indegree[v] == 0]
+    i = 0
+    while i < len(queue):
+        v = queue[i]
+        i += 1
+        entries = graph.adj(v)
+        yield v, entries
+        for e in entries:
+            w = e if other is None else other(v, e)
+            indegree[w] -= 1
+            if indegree[w] == 0:
+                queue.append(w)
+
+
 class TopologicalSort(object):
+    """
+    One pass of Kahn's algorithm: `order` is a topological order, or None
+    if the digraph has a cycle, in which case `cycle` returns one in the
+    format of DirectedCycle.
+    """
+    _other = None
+
     def __init__(self, graph):
         self.order = None
-        cycle = Cycle(graph)
-        if not cycle.has_cycle():
-            searcher = DepthFirstOrder(graph)
-            self.order = searcher.reverse_post()
-            ranks = sorted(enumerate(self.order), key=lambda x: x[1])
-            self._rank = [i for i, v in ranks]
+        self._rank = None
+        self._cycle = []
+        indegree = in_degrees(graph, self._other)
+        order = [v for v, _ in topological(graph, indegree, self._other)]
+        if len(order) == graph.V:
+            self.order = order
+            self._rank = vertex_slots(graph.V)
+            for i, v in enumerate(order):
+                self._rank[v] = i
+        else:
+            self._cycle = self._find_cycle(graph, indegree)
+
+    def _find_cycle(self, graph, indegree):
+        """
+        Every vertex left over has a leftover predecessor, so walking back
+        along them from any of it must come round to a repeated vertex.
+        """
+        other = self._other
+        pred, entry = vertex_slots(graph.V), [None] * graph.V
+        for v in graph.vertices():
+            if indegree[v] > 0:
+                for e in graph.adj(v):
+                    w = e if other is None else other(v, e)
+                    if indegree[w] > 0:
+                        pred[w], entry[w] = v, e
+        seen = Marks(graph.V)
+        x = next(v for v in graph.vertices() if indegree[v] > 0)
+        while x not in seen:
+            seen.add(x)
+            x = pred[x]
+        cycle, w = [x], pred[x]
+        entries = [entry[x]]
+        while w != x:
+            cycle.append(w)
+            entries.append(entry[w])
+            w = pred[w]
+        cycle.append(x)
+        cycle.reverse(), entries.reverse()
+        return self._witness(cycle, entries)
+
+    @staticmethod
+    def _witness(vertices, entries):
+        "the cycle as vertices x -> ... -> x"
+        return vertices
 
     def has_order(self):
         return self.order is not None
 
+    def has_cycle(self):
+        return bool(self._cycle)
+
+    def cycle(self):
+        return self._cycle
+
     def rank(self, v):
         if self.has_order():
             return self._rank[v]
@@ -152,21 +297,114 @@ class TopologicalSort(object):
 
 class KosarajuSharirSCC(object):
     def __init__(self, graph):
-        self._marked = set()
+        self._marked = Marks(graph.V)
         self.count = 0
-        self.ids = [None] * graph.V
+        self.ids = vertex_slots(graph.V)
         reverse_post = DepthFirstOrder(graph.reverse()).reverse_post()
         for v in reverse_post:
             if v not in self._marked:
                 self.dfs(graph, v)
                 self.count += 1
 
-    def dfs(self, graph, v):
-        self._marked.add(v)
-        self.ids[v] = self.count
-        for w in graph.adj(v):
-            if w not in self._marked:
-                self.dfs(graph, w)
+    def dfs(self, graph, source):
+        events = depth_first(graph, source, self._marked, nontree=False)
+        for event, v, w, e in events:
+            if event == PRE:
+                self.ids[v] = self.count
+
+    def strongly_connected(self, v, w):
+        return self.ids[v] == self.ids[w]
+
+
+class TarjanSCC(object):
+    """
+    Strongly connected components in one depth-first pass (Tarjan), on
+    the explicit-stack engine and without building the reverse graph.
+    Components are numbered in the order they complete, which is a
+    reverse topological order of the condensation: every edge between two
+    components goes from a higher id to a lower one. `sizes[c]` is the
+    number of vertices in component c.
+    """
+    _other = None
+
+    def __init__(self, graph):
+        self.graph = graph
+        self._marked = Marks(graph.V)
+        self.count = 0
+        self.ids = vertex_slots(graph.V)
+        self.sizes = vertex_slots(graph.V)
+        self._pre = vertex_slots(graph.V)
+        self._low = vertex_slots(graph.V)
+        self._on_stack = bytearray(graph.V)
+        self._stack = []
+        self._index = 0
+        self._condensation = None
+        for v in graph.vertices():
+            if v not in self._marked:
+                self.dfs(graph, v)
+        del self.sizes[self.count:]
+        self._pre = self._low = self._on_stack = self._stack = None
+
+    def dfs(self, graph, source):
+        pre, low, on_stack, stack = \
+            self._pre, self._low, self._on_stack, self._stack
+        ids, sizes = self.ids, self.sizes
+        index = self._index
+        path = []       # the vertices of the DFS path, to find POST parents
+        events = depth_first(graph, source, self._marked, self._other)
+        for event, v, w, e in events:
+            if event == NONTREE:
+                if on_stack[w] and pre[w] < low[v]:
+                    low[v] = pre[w]
+            elif event == PRE:
+                pre[v] = low[v] = index
+                index += 1
+                stack.append(v)
+                on_stack[v] = True
+                path.append(v)
+            elif event == POST:
+                path.pop()
+                if low[v] == pre[v]:    # v is the root of a component
+                    size = 0
+                    while True:
+                        x = stack.pop()
+                        on_stack[x] = False
+                        ids[x] = self.count
+                        size += 1
+                        if x == v:
+                            break
+                    sizes[self.count] = size
+                    self.count += 1
+                elif low[v] < low[path[-1]]:
+                    low[path[-1]] = low[v]
+        self._index = index
 
     def strongly_connected(self, v, w):
         return self.ids[v] == self.ids[w]
+
+    def components(self):
+        cs = [[] for c in range(self.count)]
+        for v in range(len(self.ids)):
+            cs[self.ids[v]].append(v)
+        return cs
+
+    def condensation(self):
+        """
+        The DAG of components: vertex c for component c and one edge c->d
+        if any edge leads from c to d. Built on first call and cached as a
+        frozen (unweighted) digraph.
+        """
+        if self._condensation is None:
+            from src.csr import CSRDigraph
+            ids, edges, other = self.ids, set(), self._other
+            for v in self.graph.vertices():
+                for e in self.graph.adj(v):
+                    w = e if other is None else other(v, e)
+                    if ids[v] != ids[w]:
+                        edges.add((ids[v], ids[w]))
+            edges = sorted(edges)
+            tails = array('i', [c for c, d in edges])
+            heads = array('i', [d for c, d in edges])
+            self._condensation = CSRDigraph.from_edges(self.count, tails,
+                                                       heads)
+        return self._condensation
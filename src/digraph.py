@@ -1,14 +1,20 @@
 #!/usr/bin/env python
 
 from argparse import ArgumentParser
+from array import array
 
-from graph import Graph
+from graph import Graph, SymbolGraph
 from dfs import DirectedDFS, DepthFirstOrder
 from dfs import TopologicalSort, KosarajuSharirSCC
+from dfs import depth_first, PRE, POST, TREE
 from bfs import BreadthFirstSearch
+from marks import Marks
 
 
 class Digraph(Graph):
+    _reverse = None     # built on demand, dropped whenever an edge is added
+    _indegree = None
+
     def __init__(self, V):
         super(Digraph, self).__init__(V)
 
@@ -16,40 +22,96 @@ class Digraph(Graph):
         self._validate_vertex(v), self._validate_vertex(w)
         self.E += 1
         self._adj[v].append(w)
+        self._reverse = self._indegree = None
+
+    def _extend(self, tails, heads, weights):
+        adj = self._adj
+        for i in range(len(tails)):
+            adj[tails[i]].append(heads[i])
+        self.E += len(tails)
+        self._reverse = self._indegree = None
+
+    @staticmethod
+    def _frozen_class():
+        from src.csr import CSRDigraph
+        return CSRDigraph
 
     def reverse(self):
+        """
+        The digraph with every edge turned around, built on the first call
+        and cached until the next add_edge; callers must not modify it.
+        """
+        if self._reverse is None:
+            self._reverse = self._build_reverse()
+        return self._reverse
+
+    def _build_reverse(self):
+        tails, heads = array('i'), array('i')
+        for v in range(self.V):
+            adj = self._adj[v]
+            tails.extend(adj)
+            heads.extend([v] * len(adj))
         graph = Digraph(self.V)
-        for v in self.vertices():
-            for w in self.adj(v):
-                graph.add_edge(w, v)
+        graph._extend(tails, heads, None)
         return graph
 
+    def indegree(self, v):
+        "number of edges into v; all in-degrees are counted on first use"
+        self._validate_vertex(v)
+        return self.indegrees()[v]
+
+    def indegrees(self):
+        "array of every in-degree, cached like reverse(); do not modify it"
+        if self._indegree is None:
+            self._indegree = self._count_indegrees()
+        return self._indegree
+
+    def _count_indegrees(self):
+        indegree = array('l', [0]) * self.V
+        for adj in self._adj:
+            for w in adj:
+                indegree[w] += 1
+        return indegree
+
+    def predecessors(self, v):
+        "vertices with an edge into v (entries of the cached reverse)"
+        return self.reverse().adj(v)
+
 
 class DirectedCycle(object):
+    _other = None
+
     def __init__(self, graph):
-        self._marked = set()
+        self._marked = Marks(graph.V)
         self._edge_to = [None] * graph.V
-        self._on_stack = [False] * graph.V
+        self._on_stack = bytearray(graph.V)
         self.cycles = []
         for v in graph.vertices():
+            if self.has_cycle():
+                break
             if not self.marked(v):
                 self.dfs(graph, v)
 
     def marked(self, v):
         return v in self._marked
 
-    def dfs(self, graph, v):
-        self._on_stack[v] = True
-        self._marked.add(v)
-        for w in graph.adj(v):
-            if self.has_cycle():
-                return
-            if not self.marked(w):
-                self._edge_to[w] = v
-                self.dfs(graph, w)
+    def dfs(self, graph, source):
+        events = depth_first(graph, source, self._marked, self._other)
+        for event, v, w, e in events:
+            if event == PRE:
+                self._on_stack[v] = True
+            elif event == POST:
+                self._on_stack[v] = False
+            elif event == TREE:
+                self._edge_to[w] = self._edge(v, e)
             elif self._on_stack[w]:  # found cycle
-                self._find_cycle(v, w)
-        self._on_stack[v] = False
+                self._find_cycle(self._edge(v, e), w)
+                return
+
+    @staticmethod
+    def _edge(v, e):
+        "what _edge_to records for the edge e leaving v"
+        return v
 
     def _find_cycle(self, v, w):
         cycle, x = [], v
@@ -69,37 +131,96 @@ class DirectedCycle(object):
         return self.cycles[-1]
 
 
-class SymbolDigraph(object):
-    def __init__(self, lines, sep=' '):
-        self._st = {}
-        lines = list(lines)
-        for line in lines:
-            for v in line.strip().split(sep):
-                if v not in self._st:
-                    self._st[v] = len(self._st)
-        self._keys = \
-            [k for (k, v) in sorted(self._st.items(), key=lambda x: x[1])]
-        self.graph = Digraph(len(self._st))
-        for line in lines:
-            l = line.strip().split(sep)
-            v, ws = l[0], l[1:]
-            for w in ws:
-                self.graph.add_edge(self._st[v], self._st[w])
+class DynamicDAG(Digraph):
+    """
+    Digraph that keeps a topological order up to date as edges come in
+    (Pearce-Kelly). An edge v->w that already agrees with the order costs
+    O(1); otherwise only the vertices ranked between w and v are searched,
+    and those that must move are reshuffled among their own slots. An edge
+    that would close a cycle raises ValueError and leaves the graph as it
+    was. `rank(v)` is an array lookup.
+    """
+    def __init__(self, V):
+        super(DynamicDAG, self).__init__(V)
+        self._in = [list() for i in range(V)]
+        self._rank = array('l', range(V))
+        self._order = array('l', range(V))
+        self._marked = Marks(V)
 
-    @staticmethod
-    def from_file(fname, sep=' '):
-        with open(fname, 'r') as f:
-            lines = [l for l in f]
-        return SymbolDigraph(lines, sep=sep)
+    def rank(self, v):
+        self._validate_vertex(v)
+        return self._rank[v]
 
-    def contains(self, s):
-        return s in self._st
+    def order(self):
+        "the vertices in topological order"
+        return list(self._order)
 
-    def int(self, s):
-        return self._st[s]
+    def predecessors(self, v):
+        self._validate_vertex(v)
+        return self._in[v]
 
-    def name(self, v):
-        return self._keys[v]
+    def add_edge(self, v, w, **kwargs):
+        self._validate_vertex(v), self._validate_vertex(w)
+        if self._rank[w] <= self._rank[v]:
+            self._reorder(v, w)
+        super(DynamicDAG, self).add_edge(v, w)
+        self._in[w].append(v)
+
+    def _reorder(self, v, w):
+        "moves w and its descendants after v and its ancestors, or raises"
+        rank = self._rank
+        lower, upper = rank[w], rank[v]
+        self._marked.reset()
+        forward = self._collect(w, self._adj, lower, upper)
+        if v in self._marked:
+            raise ValueError("edge %d->%d would close a cycle" % (v, w))
+        backward = self._collect(v, self._in, lower, upper)
+        forward.sort(key=rank.__getitem__)
+        backward.sort(key=rank.__getitem__)
+        moved = backward + forward
+        slots = sorted(rank[x] for x in moved)
+        for x, r in zip(moved, slots):
+            rank[x] = r
+            self._order[r] = x
+
+    def _collect(self, source, adj, lower, upper):
+        "unmarked vertices reachable from source along adj ranked in bounds"
+        stamps, epoch, rank = self._marked.stamps, self._marked.epoch, \
+            self._rank
+        stamps[source] = epoch
+        reached, stack = [source], [source]
+        while stack:
+            for x in adj[stack.pop()]:
+                if stamps[x] != epoch and lower <= rank[x] <= upper:
+                    stamps[x] = epoch
+                    reached.append(x)
+                    stack.append(x)
+        return reached
+
+    def _extend(self, tails, heads, weights):
+        """
+        Bulk insert: one Kahn pass over the whole graph rather than an
+        update per edge. If the edges close a cycle none of them is kept.
+        """
+        super(DynamicDAG, self)._extend(tails, heads, weights)
+        topological = TopologicalSort(self)
+        if not topological.has_order():
+            adj = self._adj
+            for i in reversed(range(len(tails))):
+                adj[tails[i]].pop()
+            self.E -= len(tails)
+            self._reverse = self._indegree = None
+            raise ValueError("edges close the cycle %s" % " -> ".join(
+                str(v) for v in topological.cycle()))
+        for i in range(len(tails)):
+            self._in[heads[i]].append(tails[i])
+        self._order = array('l', topological.order)
+        for i, v in enumerate(self._order):
+            self._rank[v] = i
+
+
+class SymbolDigraph(SymbolGraph):
+    graph_class = Digraph
 
 
 if __name__ == '__main__':
@@ -148,8 +269,12 @@ if __name__ == '__main__':
         delim = args['delim']
         sg = SymbolDigraph.from_file(fname, sep=delim)
         topological = TopologicalSort(sg.graph)
-        for v in topological.order:
-            print(sg.name(v))
+        if not topological.has_order():
+            print("Not a DAG, cycle: %s" % " -> ".join(
+                sg.name(v) for v in topological.cycle()))
+        else:
+            for v in topological.order:
+                print(sg.name(v))
 
     elif action == 'strongly_connected':
         delim = args['delim']
@@ -1,8 +1,11 @@
 # coding: utf-8
 
+from array import array
+
 from bfs import BreadthFirstSearch
 from dfs import DepthFirstPaths, DepthFirstSearch
 from cc import ConnectedComponents
+from loader import read_edges
 
 
 class Graph(object):
@@ -31,19 +34,45 @@ class Graph(object):
         self._validate_vertex(v)
         return len(self._adj[v])
 
+    def freeze(self):
+        "returns an immutable compressed sparse row copy of the graph"
+        return self._frozen_class().from_graph(self)
+
+    @staticmethod
+    def _frozen_class():
+        from src.csr import CSRGraph
+        return CSRGraph
+
     @classmethod
-    def from_file(cls, fname):
-        with open(fname, 'r') as f:
-            V = int(next(f))
-            graph = cls(V)
-            next(f)
-            for line in f:
-                line = line.strip().split()
-                v, w, weight = line[0], line[1], line[2:]
-                weight = float(weight[0]) if weight else 0.0
-                graph.add_edge(int(v), int(w), weight=weight)
+    def from_file(cls, fname, compact=False):
+        if compact:
+            return cls._frozen_class().from_file(fname)
+        return cls.from_edges(*read_edges(fname))
+
+    @classmethod
+    def from_edges(cls, V, tails, heads, weights=None):
+        """
+        Bulk constructor from parallel edge arrays: vertices are validated
+        once for the whole edge list instead of once per add_edge call.
+        """
+        graph = cls(V)
+        if len(tails):
+            graph._validate_vertex(min(min(tails), min(heads)))
+            graph._validate_vertex(max(max(tails), max(heads)))
+        if weights is None:
+            weights = array('d', [0.0]) * len(tails)
+        graph._extend(tails, heads, weights)
         return graph
 
+    def _extend(self, tails, heads, weights):
+        "adds the (already validated) edges in bulk"
+        adj = self._adj
+        for i in range(len(tails)):
+            v, w = tails[i], heads[i]
+            adj[w].append(v)
+            adj[v].append(w)
+        self.E += len(tails)
+
     def __str__(self):
         s = str(self.V) + " vertices, " + str(self.E) + " edges"
         s += "\n"
@@ -53,27 +82,30 @@ class Graph(object):
 
 
 class SymbolGraph(object):
+    graph_class = Graph
+
     def __init__(self, lines, sep=' '):
+        "single pass over lines, which may be any iterable (e.g. a file)"
         self._st = {}
-        lines = list(lines)
+        self._keys = []
+        tails, heads = array('i'), array('i')
         for line in lines:
-            for v in line.strip().split(sep):
-                if v not in self._st:
-                    self._st[v] = len(self._st)
-        self._keys = \
-            [k for (k, v) in sorted(self._st.items(), key=lambda x: x[1])]
-        self.graph = Graph(len(self._st))
-        for line in lines:
-            l = line.strip().split(sep)
-            v, ws = l[0], l[1:]
-            for w in ws:
-                self.graph.add_edge(self._st[v], self._st[w])
+            ids = [self._intern(v) for v in line.strip().split(sep)]
+            for w in ids[1:]:
+                tails.append(ids[0])
+                heads.append(w)
+        self.graph = self.graph_class.from_edges(len(self._st), tails, heads)
+
+    def _intern(self, v):
+        if v not in self._st:
+            self._st[v] = len(self._keys)
+            self._keys.append(v)
+        return self._st[v]
 
-    @staticmethod
-    def from_file(fname, sep=' '):
+    @classmethod
+    def from_file(cls, fname, sep=' '):
         with open(fname, 'r') as f:
-            lines = [l for l in f]
-        return SymbolGraph(lines, sep=sep)
+            return cls(f, sep=sep)
 
     def contains(self, s):
         return s in self._st
@@ -84,6 +116,10 @@ class SymbolGraph(object):
     def name(self, v):
         return self._keys[v]
 
+    def add_edge(self, s, t):
+        "adds the edge s-t between two known names"
+        self.graph.add_edge(self._st[s], self._st[t])
+
 
 if __name__ == '__main__':
     from argparse import ArgumentParser
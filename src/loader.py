@@ -0,0 +1,203 @@
+# coding: utf-8
+
+# loader.py -- bulk edge-list parsing and a binary CSR cache format.
+#
+# Text edge lists (V, E, then one "v w [weight]" row per edge) are read in
+# large chunks; every chunk is split once and its columns are converted
+# with a single map() each, straight into arrays preallocated from the E
+# header. No per-edge add_edge calls, no per-edge vertex validation.
+#
+# The binary format is the CSR layout of src/csr.py written as is:
+#
+#   header   32 bytes: magic, version, flags, V, E, slots (struct HEADER)
+#   offsets  (V + 1) int64
+#   targets  slots int32, zero-padded to a multiple of 8 bytes
+#   weights  slots float64 (weighted graphs only)
+#
+# All sections are 8-byte aligned so the file can also be memory-mapped.
+
+import os
+import struct
+import sys
+from array import array
+
+MAGIC = b'CSRG'
+VERSION = 1
+HEADER = struct.Struct('<4sBBBBqqq')
+DIRECTED, WEIGHTED, BIG_ENDIAN = 1, 2, 4
+CHUNK_SIZE = 1 << 22
+CACHE_SUFFIX = '.csr'
+
+
+def _typecode(kind, itemsize):
+    "array typecode of the given kind ('int' or 'float') and byte size"
+    codes = 'ilq' if kind == 'int' else 'fd'
+    for code in codes:
+        try:
+            if array(code).itemsize == itemsize:
+                return code
+        except ValueError:      # 'q' is missing before Python 3.3
+            continue
+    raise ValueError("no %d-byte %s array type" % (itemsize, kind))
+
+OFFSET_TYPECODE = _typecode('int', 8)
+VERTEX_TYPECODE = _typecode('int', 4)
+WEIGHT_TYPECODE = _typecode('float', 8)
+
+
+def _chunks(f, chunk_size):
+    "yields blocks of complete lines from f"
+    rest = ''
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+        chunk = rest + chunk
+        cut = chunk.rfind('\n') + 1
+        if cut == 0:
+            rest = chunk
+            continue
+        rest = chunk[cut:]
+        yield chunk[:cut]
+    if rest.strip():
+        yield rest
+
+
+def read_edges(fname, chunk_size=CHUNK_SIZE):
+    """
+    Parses a "V, E, then v w [weight]" edge list file into arrays.
+    Returns (V, tails, heads, weights); weights is None when the rows have
+    no weight column.
+    """
+    with open(fname, 'r') as f:
+        V = int(f.readline())
+        E = int(f.readline())
+        tails = array(VERTEX_TYPECODE, [0]) * E
+        heads = array(VERTEX_TYPECODE, [0]) * E
+        weights, ncols, n = None, None, 0
+        for chunk in _chunks(f, chunk_size):
+            tokens = chunk.split()
+            if not tokens:
+                continue
+            if ncols is None:
+                first = next(l for l in chunk.splitlines() if l.strip())
+                ncols = len(first.split())
+                if ncols > 2:
+                    weights = array(WEIGHT_TYPECODE, [0.0]) * E
+            if len(tokens) % ncols:
+                raise ValueError("ragged edge list [%s]" % fname)
+            rows = len(tokens) // ncols
+            tails[n:n + rows] = \
+                array(VERTEX_TYPECODE, map(int, tokens[0::ncols]))
+            heads[n:n + rows] = \
+                array(VERTEX_TYPECODE, map(int, tokens[1::ncols]))
+            if weights is not None:
+                weights[n:n + rows] = \
+                    array(WEIGHT_TYPECODE, map(float, tokens[2::ncols]))
+            n += rows
+    for a in (tails, heads, weights):
+        if a is not None:
+            del a[n:]
+    return V, tails, heads, weights
+
+
+def _frozen_class(flags):
+    from src.csr import CSRGraph, CSRDigraph
+    from src.csr import CSRWeightedGraph, CSRWeightedDigraph
+    if flags & WEIGHTED:
+        return CSRWeightedDigraph if flags & DIRECTED else CSRWeightedGraph
+    return CSRDigraph if flags & DIRECTED else CSRGraph
+
+
+def _padding(nbytes):
+    return (8 - nbytes % 8) % 8
+
+
+def save(graph, fname):
+    "writes the CSR form of graph to fname in the binary format"
+    csr = graph.freeze()
+    flags = (DIRECTED if csr.directed else 0) | \
+        (WEIGHTED if csr.weighted else 0) | \
+        (BIG_ENDIAN if sys.byteorder == 'big' else 0)
+    with open(fname, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, flags, 0, 0,
+                            csr.V, csr.E, len(csr.targets)))
+        array(OFFSET_TYPECODE, csr.offsets).tofile(f)
+        targets = array(VERTEX_TYPECODE, csr.targets)
+        targets.tofile(f)
+        f.write(b'\0' * _padding(len(targets) * targets.itemsize))
+        if csr.weighted:
+            array(WEIGHT_TYPECODE, csr.weights).tofile(f)
+
+
+def read_header(f):
+    "returns (flags, V, E, slots) after checking magic and version"
+    magic, version, flags, _, _, V, E, slots = HEADER.unpack(
+        f.read(HEADER.size))
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a binary graph file")
+    return flags, V, E, slots
+
+
+def is_binary(fname):
+    "whether fname starts with the binary graph file magic"
+    with open(fname, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def load(fname):
+    "reads a binary graph file into the matching CSR graph class"
+    with open(fname, 'rb') as f:
+        flags, V, E, slots = read_header(f)
+        offsets, targets = array(OFFSET_TYPECODE), array(VERTEX_TYPECODE)
+        offsets.fromfile(f, V + 1)
+        targets.fromfile(f, slots)
+        f.read(_padding(slots * targets.itemsize))
+        weights = None
+        if flags & WEIGHTED:
+            weights = array(WEIGHT_TYPECODE)
+            weights.fromfile(f, slots)
+    if bool(flags & BIG_ENDIAN) != (sys.byteorder == 'big'):
+        for a in (offsets, targets, weights):
+            if a is not None:
+                a.byteswap()
+    return _frozen_class(flags)(V, offsets, targets, weights, E=E)
+
+
+def cached(cls, fname):
+    """
+    Frozen `cls` graph for the edge list `fname`, served from the binary
+    cache file next to it when that is newer than the text, otherwise
+    parsed and written to the cache for the next run.
+    """
+    cache = fname + CACHE_SUFFIX
+    if os.path.exists(cache) and \
+            os.path.getmtime(cache) >= os.path.getmtime(fname):
+        graph = load(cache)
+        if type(graph) is cls._frozen_class():
+            return graph
+    graph = cls.from_file(fname, compact=True)
+    save(graph, cache)
+    return graph
+
+
+if __name__ == '__main__':
+    from argparse import ArgumentParser
+    from src.graph import Graph
+    from src.digraph import Digraph
+    from src.weighted_graph import WeightedGraph
+    from src.weighted_digraph import WeightedDigraph
+
+    kinds = {'graph': Graph, 'digraph': Digraph,
+             'weighted_graph': WeightedGraph,
+             'weighted_digraph': WeightedDigraph}
+
+    parser = ArgumentParser(description='compile edge lists to binary')
+    parser.add_argument('fnames', nargs='+')
+    parser.add_argument('-k', '--kind', default='graph', choices=kinds)
+    args = vars(parser.parse_args())
+
+    for fname in args['fnames']:
+        graph = cached(kinds[args['kind']], fname)
+        print("%s: %d vertices, %d edges" % (fname + CACHE_SUFFIX,
+                                             graph.V, graph.E))
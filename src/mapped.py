@@ -0,0 +1,98 @@
+# coding: utf-8
+
+# mapped.py -- read-only graphs served straight from a memory-mapped
+# binary graph file (see src/loader.py for the layout).
+#
+# Opening a file only reads its 32-byte header; offsets, targets and
+# weights are ctypes arrays laid over the mapping, so pages are read on
+# demand and every process mapping the same file shares them through the
+# page cache. The mapping is private (copy-on-write), which ctypes needs
+# to build its views; nothing ever writes to it.
+
+import ctypes
+import mmap
+import sys
+
+from src.loader import HEADER, DIRECTED, WEIGHTED, BIG_ENDIAN, read_header
+from src.loader import _padding
+from src.csr import CSRGraph, CSRDigraph
+from src.csr import CSRWeightedGraph, CSRWeightedDigraph
+
+
+class MappedGraph(CSRGraph):
+    "CSRGraph whose arrays live in a memory-mapped file"
+
+    @staticmethod
+    def _frozen_class():
+        "in-memory class for graphs derived from this one (e.g. reverse)"
+        return CSRGraph
+
+    def close(self):
+        """
+        Drops the views and unmaps the file; the graph is unusable after.
+        The views (offsets, targets, weights) must not outlive the graph:
+        Python 2's mmap.close does not check for them, and a view still
+        in use would point at unmapped memory. So close refuses with
+        BufferError while any of them is referenced from elsewhere.
+        """
+        for name in ('offsets', 'targets', 'weights'):
+            # no local for the view, which a traceback would keep alive;
+            # references: the attribute and getrefcount's argument
+            if getattr(self, name) is not None and \
+                    sys.getrefcount(getattr(self, name)) > 2:
+                raise BufferError("%s of %s is still in use"
+                                  % (name, type(self).__name__))
+        self.offsets = self.targets = self.weights = None
+        self._mmap.close()
+
+
+class MappedDigraph(MappedGraph, CSRDigraph):
+    @staticmethod
+    def _frozen_class():
+        return CSRDigraph
+
+
+class MappedWeightedGraph(MappedGraph, CSRWeightedGraph):
+    @staticmethod
+    def _frozen_class():
+        return CSRWeightedGraph
+
+
+class MappedWeightedDigraph(MappedGraph, CSRWeightedDigraph):
+    @staticmethod
+    def _frozen_class():
+        return CSRWeightedDigraph
+
+
+def _mapped_class(flags):
+    if flags & WEIGHTED:
+        if flags & DIRECTED:
+            return MappedWeightedDigraph
+        return MappedWeightedGraph
+    return MappedDigraph if flags & DIRECTED else MappedGraph
+
+
+def _view(buf, ctype, offset, n):
+    return (ctype * n).from_buffer(buf, offset)
+
+
+def open_graph(fname):
+    "maps a binary graph file written by src.loader.save"
+    with open(fname, 'rb') as f:
+        flags, V, E, slots = read_header(f)
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    if bool(flags & BIG_ENDIAN) != (sys.byteorder == 'big'):
+        buf.close()
+        raise ValueError("%s was written on a machine of the other "
+                         "byte order; use src.loader.load" % fname)
+    pos = HEADER.size
+    offsets = _view(buf, ctypes.c_int64, pos, V + 1)
+    pos += 8 * (V + 1)
+    targets = _view(buf, ctypes.c_int32, pos, slots)
+    pos += 4 * slots + _padding(4 * slots)
+    weights = None
+    if flags & WEIGHTED:
+        weights = _view(buf, ctypes.c_double, pos, slots)
+    graph = _mapped_class(flags)(V, offsets, targets, weights, E=E)
+    graph._mmap = buf
+    return graph
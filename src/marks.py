@@ -0,0 +1,61 @@
+# coding: utf-8
+
+# marks.py -- dense per-vertex state shared by the traversal classes.
+#
+# Vertices are the dense range 0..V-1, so "visited" is one byte per vertex
+# and per-vertex values (distances, parents, ids) are flat typed arrays
+# rather than sets and lists of Python objects.
+
+from array import array
+
+INF = float("inf")
+
+
+class Marks(object):
+    """
+    Set of vertices 0..V-1 as a byte of stamps: v is marked iff
+    stamps[v] == epoch. `reset` empties the set in O(1) by moving to the
+    next epoch; the stamps are only rewritten once every 255 resets. Hot
+    loops may read and write `stamps` directly against a local `epoch`.
+    """
+    def __init__(self, V):
+        self.stamps = bytearray(V)
+        self.epoch = 1
+
+    def __contains__(self, v):
+        return self.stamps[v] == self.epoch
+
+    def add(self, v):
+        self.stamps[v] = self.epoch
+
+    def discard(self, v):
+        if self.stamps[v] == self.epoch:
+            self.stamps[v] = 0
+
+    def __len__(self):
+        return self.stamps.count(bytearray([self.epoch]))
+
+    def __iter__(self):
+        epoch = self.epoch
+        return (v for v, s in enumerate(self.stamps) if s == epoch)
+
+    def reset(self):
+        self.epoch += 1
+        if self.epoch == 256:
+            self.stamps = bytearray(len(self.stamps))
+            self.epoch = 1
+
+
+def filled(typecode, V, value):
+    "typed array of V copies of value"
+    return array(typecode, [value]) * V
+
+
+def distances(V):
+    "array('d') of V infinite distances"
+    return filled('d', V, INF)
+
+
+def vertex_slots(V):
+    "array('l') of V vertex slots, -1 standing for none"
+    return filled('l', V, -1)
@@ -1,5 +1,28 @@
+# coding: utf-8
+
+# maxflow.py -- maximum flow and minimum cut.
+#
+# FlowNetwork and FordFulkerson are the object version: FlowEdge objects
+# shared by the adjacency lists of both endpoints. The engines below it
+# run on a ResidualGraph instead, where edge k of the network is the pair
+# of arcs 2k (forward, v->w) and 2k + 1 (backward, w->v), so the reverse
+# of arc a is a ^ 1, and all per-arc and per-vertex state lives in typed
+# arrays:
+#
+#   head       arc -> vertex it points to
+#   capacity   arc -> capacity (0 for the backward arcs)
+#   residual   arc -> capacity left, updated by the engines
+#   offsets    vertex -> first slot of its arcs in `arcs` (CSR, src/csr.py)
+#   arcs       the arcs leaving each vertex, grouped by vertex
+
+from array import array
+from collections import deque
 
 from src.graph import Graph
+from src.loader import OFFSET_TYPECODE, VERTEX_TYPECODE, WEIGHT_TYPECODE
+from src.marks import Marks, vertex_slots
+
+FLOATING_POINT_EPSILON = 1e-11
 
 
 class FlowEdge(object):
@@ -37,21 +60,42 @@ class FlowEdge(object):
         else:
             raise ValueError("non-existing vertex [%d]" % v)
 
+    def __str__(self):
+        return "%d->%d %.2f/%.2f" % (self.v, self.w, self.flow,
+                                     self.capacity)
+
 
 class FlowNetwork(Graph):
     def __init__(self, V):
         super(FlowNetwork, self).__init__(V)
 
     def add_edge(self, v, w, capacity):
+        self._validate_vertex(v), self._validate_vertex(w)
+        self.E += 1
         edge = FlowEdge(v, w, capacity)
         self._adj[v].append(edge)
         self._adj[w].append(edge)
 
+    def _extend(self, tails, heads, weights):
+        adj = self._adj
+        for i in range(len(tails)):
+            v, w = tails[i], heads[i]
+            edge = FlowEdge(v, w, weights[i])
+            adj[v].append(edge)
+            adj[w].append(edge)
+        self.E += len(tails)
+
+    def edges(self):
+        "every edge once, in the order of their origins"
+        return [e for v in self.vertices() for e in self._adj[v]
+                if e.origin() == v]
+
 
 class FordFulkerson(object):
+    "shortest augmenting paths (BFS) over the FlowEdge objects"
     def __init__(self, graph, s, t):
-        self._marked = set(),
-        self._edge_to = []  # last edge on s->v path (see has_augmenting_path)
+        self._marked = Marks(graph.V)
+        self._edge_to = [None] * graph.V  # last edge on s->v path
         self._value = 0.0
 
         while self.has_augmenting_path(graph, s, t):
@@ -67,17 +111,375 @@ class FordFulkerson(object):
             self._value += bottle
 
     def has_augmenting_path(self, graph, s, t):
-        self._edge_to, self._marked, q = [], [], [s]
+        self._marked.reset()    # O(1), no reallocation per augmenting path
+        q = deque([s])
         self._marked.add(s)
-        while len(q) != 0:
-            v = q.pop()
+        while q and not self.marked(t):
+            v = q.popleft()
             for e in graph.adj(v):
-                w = v.other()
-                if e.residual(w) > 0 and not self.marked(w):
+                w = e.other(v)
+                if e.residual(w) > FLOATING_POINT_EPSILON and \
+                        not self.marked(w):
                     self._edge_to[w] = e
                     self._marked.add(w)
-                    q = [w] + q
+                    q.append(w)
         return self.marked(t)
 
+    def value(self):
+        return self._value
+
+    def in_cut(self, v):
+        "whether v is on the source side of the minimum cut"
+        return self.marked(v)
+
     def marked(self, v):
         return v in self._marked
+
+
+class ResidualGraph(object):
+    """
+    Residual graph of a flow network in paired arc arrays (see the top of
+    the module). `edges`, when built from a FlowNetwork, are its FlowEdge
+    objects in edge order, so that `store_flows` can write the result
+    back into them.
+    """
+    def __init__(self, V, tails, heads, capacities, edges=None):
+        self.V = V
+        self.E = len(tails)
+        self.edges = edges
+        head = array(VERTEX_TYPECODE, [0]) * (2 * self.E)
+        capacity = array(WEIGHT_TYPECODE, [0.0]) * (2 * self.E)
+        degree = array(OFFSET_TYPECODE, [0]) * (V + 1)
+        for k in range(self.E):
+            v, w = tails[k], heads[k]
+            head[2 * k], head[2 * k + 1] = w, v
+            capacity[2 * k] = capacities[k]
+            degree[v + 1] += 1
+            degree[w + 1] += 1
+        for v in range(V):
+            degree[v + 1] += degree[v]
+        self.offsets = degree
+        slot = array(OFFSET_TYPECODE, degree)
+        arcs = array(VERTEX_TYPECODE, [0]) * (2 * self.E)
+        for a in range(2 * self.E):
+            tail = head[a ^ 1]
+            arcs[slot[tail]] = a
+            slot[tail] += 1
+        self.head, self.capacity, self.arcs = head, capacity, arcs
+        self.residual = array(WEIGHT_TYPECODE, capacity)
+
+    @classmethod
+    def from_network(cls, network):
+        edges = network.edges()
+        return cls(network.V, [e.origin() for e in edges],
+                   [e.target() for e in edges],
+                   [e.capacity for e in edges], edges)
+
+    def reset(self):
+        "back to the zero flow"
+        self.residual = array(WEIGHT_TYPECODE, self.capacity)
+
+    def flow(self, k):
+        "flow along edge k"
+        return self.capacity[2 * k] - self.residual[2 * k]
+
+    def store_flows(self):
+        for k, e in enumerate(self.edges):
+            e.flow = self.flow(k)
+
+
+class MaxFlow(object):
+    """
+    Base of the array engines: takes a FlowNetwork (whose edges receive
+    the flows) or a ResidualGraph (which is reset first), runs `_solve`
+    and answers from the final residual capacities. `in_cut(v)` tells
+    the source side of a minimum cut, `min_cut()` the ids of the edges
+    crossing it, whose capacities add up to `value()`.
+    """
+    def __init__(self, graph, s, t):
+        if s == t:
+            raise ValueError("source and sink must differ")
+        if isinstance(graph, ResidualGraph):
+            residual = graph
+            residual.reset()
+        else:
+            residual = ResidualGraph.from_network(graph)
+        self.residual, self.s, self.t = residual, s, t
+        self._value = self._solve(residual, s, t)
+        self._cut = self._source_side(residual, s)
+        if residual.edges is not None:
+            residual.store_flows()
+
+    def _solve(self, graph, s, t):
+        raise NotImplementedError
+
+    @staticmethod
+    def _source_side(graph, s):
+        "vertices reachable from s in the residual graph"
+        reached = Marks(graph.V)
+        reached.add(s)
+        offsets, arcs, head, residual = graph.offsets, graph.arcs, \
+            graph.head, graph.residual
+        stack = [s]
+        while stack:
+            v = stack.pop()
+            for i in range(offsets[v], offsets[v + 1]):
+                a = arcs[i]
+                w = head[a]
+                if residual[a] > FLOATING_POINT_EPSILON and w not in reached:
+                    reached.add(w)
+                    stack.append(w)
+        return reached
+
+    def value(self):
+        return self._value
+
+    def flow(self, k):
+        return self.residual.flow(k)
+
+    def in_cut(self, v):
+        return v in self._cut
+
+    def min_cut(self):
+        head, cut = self.residual.head, self._cut
+        return [k for k in range(self.residual.E)
+                if head[2 * k + 1] in cut and head[2 * k] not in cut]
+
+
+class EdmondsKarp(MaxFlow):
+    "shortest augmenting paths by BFS: O(V E^2)"
+    def _solve(self, graph, s, t):
+        offsets, arcs, head, residual = graph.offsets, graph.arcs, \
+            graph.head, graph.residual
+        parent = vertex_slots(graph.V)      # arc into v on the BFS tree
+        reached = Marks(graph.V)
+        value = 0.0
+        while True:
+            reached.reset()
+            reached.add(s)
+            q = deque([s])
+            while q and t not in reached:
+                v = q.popleft()
+                for i in range(offsets[v], offsets[v + 1]):
+                    a = arcs[i]
+                    w = head[a]
+                    if residual[a] > FLOATING_POINT_EPSILON and \
+                            w not in reached:
+                        reached.add(w)
+                        parent[w] = a
+                        q.append(w)
+            if t not in reached:
+                return value
+            bottle, v = float("inf"), t
+            while v != s:
+                a = parent[v]
+                bottle = min(bottle, residual[a])
+                v = head[a ^ 1]
+            v = t
+            while v != s:
+                a = parent[v]
+                residual[a] -= bottle
+                residual[a ^ 1] += bottle
+                v = head[a ^ 1]
+            value += bottle
+
+
+class Dinic(MaxFlow):
+    """
+    Blocking flows on BFS level graphs, found by an explicit-stack DFS
+    that keeps a current-arc pointer per vertex, so every arc is given up
+    on at most once per phase: O(V^2 E), O(E sqrt(V)) for unit capacities.
+    """
+    def _solve(self, graph, s, t):
+        offsets, arcs, head, residual = graph.offsets, graph.arcs, \
+            graph.head, graph.residual
+        value = 0.0
+        while True:
+            level = self._levels(graph, s, t)
+            if level[t] == -1:
+                return value
+            current = array(OFFSET_TYPECODE, offsets)
+            path, v = [], s
+            while True:
+                if v == t:
+                    bottle = min(residual[a] for a in path)
+                    for a in path:
+                        residual[a] -= bottle
+                        residual[a ^ 1] += bottle
+                    value += bottle
+                    i = 0                   # back to the first saturated arc
+                    while residual[path[i]] > FLOATING_POINT_EPSILON:
+                        i += 1
+                    del path[i:]
+                    v = head[path[-1]] if path else s
+                    continue
+                end = offsets[v + 1]
+                while current[v] < end:
+                    a = arcs[current[v]]
+                    w = head[a]
+                    if residual[a] > FLOATING_POINT_EPSILON and \
+                            level[w] == level[v] + 1:
+                        break
+                    current[v] += 1
+                if current[v] < end:
+                    path.append(arcs[current[v]])
+                    v = head[path[-1]]
+                elif v == s:
+                    break
+                else:
+                    level[v] = -1               # dead end for this phase
+                    v = head[path.pop() ^ 1]
+                    current[v] += 1
+
+    @staticmethod
+    def _levels(graph, s, t):
+        offsets, arcs, head, residual = graph.offsets, graph.arcs, \
+            graph.head, graph.residual
+        level = vertex_slots(graph.V)
+        level[s] = 0
+        q = deque([s])
+        while q:
+            v = q.popleft()
+            for i in range(offsets[v], offsets[v + 1]):
+                a = arcs[i]
+                w = head[a]
+                if residual[a] > FLOATING_POINT_EPSILON and level[w] == -1:
+                    level[w] = level[v] + 1
+                    if w == t:
+                        return level
+                    q.append(w)
+        return level
+
+
+class PushRelabel(MaxFlow):
+    """
+    Highest-label push-relabel: the active vertex of greatest height is
+    discharged through its current arc, and relabelled once its arcs run
+    out. Heights start as exact BFS distances to the sink; whenever a
+    height below V loses its last vertex (a gap) every vertex above it is
+    cut off from the sink and lifted past V at once. Pushing goes on until
+    the excess cut off from the sink has gone back to the source, so the
+    result is a flow, not just a preflow: O(V^2 sqrt(E)).
+    """
+    def _solve(self, graph, s, t):
+        V = graph.V
+        offsets, arcs, head, residual = graph.offsets, graph.arcs, \
+            graph.head, graph.residual
+        height = self._distances_to(graph, t)
+        height[s] = V
+        excess = array(WEIGHT_TYPECODE, [0.0]) * V
+        count = array(OFFSET_TYPECODE, [0]) * (2 * V + 1)
+        for v in range(V):
+            count[height[v]] += 1
+        active = [[] for _ in range(2 * V + 1)]
+        highest = 0
+        for i in range(offsets[s], offsets[s + 1]):
+            a = arcs[i]
+            w, delta = head[a], residual[a]
+            if delta > 0:
+                residual[a] -= delta
+                residual[a ^ 1] += delta
+                if excess[w] <= FLOATING_POINT_EPSILON and w != t:
+                    active[height[w]].append(w)
+                    highest = max(highest, height[w])
+                excess[w] += delta
+        current = array(OFFSET_TYPECODE, offsets)
+        while highest >= 0:
+            if not active[highest]:
+                highest -= 1
+                continue
+            v = active[highest].pop()
+            if excess[v] <= FLOATING_POINT_EPSILON:
+                continue
+            if height[v] != highest:            # lifted by a gap
+                active[height[v]].append(v)
+                highest = max(highest, height[v])
+                continue
+            while excess[v] > FLOATING_POINT_EPSILON:
+                if current[v] == offsets[v + 1]:
+                    old = height[v]
+                    new = 2 * V
+                    for i in range(offsets[v], offsets[v + 1]):
+                        a = arcs[i]
+                        if residual[a] > FLOATING_POINT_EPSILON:
+                            new = min(new, height[head[a]] + 1)
+                    count[old] -= 1
+                    height[v] = new
+                    count[new] += 1
+                    current[v] = offsets[v]
+                    if count[old] == 0 and old < V:
+                        self._gap(height, count, old, V, s)
+                    continue
+                a = arcs[current[v]]
+                w = head[a]
+                if residual[a] > FLOATING_POINT_EPSILON and \
+                        height[v] == height[w] + 1:
+                    delta = min(excess[v], residual[a])
+                    residual[a] -= delta
+                    residual[a ^ 1] += delta
+                    excess[v] -= delta
+                    if excess[w] <= FLOATING_POINT_EPSILON and \
+                            w != s and w != t:
+                        active[height[w]].append(w)
+                    excess[w] += delta
+                else:
+                    current[v] += 1
+            # relabels may have lifted v above `highest`, and pushes only
+            # go one level down from it
+            highest = max(highest, height[v])
+        return excess[t]
+
+    @staticmethod
+    def _gap(height, count, gap, V, s):
+        "lifts every vertex above an emptied height below V to V + 1"
+        for v in range(len(height)):
+            h = height[v]
+            if gap < h < V and v != s:
+                count[h] -= 1
+                height[v] = V + 1
+                count[V + 1] += 1
+
+    @staticmethod
+    def _distances_to(graph, t):
+        "BFS distances to t along arcs with residual capacity, else V"
+        V, head, residual = graph.V, graph.head, graph.residual
+        offsets, arcs = graph.offsets, graph.arcs
+        height = array(OFFSET_TYPECODE, [V]) * V
+        height[t] = 0
+        q = deque([t])
+        while q:
+            w = q.popleft()
+            for i in range(offsets[w], offsets[w + 1]):
+                a = arcs[i] ^ 1             # an arc v->w into w
+                v = head[a ^ 1]
+                if residual[a] > FLOATING_POINT_EPSILON and height[v] == V:
+                    height[v] = height[w] + 1
+                    q.append(v)
+        return height
+
+
+ENGINES = {'edmonds-karp': EdmondsKarp, 'dinic': Dinic,
+           'push-relabel': PushRelabel}
+
+
+if __name__ == '__main__':
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(description='maximum flow')
+    parser.add_argument('-f', '--fname')
+    parser.add_argument('-s', '--source', type=int)
+    parser.add_argument('-t', '--sink', type=int)
+    parser.add_argument('-a', '--algorithm', default='dinic',
+                        choices=sorted(ENGINES))
+    args = vars(parser.parse_args())
+
+    network = FlowNetwork.from_file(args['fname'])
+    maxflow = ENGINES[args['algorithm']](network, args['source'],
+                                         args['sink'])
+    print("Max flow from %d to %d" % (args['source'], args['sink']))
+    for e in network.edges():
+        if e.flow > 0:
+            print("   " + str(e))
+    print("Min cut: " + " ".join(str(v) for v in network.vertices()
+                                 if maxflow.in_cut(v)))
+    print("Max flow value = %.2f" % maxflow.value())
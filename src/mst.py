@@ -1,9 +1,12 @@
 
-from Queue import PriorityQueue
+import heapq
+from array import array
+from itertools import count, izip
 
-from src.pqueue import pqueue
+from src.pqueue import IndexMinPQ
 from src.weighted_graph import WeightedGraph
-from src.union_find import UnionFind
+from src.union_find import IntUnionFind
+from src.marks import Marks, distances
 
 
 class MST(object):
@@ -24,19 +27,20 @@ class KruskalMST(MST):
     def __init__(self, graph):
         """
         Grow the tree by adding the minimum-weight edge not entailing a cycle.
+        Edges are sorted once by weight (an argsort over a weight array) and
+        fed in bulk to an IntUnionFind, which stops once the tree spans the
+        graph.
         """
         super(KruskalMST, self).__init__(graph)
-        q = PriorityQueue()
-        for e in graph.edges():
-            q.put(e)
-        uf = UnionFind(graph.V)
-        while len(self.edges()) != graph.V - 1 and not q.empty():
-            e = q.get()
-            v = e.either()
-            w = e.other(v)
-            if not uf.connected(v, w):  # not in a cycle
-                uf.union(v, w)
-                self.mst.append(e)
+        edges = graph.edges()
+        weights = array('d', [e.weight for e in edges])
+        edges = [edges[i] for i in
+                 sorted(range(len(edges)), key=weights.__getitem__)]
+        tails = array('l', [e.v for e in edges])
+        heads = array('l', [e.w for e in edges])
+        uf = IntUnionFind(graph.V)
+        merged = uf.union_many(tails, heads, n_sets=1)  # not in a cycle
+        self.mst = [e for e, m in izip(edges, merged) if m]
 
 
 class LazyPrimMST(MST):
@@ -44,20 +48,24 @@ class LazyPrimMST(MST):
         """
         Grow the tree by adding the minimum-weight crossing edge. Lazy version
         finds the minimum-weight crossing edge as the min element in a
-        PriorityQueue of edges adjacent to vertices in the tree but not yet
-        in the tree (at most one of the vertices in the edge has been visited)
+        heap of edges adjacent to vertices in the tree but not yet
+        in the tree (at most one of the vertices in the edge has been visited).
+
+        Heap entries are (weight, seq, edge) tuples: seq breaks ties in
+        insertion order, so edges themselves are never compared.
         """
         super(LazyPrimMST, self).__init__(graph)
-        self._marked = set()
-        self._q = PriorityQueue()
+        self._marked = Marks(graph.V)
+        self._q = []
+        self._seq = count()
         for v in graph.vertices():  # find minimum spanning forests
             if not self.marked(v):
                 self.prim(graph, v)
 
     def prim(self, graph, source):
         self.visit(graph, source)
-        while not self._q.empty():
-            e = self._q.get()
+        while self._q:
+            e = heapq.heappop(self._q)[2]
             v = e.either()
             w = e.other(v)
             if self.marked(v) and self.marked(w):
@@ -70,15 +78,18 @@ class LazyPrimMST(MST):
 
     def visit(self, graph, v):
         self._marked.add(v)
+        q, seq = self._q, self._seq
         for e in graph.adj(v):
             if not self.marked(e.other(v)):
-                self._q.put(e)
+                heapq.heappush(q, (e.weight, next(seq), e))
 
     def marked(self, v):
         return v in self._marked
 
 
 class EagerPrimtMST(MST):
+    arity = 4       # of the IndexMinPQ heap
+
     def __init__(self, graph):
         """
         Grow the tree by adding the minimum-weight crossing edge. Eager version
@@ -89,18 +100,18 @@ class EagerPrimtMST(MST):
         """
         super(EagerPrimtMST, self).__init__(graph)
         self._edge_to = [None] * graph.V
-        self._dist_to = [float("inf")] * graph.V
-        self._marked = set()
-        self._q = pqueue()
+        self._dist_to = distances(graph.V)
+        self._marked = Marks(graph.V)
+        self._q = IndexMinPQ(graph.V, self.arity)
         for v in graph.vertices():
             if not self.marked(v):
                 self.prim(graph, v)
 
     def prim(self, graph, source):
         self._dist_to[source] = 0.0
-        self._q.enqueue((self._dist_to[source], source))
+        self._q.insert(source, self._dist_to[source])
         while not self._q.empty():
-            v = self._q.dequeue()
+            v = self._q.del_min()
             self.visit(graph, v)
 
     def visit(self, graph, v):
@@ -130,10 +141,11 @@ if __name__ == '__main__':
     parser.add_argument('-f', '--fname')
     parser.add_argument('-s', '--source', type=int)
     parser.add_argument('-S', '--sep')
+    parser.add_argument('-c', '--compact', action='store_true')
 
     args = vars(parser.parse_args())
 
-    graph = WeightedGraph.from_file(args['fname'])
+    graph = WeightedGraph.from_file(args['fname'], compact=args['compact'])
 
     if args['algorithm'] == 'kruskal':
         mst = KruskalMST(graph)
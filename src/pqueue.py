@@ -6,8 +6,15 @@
 # otherwise leaving them in the heap until they are found (and removed and
 # ignored) by a pop operation. The updated entry is inserted using heappush
 # (with the updated priority) to obtain O(log n) update performance.
+#
+# IndexMinPQ is the indexed alternative for integer keys (vertices): one
+# heap slot per key, updated in place.
+#
+# RadixHeap is a monotone queue for non-negative integer priorities, as in
+# Dijkstra with integer weights: no comparisons, just bucket moves.
 
 import heapq
+from array import array
 
 INVALID = '#invalid#'
 
@@ -60,3 +67,177 @@ class pqueue(object):
 
     def empty(self):
         return self.size == 0
+
+
+class IndexMinPQ(object):
+    """
+    Min-priority queue over the integer keys 0..N-1, each holding a float
+    priority, with true decrease-key: `qp` tracks where every index sits
+    in the heap, so an update moves the one entry in O(log n) instead of
+    leaving a stale copy behind. The heap is `arity`-ary (4 trades a
+    deeper sift down for a shallower tree) and lives in typed arrays.
+    Equal priorities come out in increasing index order.
+    """
+    def __init__(self, N, arity=4):
+        if arity < 2:
+            raise ValueError("arity must be at least 2")
+        self.arity = arity
+        self.size = 0
+        self.pq = array('l', [0]) * N           # heap position -> index
+        self.qp = array('l', [-1]) * N          # index -> heap position
+        self.keys = array('d', [0.0]) * N
+
+    def __len__(self):
+        return self.size
+
+    def __contains__(self, i):
+        return self.qp[i] != -1
+
+    def empty(self):
+        return self.size == 0
+
+    def clear(self):
+        "empties the queue in O(size), keeping its buffers"
+        pq, qp = self.pq, self.qp
+        for n in range(self.size):
+            qp[pq[n]] = -1
+        self.size = 0
+
+    def key_of(self, i):
+        return self.keys[i]
+
+    def min_index(self):
+        if self.size == 0:
+            raise IndexError("priority queue underflow")
+        return self.pq[0]
+
+    def insert(self, i, key):
+        if self.qp[i] != -1:
+            raise ValueError("index %d is already in the queue" % i)
+        self.pq[self.size] = i
+        self.qp[i] = self.size
+        self.keys[i] = key
+        self.size += 1
+        self._swim(self.size - 1)
+
+    def decrease_key(self, i, key):
+        if self.qp[i] == -1:
+            raise KeyError(i)
+        if key > self.keys[i]:
+            raise ValueError("key %r does not decrease %r"
+                             % (key, self.keys[i]))
+        self.keys[i] = key
+        self._swim(self.qp[i])
+
+    def update(self, key, i):
+        "inserts i, or moves it to its new key (the pqueue signature)"
+        if self.qp[i] == -1:
+            self.insert(i, key)
+            return
+        old = self.keys[i]
+        self.keys[i] = key
+        if key < old:
+            self._swim(self.qp[i])
+        else:
+            self._sink(self.qp[i])
+
+    def del_min(self):
+        "removes and returns the index of the smallest key"
+        if self.size == 0:
+            raise IndexError("priority queue underflow")
+        pq, qp = self.pq, self.qp
+        i = pq[0]
+        self.size -= 1
+        last = pq[self.size]
+        qp[i] = -1
+        if self.size:
+            pq[0] = last
+            qp[last] = 0
+            self._sink(0)
+        return i
+
+    dequeue = del_min
+
+    def _swim(self, n):
+        pq, qp, keys, d = self.pq, self.qp, self.keys, self.arity
+        i = pq[n]
+        key = keys[i]
+        while n > 0:
+            parent = (n - 1) // d
+            j = pq[parent]
+            if keys[j] < key or keys[j] == key and j < i:
+                break
+            pq[n] = j
+            qp[j] = n
+            n = parent
+        pq[n] = i
+        qp[i] = n
+
+    def _sink(self, n):
+        pq, qp, keys, d = self.pq, self.qp, self.keys, self.arity
+        size = self.size
+        i = pq[n]
+        key = keys[i]
+        first = d * n + 1
+        while first < size:
+            best, j = first, pq[first]
+            min_key = keys[j]
+            for c in range(first + 1, min(first + d, size)):
+                k = pq[c]
+                if keys[k] < min_key or keys[k] == min_key and k < j:
+                    best, j, min_key = c, k, keys[k]
+            if key < min_key or key == min_key and i < j:
+                break
+            pq[n] = j
+            qp[j] = n
+            n = best
+            first = d * n + 1
+        pq[n] = i
+        qp[i] = n
+
+
+class RadixHeap(object):
+    """
+    Monotone min-priority queue of (key, value) pairs with non-negative
+    integer keys, each at least the last key popped. Bucket i holds the
+    keys whose highest bit differing from the last popped key is bit
+    i - 1 (bucket 0: equal to it); popping from an empty bucket 0 finds
+    the first non-empty bucket and redistributes it around its minimum,
+    so every entry moves down at most 64 times. There is no decrease-key:
+    push again and skip the stale entries. Keys must be below 2^64.
+    """
+    bits = 64
+
+    def __init__(self):
+        self.last = 0
+        self.size = 0
+        self.buckets = [[] for _ in range(self.bits + 1)]
+
+    def __len__(self):
+        return self.size
+
+    def push(self, key, value):
+        if key < self.last:
+            raise ValueError("key %d below the last popped %d"
+                             % (key, self.last))
+        if key >> self.bits:
+            raise ValueError("key %d does not fit in %d bits"
+                             % (key, self.bits))
+        self.buckets[(key ^ self.last).bit_length()].append((key, value))
+        self.size += 1
+
+    def pop(self):
+        "removes and returns a (key, value) pair of the smallest key"
+        if self.size == 0:
+            raise IndexError("priority queue underflow")
+        buckets = self.buckets
+        if not buckets[0]:
+            i = 1
+            while not buckets[i]:
+                i += 1
+            entries, buckets[i] = buckets[i], []
+            last = self.last = min(entries)[0]
+            for entry in entries:
+                buckets[(entry[0] ^ last).bit_length()].append(entry)
+        self.size -= 1
+        return buckets[0].pop()
@@ -1,17 +1,34 @@
 
-from src.pqueue import pqueue
-from src.weighted_dfs import WeightedTopologicalSort
-from src.weighted_digraph import WeightedDigraph, WeightedDirectedCycle
+from array import array
+from collections import deque
+
+from src.pqueue import IndexMinPQ, RadixHeap
+from src.marks import INF, distances
+from src.dfs import edge_target, in_degrees, topological
+from src.weighted_digraph import WeightedDigraph, DirectedEdge
+
+
+def edge_path(edge_to, v):
+    "edges of the tree path into v, first to last, in O(length)"
+    path = []
+    e = edge_to[v]
+    while e is not None:
+        path.append(e)
+        e = edge_to[e.origin()]
+    path.reverse()
+    return path
 
 
 class SP(object):
+    _distances = staticmethod(distances)    # allocates _dist_to
+
     def __init__(self, graph, source):
         """SP represents the shortest directed path tree with two lists.
         Shortest paths s->...->(v1,2,...,vk) are computed iff:
         -> _dist_to[v] is the length of some path from s to v
         -> for each edge (v->w), _dist_to[w] <= _dist_to[v] + e.weight
         (the equal may refer to the case where s->w goes through v)"""
-        self._dist_to = [float("inf")] * graph.V
+        self._dist_to = self._distances(graph.V)
         self._edge_to = [None] * graph.V
         self._dist_to[source] = 0.0
 
@@ -22,15 +39,7 @@ class SP(object):
         return self._dist_to[v] < float("inf")
 
     def path_to(self, v):
-        path = []
-        e = self._edge_to[v]
-        if e is None:
-            return []
-        path = [e] + path
-        while e is not None:
-            e = self._edge_to[e.origin()]
-            path = [e] + path
-        return path
+        return edge_path(self._edge_to, v)
 
     def relax(self, e):
         v, w = e.origin(), e.target()
@@ -40,46 +49,407 @@ class SP(object):
 
 
 class DijkstraSP(SP):
+    arity = 4       # of the IndexMinPQ heap
+
     def __init__(self, graph, source):
         super(DijkstraSP, self).__init__(graph, source)
-        self._q = pqueue()
-        self._q.enqueue((0.0, source))
+        self._q = IndexMinPQ(graph.V, self.arity)
+        self._q.insert(source, 0.0)
         while len(self._q) != 0:
-            v = self._q.dequeue()
+            v = self._q.del_min()
             for e in graph.adj(v):
                 self.relax(e)
 
     def relax(self, e):
         v, w = e.origin(), e.target()
-        if self.dist_to(w) > self.dist_to(v) + e.weight:
-            self._dist_to[w] = self.dist_to(v) + e.weight
+        dist = self._dist_to[v] + e.weight
+        if self._dist_to[w] > dist:
+            self._dist_to[w] = dist
             self._edge_to[w] = e
-            self._q.update(self.dist_to(w), w)
+            self._q.update(dist, w)
 
 
-class AcyclicSP(SP):
+def weight_stats(graph):
+    """
+    (lowest, highest, integral) over the edge weights, integral telling
+    whether they are all whole numbers; (0, 0, True) without edges.
+    """
+    low, high, integral = INF, -INF, True
+    for v in graph.vertices():
+        for e in graph.adj(v):
+            weight = e.weight
+            if weight < low:
+                low = weight
+            if weight > high:
+                high = weight
+            if integral and weight != int(weight):
+                integral = False
+    if low == INF:
+        return 0, 0, True
+    return low, high, integral
+
+
+def _integral_weights(graph):
+    "the largest weight, after checking they are whole and non-negative"
+    low, high, integral = weight_stats(graph)
+    if low < 0 or not integral:
+        raise ValueError("weights must be non-negative integers")
+    return int(high)
+
+
+class DialSP(SP):
+    """
+    Dijkstra for integer weights in 0..C on Dial's bucket queue: C + 1
+    buckets used circularly, bucket d % (C + 1) holding the vertices at
+    tentative distance d, scanned in increasing d. O(E + D) for a largest
+    distance D; entries left behind by a later decrease are skipped. A
+    known `max_weight` saves the scan that checks the weights.
+    """
+    def __init__(self, graph, source, max_weight=None):
+        super(DialSP, self).__init__(graph, source)
+        if max_weight is None:
+            max_weight = _integral_weights(graph)
+        C = int(max_weight) + 1
+        dist_to, edge_to, adj = self._dist_to, self._edge_to, graph.adj
+        buckets = [[] for _ in range(C)]
+        buckets[0].append(source)
+        pending, d = 1, 0
+        while pending:
+            bucket = buckets[d % C]
+            while bucket:                  # zero weights refill it
+                v = bucket.pop()
+                pending -= 1
+                if dist_to[v] != d:
+                    continue
+                for e in adj(v):
+                    w = e.target()
+                    dist = d + e.weight
+                    if dist < dist_to[w]:
+                        dist_to[w] = dist
+                        edge_to[w] = e
+                        buckets[int(dist) % C].append(w)
+                        pending += 1
+            d += 1
+
+
+class RadixHeapSP(SP):
+    """
+    Dijkstra for non-negative integer weights on a RadixHeap: no key
+    comparisons, O(E + V log C) for a largest weight C. Distances are kept
+    as exact ints rather than doubles, so they stay exact past 2^53; one
+    reaching 2^64 raises ValueError.
+    """
+    @staticmethod
+    def _distances(V):
+        return [INF] * V
+
     def __init__(self, graph, source):
+        super(RadixHeapSP, self).__init__(graph, source)
+        _integral_weights(graph)
+        dist_to, edge_to, adj = self._dist_to, self._edge_to, graph.adj
+        heap = RadixHeap()
+        heap.push(0, source)
+        while heap.size:
+            d, v = heap.pop()
+            if dist_to[v] != d:
+                continue
+            for e in adj(v):
+                w = e.target()
+                dist = d + int(e.weight)
+                if dist < dist_to[w]:
+                    dist_to[w] = dist
+                    edge_to[w] = e
+                    heap.push(dist, w)
+
+
+class DeltaSteppingSP(SP):
+    """
+    Delta-stepping, sequentially: bucket i holds the vertices at tentative
+    distance [i * delta, (i + 1) * delta). The lowest bucket is emptied
+    relaxing only light edges (weight <= delta), which may refill it, and
+    then the heavy edges of everything it held are relaxed once. Any
+    non-negative weights; delta defaults to the mean weight (1.0 if all
+    weights are 0).
+    """
+    def __init__(self, graph, source, delta=None):
+        super(DeltaSteppingSP, self).__init__(graph, source)
+        if delta is None:
+            weights = [e.weight for v in graph.vertices()
+                       for e in graph.adj(v)]
+            delta = float(sum(weights)) / len(weights) if weights else 0.0
+            delta = delta or 1.0        # no edges, or all of weight 0
+        if delta <= 0:
+            raise ValueError("delta must be positive")
+        self.delta = delta
+        dist_to, adj = self._dist_to, graph.adj
+        buckets = [[source]]
+        i = 0
+        while i < len(buckets):
+            emptied = set()
+            while buckets[i]:
+                frontier, buckets[i] = buckets[i], []
+                for v in frontier:
+                    if int(dist_to[v] / delta) != i:
+                        continue            # moved on by a later decrease
+                    emptied.add(v)
+                    for e in adj(v):
+                        if e.weight <= delta:
+                            self._relax(buckets, e)
+            for v in emptied:
+                for e in adj(v):
+                    if e.weight > delta:
+                        self._relax(buckets, e)
+            i += 1
+
+    def _relax(self, buckets, e):
+        dist_to = self._dist_to
+        v, w = e.origin(), e.target()
+        dist = dist_to[v] + e.weight
+        if dist < dist_to[w]:
+            dist_to[w] = dist
+            self._edge_to[w] = e
+            i = int(dist / self.delta)
+            while len(buckets) <= i:
+                buckets.append([])
+            buckets[i].append(w)
+
+
+class SPWorkspace(object):
+    """
+    Point-to-point Dijkstra/A* state bound to one graph and reused across
+    queries, like src.bfs.BFSWorkspace: the buffers are allocated once and
+    each search only resets the vertices the previous one touched. Not
+    safe to share between threads; use one workspace per searcher.
+    """
+    arity = 4       # of the IndexMinPQ heap
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.dist_to = distances(graph.V)
+        self.edge_to = [None] * graph.V
+        self.touched = []
+        self.settled = 0        # by the last search
+        self._q = IndexMinPQ(graph.V, self.arity)
+
+    def _reset(self):
+        dist_to, edge_to = self.dist_to, self.edge_to
+        for v in self.touched:
+            dist_to[v] = INF
+            edge_to[v] = None
+        del self.touched[:]
+        self._q.clear()
+        self.settled = 0
+
+    def search(self, source, target, heuristic=None):
+        """
+        Distance from source to target (INF if unreachable), settling
+        vertices only until target is. `heuristic(v, target)` must never
+        overestimate the distance left from v; vertices are then queued
+        by distance plus estimate (A*), and reopened if reached again by
+        a shorter path, so consistency is not required.
+        """
+        estimate = None
+        if heuristic is not None:
+            estimate = lambda v: heuristic(v, target)
+        self._run(source, set([target]), estimate)
+        return self.dist_to[target]
+
+    def distances(self, source, targets):
+        """
+        Distances from source to each of targets (INF if unreachable),
+        settling vertices only until all of them are.
+        """
+        self._run(source, set(targets))
+        dist_to = self.dist_to
+        return [dist_to[t] for t in targets]
+
+    def _run(self, source, pending, estimate=None):
+        "Dijkstra, or A* given estimate(v), until pending is all settled"
+        self._reset()
+        dist_to, edge_to, touched, q = self.dist_to, self.edge_to, \
+            self.touched, self._q
+        adj = self.graph.adj
+        dist_to[source] = 0.0
+        touched.append(source)
+        q.insert(source, estimate(source) if estimate else 0.0)
+        while q.size and pending:
+            v = q.del_min()
+            self.settled += 1
+            if v in pending:
+                pending.discard(v)
+                if not pending:
+                    return
+            dist_v = dist_to[v]
+            for e in adj(v):
+                w = e.target()
+                dist = dist_v + e.weight
+                if dist_to[w] > dist:
+                    if dist_to[w] == INF:
+                        touched.append(w)
+                    dist_to[w] = dist
+                    edge_to[w] = e
+                    q.update(dist + estimate(w) if estimate else dist, w)
+
+    def path_to(self, v):
+        return edge_path(self.edge_to, v)
+
+
+def shortest_path(graph, source, target, heuristic=None, workspace=None):
+    """
+    (distance, edges) of a shortest source->target path, or (INF, None)
+    if there is none. Pass an SPWorkspace of the graph to reuse its
+    buffers across queries, and an admissible `heuristic(v, target)` for
+    A*; see SPWorkspace.search.
+    """
+    if workspace is None:
+        workspace = SPWorkspace(graph)
+    elif workspace.graph is not graph:
+        raise ValueError("workspace belongs to another graph")
+    dist = workspace.search(source, target, heuristic)
+    if dist == INF:
+        return INF, None
+    return dist, workspace.path_to(target)
+
+
+class BidirectionalDijkstraSP(object):
+    """
+    Shortest source->target path by two Dijkstra searches, forward from
+    source and backward from target on the cached graph.reverse(), always
+    advancing the side whose queue top is smaller. `mu` is the best path
+    seen where the two meet; the search stops once the two queue tops add
+    up to at least mu, since no path left can beat it. dist_to, has_path_to
+    and path_to answer for the target like DijkstraSP's do; `settled`
+    counts the vertices both sides settled. Pass the pair of workspaces
+    from `workspaces(graph)` to reuse buffers across queries.
+    """
+    def __init__(self, graph, source, target, workspaces=None):
+        if workspaces is None:
+            workspaces = self.workspaces(graph)
+        self.source, self.target = source, target
+        self._forward, self._backward = forward, backward = workspaces
+        if forward.graph is not graph:
+            raise ValueError("workspaces belong to another graph")
+        for workspace, s in ((forward, source), (backward, target)):
+            workspace._reset()
+            workspace.dist_to[s] = 0.0
+            workspace.touched.append(s)
+            workspace._q.insert(s, 0.0)
+        self._dist, self._meet = (0.0, source) if source == target \
+            else (INF, -1)
+        self._search()
+        self.settled = forward.settled + backward.settled
+
+    @staticmethod
+    def workspaces(graph):
+        return SPWorkspace(graph), SPWorkspace(graph.reverse())
+
+    def _search(self):
+        forward, backward = self._forward, self._backward
+        qf, qb = forward._q, backward._q
+        while qf.size and qb.size:
+            top_f, top_b = qf.keys[qf.pq[0]], qb.keys[qb.pq[0]]
+            if top_f + top_b >= self._dist:
+                return
+            if top_f <= top_b:
+                self._settle(forward, backward.dist_to)
+            else:
+                self._settle(backward, forward.dist_to)
+
+    def _settle(self, workspace, other_dist):
+        "settles the top of one side, relaxing its edges and meeting points"
+        dist_to, edge_to, touched, q = workspace.dist_to, \
+            workspace.edge_to, workspace.touched, workspace._q
+        v = q.del_min()
+        workspace.settled += 1
+        dist_v = dist_to[v]
+        for e in workspace.graph.adj(v):
+            w = e.target()
+            dist = dist_v + e.weight
+            if dist_to[w] > dist:
+                if dist_to[w] == INF:
+                    touched.append(w)
+                dist_to[w] = dist
+                edge_to[w] = e
+                q.update(dist, w)
+            if dist + other_dist[w] < self._dist:
+                self._dist, self._meet = dist + other_dist[w], w
+
+    def _check(self, v):
+        if v != self.target:
+            raise ValueError("only the target %d was searched for"
+                             % self.target)
+
+    def dist_to(self, v):
+        self._check(v)
+        return self._dist
+
+    def has_path_to(self, v):
+        self._check(v)
+        return self._dist < INF
+
+    def path_to(self, v):
+        "source->target edges: forward tree to the meeting vertex, then back"
+        self._check(v)
+        if not self.has_path_to(v):
+            return []
+        path = edge_path(self._forward.edge_to, self._meet)
+        edge_to, x = self._backward.edge_to, self._meet
+        e = edge_to[x]
+        while e is not None:            # turned around, meet->...->target
+            path.append(DirectedEdge(e.target(), e.origin(), e.weight))
+            e = edge_to[e.origin()]
+        return path
+
+
+class AcyclicSP(SP):
+    def __init__(self, graph, source, order=None):
+        """
+        `order`, a topological order of graph computed beforehand (as by
+        WeightedTopologicalSort), spares the Kahn pass when many sources
+        share one DAG; only the vertices from the source on are relaxed.
+        """
         super(AcyclicSP, self).__init__(graph, source)
-        topological = WeightedTopologicalSort(graph)
-        if not topological.has_order():
-            raise ValueError("Weighted Digraph has cycles")
-        for v in topological.order:
-            for e in graph.adj(v):
+        if order is not None:
+            adj = graph.adj
+            for i in range(order.index(source), len(order)):
+                for e in adj(order[i]):
+                    self.relax(e)
+            return
+        # relaxing each vertex as Kahn's algorithm releases it: one pass
+        indegree = in_degrees(graph, edge_target)
+        count = 0
+        for v, entries in topological(graph, indegree, edge_target):
+            count += 1
+            for e in entries:
                 self.relax(e)
+        if count != graph.V:
+            raise ValueError("Weighted Digraph has cycles")
 
 
 class BellmanFord(SP):
-    def __init__(self, graph, source):
+    """
+    Queue-based Bellman-Ford: only vertices whose distance just dropped
+    are scanned again. Every V successful relaxations the parent pointers
+    are walked once, in place, looking for a cycle, which is then a
+    negative one and stops the search. Two optional queue heuristics:
+    -> slf (Small Label First): a vertex whose new distance is below that
+       of the queue front jumps the queue
+    -> lll (Large Label Last): a front vertex with a distance above the
+       queue average is moved to the back before anything is scanned
+    """
+    def __init__(self, graph, source, slf=False, lll=False):
         super(BellmanFord, self).__init__(graph, source)
-        self._on_queue = [False] * graph.V
-        self._q = []
-        self._q = [source] + self._q
-        self._on_queue[source] = True
-        self._cost = 0
+        self.slf, self.lll = slf, lll
+        self._on_queue = bytearray(graph.V)
+        self._walk = array('l', [0]) * graph.V
+        self._walks = 0
+        self._relaxations = 0
         self._cycle = []
-        while len(self._q) != 0 and not self.has_negative_cycle():
-            v = self._q.pop()
-            self._on_queue[v] = False
+        self._q = deque([source])
+        self._on_queue[source] = True
+        self._total = 0.0               # of the queued distances, for lll
+        while self._q and not self.has_negative_cycle():
+            v = self._dequeue()
             self.relax(graph, v)
 
     def has_negative_cycle(self):
@@ -88,30 +458,94 @@ class BellmanFord(SP):
     def negative_cycle(self):
         return self._cycle
 
+    def _dequeue(self):
+        q, dist_to = self._q, self._dist_to
+        if self.lll:
+            for _ in range(len(q) - 1):
+                if dist_to[q[0]] * len(q) <= self._total:
+                    break
+                q.rotate(-1)
+            self._total -= dist_to[q[0]]
+        v = q.popleft()
+        self._on_queue[v] = False
+        return v
+
     def relax(self, graph, v):
+        dist_to, edge_to, on_queue = self._dist_to, self._edge_to, \
+            self._on_queue
+        q, V = self._q, graph.V
+        dist_v = dist_to[v]
         for e in graph.adj(v):
             w = e.target()
-            if self.dist_to(w) > self.dist_to(v) + e.weight:
-                self._dist_to[w] = self.dist_to(v) + e.weight
-                self._edge_to[w] = e
-                if not self._on_queue[w]:
-                    self._on_queue[w] = True
-                    self._q = [w] + self._q
-            self._find_negative_cycle(graph)
-            if self.has_negative_cycle():
-                return
+            dist = dist_v + e.weight
+            if dist_to[w] > dist:
+                if on_queue[w]:
+                    self._total += dist - dist_to[w]
+                else:
+                    on_queue[w] = True
+                    self._total += dist
+                    if self.slf and q and dist < dist_to[q[0]]:
+                        q.appendleft(w)
+                    else:
+                        q.append(w)
+                dist_to[w] = dist
+                edge_to[w] = e
+                self._relaxations += 1
+                if self._relaxations % V == 0:
+                    self._find_negative_cycle(V)
+                    if self.has_negative_cycle():
+                        return
+
+    def _find_negative_cycle(self, V):
+        """
+        Follows the parent pointers from every vertex not seen yet in this
+        check, stamping each walk with its own number in `_walk`: meeting a
+        stamp of the current walk closes a cycle, an older one (or the
+        source) ends the walk. O(V) per check and nothing allocated.
+        """
+        edge_to, walk = self._edge_to, self._walk
+        first = self._walks + 1
+        for s in range(V):
+            if walk[s] >= first:
+                continue
+            self._walks += 1
+            stamp, x = self._walks, s
+            while x != -1 and walk[x] < first:
+                walk[x] = stamp
+                e = edge_to[x]
+                x = -1 if e is None else e.origin()
+            if x != -1 and walk[x] == stamp:
+                e = edge_to[x]
+                while True:
+                    self._cycle.append(e)
+                    if e.origin() == x:
+                        return
+                    e = edge_to[e.origin()]
+
+
+# engine_for's thresholds: the largest integer weight still worth Dial's
+# buckets, and the highest to lowest weight ratio worth delta-stepping
+DIAL_MAX_WEIGHT = 1000
+DELTA_MAX_RATIO = 100.0
+
+
+def engine_for(graph, stats=None):
+    """
+    The single-source engine suited to the weights of graph (given its
+    weight_stats, or scanning them): BellmanFord if any is negative, Dial
+    for small integers, the radix heap for other integers, delta-stepping
+    for weights within a bounded ratio, DijkstraSP otherwise. Every engine
+    is called as engine(graph, source).
+    """
+    low, high, integral = stats or weight_stats(graph)
+    if low < 0:
+        return BellmanFord
+    if integral:
+        return DialSP if high <= DIAL_MAX_WEIGHT else RadixHeapSP
+    if low > 0 and high <= DELTA_MAX_RATIO * low:
+        return DeltaSteppingSP
+    return DijkstraSP
 
-    def _find_negative_cycle(self, graph):
-        self._cost += 1
-        if self._cost % graph.V == 0:
-            wdg = WeightedDigraph(graph.V)
-            for v in graph.vertices():
-                if self._edge_to[v]:
-                    e = self._edge_to[v]
-                    v, w, weight = e.origin(), e.target(), e.weight
-                    wdg.add_edge(v, w, weight)
-            cycle = WeightedDirectedCycle(wdg)
-            self._cycle = cycle.cycle()
 
 if __name__ == '__main__':
     from argparse import ArgumentParser
@@ -121,17 +555,26 @@ if __name__ == '__main__':
     parser.add_argument('action', default='dijkstra')
     parser.add_argument('-f', '--fname')
     parser.add_argument('-s', '--source', type=int)
+    parser.add_argument('-c', '--compact', action='store_true')
 
     args = vars(parser.parse_args())
 
     fname = args['fname']
     source = args['source']
-    graph = WeightedDigraph.from_file(fname)
+    graph = WeightedDigraph.from_file(fname, compact=args['compact'])
 
     if args['action'] == 'dijkstra':
         sp = DijkstraSP(graph, source)
     elif args['action'] == 'acyclic':
         sp = AcyclicSP(graph, source)
+    elif args['action'] == 'dial':
+        sp = DialSP(graph, source)
+    elif args['action'] == 'radix':
+        sp = RadixHeapSP(graph, source)
+    elif args['action'] == 'delta':
+        sp = DeltaSteppingSP(graph, source)
+    elif args['action'] == 'auto':
+        sp = engine_for(graph)(graph, source)
     elif args['action'] == 'bellman':
         sp = BellmanFord(graph, source)
         if sp.has_negative_cycle():
@@ -1,14 +1,92 @@
+from array import array
 
 
-class UnionFind(object):
-    "quick UnionFind implementation with path compression"
+class IntUnionFind(object):
+    """
+    UnionFind over the integers 0..N-1 in typed arrays: union by size and
+    iterative path halving, so no recursion and near-constant finds.
+    """
     def __init__(self, N):
         self.n_sets = N
-        self.parents = range(N)
-        self.ranks = [0] * N
+        self.parents = array('l', range(N))
+        self.sizes = array('l', [1]) * N
+
+    def find(self, x):
+        parents = self.parents
+        while parents[x] != x:
+            parents[x] = parents[parents[x]]     # halve the path
+            x = parents[x]
+        return x
+
+    def union(self, x, y):
+        "merges the sets of x and y; returns whether they were apart"
+        root_x, root_y = self.find(x), self.find(y)
+        if root_x == root_y:
+            return False
+        sizes = self.sizes
+        if sizes[root_x] < sizes[root_y]:
+            root_x, root_y = root_y, root_x
+        self.parents[root_y] = root_x
+        sizes[root_x] += sizes[root_y]
+        self.n_sets -= 1
+        return True
+
+    def connected(self, x, y):
+        return self.find(x) == self.find(y)
+
+    def size(self, x):
+        "number of elements in the set of x"
+        return self.sizes[self.find(x)]
+
+    def union_many(self, xs, ys, n_sets=None):
+        """
+        Unions xs[i] with ys[i] in order (e.g. the tails and heads arrays
+        of an edge list); returns a bytearray flagging the pairs that
+        merged two sets. Stops early once only `n_sets` sets are left, the
+        remaining pairs unflagged.
+        """
+        parents, sizes = self.parents, self.sizes
+        merged = bytearray(len(xs))
+        for i in range(len(xs)):
+            if self.n_sets == n_sets:
+                break
+            x, y = xs[i], ys[i]
+            while parents[x] != x:
+                parents[x] = parents[parents[x]]
+                x = parents[x]
+            while parents[y] != y:
+                parents[y] = parents[parents[y]]
+                y = parents[y]
+            if x == y:
+                continue
+            if sizes[x] < sizes[y]:
+                x, y = y, x
+            parents[y] = x
+            sizes[x] += sizes[y]
+            self.n_sets -= 1
+            merged[i] = 1
+        return merged
+
+    def find_many(self, xs):
+        "array of the roots of xs"
+        find = self.find
+        return array('l', [find(x) for x in xs])
+
+
+class UnionFind(object):
+    """
+    UnionFind over any hashable keys, numbered in order of first use, on
+    top of an IntUnionFind of N elements.
+    """
+    def __init__(self, N):
+        self._uf = IntUnionFind(N)
         self._encode = {}
         self._decode = []
 
+    @property
+    def n_sets(self):
+        return self._uf.n_sets
+
     def encode(self, x):
         if x not in self._encode:
             idx = len(self._decode)
@@ -20,31 +98,12 @@ class UnionFind(object):
     def decode(self, idx):
         return self._decode[idx]
 
-    def _find(self, x):
-        if x == self.parents[x]:
-            return x
-        else:
-            root_x = self._find(self.parents[x])
-            self.parents[x] = root_x
-            return root_x
-
     def find(self, x):
         idx = self.encode(x)
-        return self._find(idx)
+        return self._uf.find(idx)
 
     def _union(self, x, y):
-        root_x = self.find(x)
-        root_y = self.find(y)
-        if root_x == root_y:
-            return
-        if self.ranks[root_x] > self.ranks[root_y]:
-            self.parents[root_y] = root_x
-        elif self.ranks[root_x] < self.ranks[root_y]:
-            self.parents[root_x] = root_y
-        else:                   # not yet connected
-            self.parents[root_y] = root_x
-            self.ranks[root_x] += 1
-        self.n_sets -= 1
+        self._uf.union(self.encode(x), self.encode(y))
 
     def union(self, *xs):
         for x, y in zip(xs[::2], xs[1::2]):
@@ -1,6 +1,9 @@
 
+from array import array
+
 from src.graph import Graph
 from src.digraph import DirectedCycle
+from src.dfs import edge_target
 
 
 class DirectedEdge(object):
@@ -20,6 +23,8 @@ class DirectedEdge(object):
 
 
 class WeightedDigraph(Graph):
+    _reverse = None     # built on demand, dropped whenever an edge is added
+
     def __init__(self, V):
         super(WeightedDigraph, self).__init__(V)
 
@@ -28,25 +33,53 @@ class WeightedDigraph(Graph):
         self.E += 1
         edge = DirectedEdge(v, w, weight)
         self._adj[v].append(edge)
+        self._reverse = None
+
+    def _extend(self, tails, heads, weights):
+        adj = self._adj
+        for i in range(len(tails)):
+            v = tails[i]
+            adj[v].append(DirectedEdge(v, heads[i], weights[i]))
+        self.E += len(tails)
+        self._reverse = None
+
+    def reverse(self):
+        """
+        The digraph with every edge turned around (same weights), built on
+        the first call and cached until the next add_edge; callers must
+        not modify it.
+        """
+        if self._reverse is None:
+            self._reverse = self._build_reverse()
+        return self._reverse
+
+    def _build_reverse(self):
+        tails, heads = array('i'), array('i')
+        weights = array('d')
+        for adj in self._adj:
+            for e in adj:
+                tails.append(e.target())
+                heads.append(e.origin())
+                weights.append(e.weight)
+        graph = WeightedDigraph(self.V)
+        graph._extend(tails, heads, weights)
+        return graph
+
+    @staticmethod
+    def _frozen_class():
+        from src.csr import CSRWeightedDigraph
+        return CSRWeightedDigraph
 
 
 class WeightedDirectedCycle(DirectedCycle):
+    _other = staticmethod(edge_target)
+
     def __init__(self, graph):
         super(WeightedDirectedCycle, self).__init__(graph)
 
-    def dfs(self, graph, v):
-        self._on_stack[v] = True
-        self._marked.add(v)
-        for e in graph.adj(v):
-            w = e.target()
-            if self.has_cycle():
-                return
-            if not self.marked(w):
-                self._edge_to[w] = e
-                self.dfs(graph, w)
-            elif self._on_stack[w]:  # found cycle
-                self._find_cycle(e, w)
-        self._on_stack[v] = False
+    @staticmethod
+    def _edge(v, e):
+        return e
 
     def _find_cycle(self, e, w):
         cycle, x = [], e
@@ -38,6 +38,20 @@ class WeightedGraph(Graph):
         self._adj[v].append(edge)
         self._adj[w].append(edge)
 
+    def _extend(self, tails, heads, weights):
+        adj = self._adj
+        for i in range(len(tails)):
+            v, w = tails[i], heads[i]
+            edge = Edge(v, w, weights[i])
+            adj[v].append(edge)
+            adj[w].append(edge)
+        self.E += len(tails)
+
+    @staticmethod
+    def _frozen_class():
+        from src.csr import CSRWeightedGraph
+        return CSRWeightedGraph
+
     def edges(self):
         edges = []
         for v in range(self.V):
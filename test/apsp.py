@@ -0,0 +1,64 @@
+from src import apsp
+from src.apsp import many_to_many, floyd_warshall
+from src.sp import AcyclicSP, DijkstraSP, BellmanFord
+from src.weighted_dfs import WeightedTopologicalSort
+from src.weighted_digraph import WeightedDigraph
+
+
+def close(a, b):
+    return a == b or abs(a - b) < 1e-9
+
+
+def many_to_many_matrix():
+    graph = WeightedDigraph.from_file('data/mediumEWD.txt')
+    sources, targets = [0, 7, 42, 249, 7], [3, 0, 100, 200]
+    expected = [[DijkstraSP(graph, s).dist_to(t) for t in targets]
+                for s in sources]
+    for processes in (1, 2):
+        matrix = many_to_many(graph, sources, targets, processes=processes)
+        assert len(matrix) == len(sources)
+        for row, want in zip(matrix, expected):
+            assert all(close(d, e) for d, e in zip(row, want))
+    dag = WeightedDigraph.from_file('data/tinyEWDAG.txt')
+    matrix = many_to_many(dag, [5, 1], algorithm='acyclic', processes=2)
+    assert all(close(matrix[1][t], DijkstraSP(dag, 1).dist_to(t))
+               for t in dag.vertices())
+
+
+def acyclic_order():
+    dag = WeightedDigraph.from_file('data/tinyEWDAG.txt')
+    order = WeightedTopologicalSort(dag).order
+    for s in dag.vertices():
+        kahn, shared = AcyclicSP(dag, s), AcyclicSP(dag, s, order)
+        assert kahn._dist_to == shared._dist_to
+    for processes in (1, 2):
+        matrix = many_to_many(dag, dag.vertices(), algorithm='acyclic',
+                              processes=processes)
+        assert all(close(matrix[s][t], AcyclicSP(dag, s).dist_to(t))
+                   for s in dag.vertices() for t in dag.vertices())
+    try:
+        many_to_many(WeightedDigraph.from_file('data/tinyEWD.txt'), [0],
+                     algorithm='acyclic', processes=2)
+        assert False
+    except ValueError:
+        pass
+
+
+def floyd_warshall_matrix():
+    numpy = apsp.numpy
+    graph = WeightedDigraph.from_file('data/tinyEWDn.txt')
+    trees = [BellmanFord(graph, s) for s in graph.vertices()]
+    try:
+        for apsp.numpy in set([numpy, None]):
+            dist = floyd_warshall(graph)
+            for s in graph.vertices():
+                assert all(close(dist[s][t], trees[s].dist_to(t))
+                           for t in graph.vertices())
+            try:
+                floyd_warshall(WeightedDigraph.from_file(
+                    'data/tinyEWDnc.txt'))
+                assert False
+            except ValueError:
+                pass
+    finally:
+        apsp.numpy = numpy
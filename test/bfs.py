@@ -0,0 +1,27 @@
+from src.bfs import BFSWorkspace, BreadthFirstSearch
+from src.digraph import Digraph
+
+
+def path(V):
+    graph = Digraph(V)
+    for v in range(V - 1):
+        graph.add_edge(v, v + 1)
+    return graph
+
+
+def workspace():
+    bfs = BFSWorkspace(path(6))
+    bfs.search(3)
+    assert list(bfs.path_to(5)) == [3, 4, 5] and not bfs.has_path(1)
+    bfs.search(0)       # buffers reused, state of the last search gone
+    assert bfs.dist_to[5] == 5 and list(bfs.path_to(2)) == [0, 1, 2]
+    bfs.search([1, 4])
+    assert bfs.dist_to[5] == 1 and bfs.dist_to[3] == 2 and bfs.edge_to[0] == -1
+
+
+def targets():
+    bfs = BFSWorkspace(path(100))
+    bfs.search(0, targets=[3])
+    assert bfs.dist_to[3] == 3 and not bfs.has_path(50)
+    assert len(bfs.touched) == 4
+    assert BreadthFirstSearch(path(100), 0).dist_to[99] == 99
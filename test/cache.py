@@ -0,0 +1,14 @@
+from src.cache import LRUCache
+
+
+def lru():
+    cache = LRUCache(2)
+    cache['a'], cache['b'] = 1, 2
+    assert cache.get('a') == 1          # 'b' is now the least recent
+    cache['c'] = 3
+    assert 'b' not in cache and len(cache) == 2
+    assert cache.get('b') is None and cache.get('c') == 3
+    assert (cache.hits, cache.misses) == (2, 1)
+    cache['a'] = 4                      # overwriting refreshes too
+    cache['d'] = 5
+    assert 'c' not in cache and cache.get('a') == 4
@@ -0,0 +1,35 @@
+from multiprocessing import active_children
+
+from src.cc import ConnectedComponents, UnionFindCC, ParallelCC, edge_arrays
+from src.graph import Graph
+
+
+def connectivity():
+    for fname in ('data/tinyG.txt', 'data/mediumG.txt'):
+        graph = Graph.from_file(fname)
+        for g in (graph, graph.freeze()):
+            cc, ufcc = ConnectedComponents(g), UnionFindCC(g)
+            assert cc.ids == ufcc.ids and cc.size == ufcc.size
+            assert cc.components() == ufcc.components()
+
+
+def parallel_connectivity():
+    for fname in ('data/tinyG.txt', 'data/mediumG.txt'):
+        graph = Graph.from_file(fname)
+        cc = ConnectedComponents(graph)
+        pcc = ParallelCC(graph.freeze(), processes=2, chunks=5)
+        assert cc.ids == pcc.ids and cc.size == pcc.size
+        tails, heads = edge_arrays(graph)
+        pcc = ParallelCC.from_edges(graph.V, tails, heads, processes=2)
+        assert cc.ids == pcc.ids and cc.count() == pcc.count()
+
+
+def parallel_failure():
+    tails, heads = [0, 1, 5], [1, 2, 9]      # 9 is out of range
+    try:
+        ParallelCC.from_edges(4, tails, heads, processes=2, chunks=3)
+    except IndexError:
+        pass
+    else:
+        assert False, "an edge out of range"
+    assert not active_children()
@@ -0,0 +1,55 @@
+import os
+import tempfile
+
+from src.ch import ContractionHierarchy, CHQuery
+from src.marks import INF
+from src.sp import DijkstraSP
+from src.weighted_digraph import WeightedDigraph
+
+
+def check(graph, hierarchy, sources):
+    query = CHQuery(hierarchy)
+    for s in sources:
+        tree = DijkstraSP(graph, s)
+        for t in graph.vertices():
+            dist, path = query.shortest_path(s, t)
+            if not tree.has_path_to(t):
+                assert dist == INF and path is None
+                continue
+            assert abs(dist - tree.dist_to(t)) < 1e-9
+            assert abs(sum(e.weight for e in path) - dist) < 1e-9
+            assert [e.origin() for e in path] + [t] == \
+                [s] + [e.target() for e in path]
+            assert query.distance(s, t) == dist
+
+
+def contraction_hierarchy():
+    graph = WeightedDigraph.from_file('data/tinyEWD.txt')
+    graph.add_edge(3, 3, 0.5)           # self loops are never shortcuts
+    hierarchy = ContractionHierarchy.build(graph)
+    assert sorted(hierarchy.rank) == list(graph.vertices())
+    check(graph, hierarchy, graph.vertices())
+    for v in graph.vertices():
+        for rows in (hierarchy.up, hierarchy.down):
+            for i in range(rows.offsets[v], rows.offsets[v + 1]):
+                assert hierarchy.rank[rows.targets[i]] > hierarchy.rank[v]
+    graph = WeightedDigraph.from_file('data/mediumEWD.txt')
+    check(graph, ContractionHierarchy.build(graph), range(0, graph.V, 25))
+
+
+def save_load():
+    graph = WeightedDigraph.from_file('data/mediumEWD.txt')
+    hierarchy = ContractionHierarchy.build(graph)
+    fd, fname = tempfile.mkstemp()
+    os.close(fd)
+    try:
+        hierarchy.save(fname)
+        loaded = ContractionHierarchy.load(fname)
+    finally:
+        os.remove(fname)
+    assert loaded.rank == hierarchy.rank
+    assert loaded.nbytes() == hierarchy.nbytes()
+    for a, b in zip(loaded.up.arrays() + loaded.down.arrays(),
+                    hierarchy.up.arrays() + hierarchy.down.arrays()):
+        assert a == b
+    check(graph, loaded, [0, 1, 2])
@@ -0,0 +1,71 @@
+from src.graph import Graph
+from src.digraph import Digraph
+from src.weighted_graph import WeightedGraph
+from src.weighted_digraph import WeightedDigraph
+from src.bfs import BreadthFirstSearch
+from src.dfs import TopologicalSort
+from src.cc import ConnectedComponents
+from src.sp import DijkstraSP
+from src.mst import KruskalMST
+
+
+def rows(graph):
+    "adjacency as (endpoint, weight) rows; undirected Edge orientation varies"
+    def unpack(v, x):
+        if hasattr(x, 'other'):
+            return x.other(v), x.weight
+        if hasattr(x, 'target'):
+            return x.target(), x.weight
+        return x, None
+    return [[unpack(v, x) for x in graph.adj(v)] for v in graph.vertices()]
+
+
+def same_rows(graph, frozen):
+    return graph.V == frozen.V and graph.E == frozen.E and \
+        rows(graph) == rows(frozen)
+
+
+def freeze():
+    for cls, fname in [(Graph, 'data/tinyG.txt'),
+                       (Digraph, 'data/tinyDG.txt'),
+                       (WeightedGraph, 'data/tinyEWG.txt'),
+                       (WeightedDigraph, 'data/tinyEWD.txt')]:
+        graph = cls.from_file(fname)
+        assert same_rows(graph, graph.freeze())
+        assert same_rows(graph, cls.from_file(fname, compact=True))
+
+
+def immutable():
+    graph = Graph.from_file('data/tinyG.txt').freeze()
+    try:
+        graph.add_edge(0, 1)
+    except TypeError:
+        return
+    assert False
+
+
+def degree():
+    graph = Graph.from_file('data/tinyG.txt')
+    frozen = graph.freeze()
+    for v in graph.vertices():
+        assert graph.degree(v) == frozen.degree(v)
+    assert len(frozen.edges()) == graph.E
+
+
+def reverse():
+    graph = Digraph.from_file('data/tinyDG.txt')
+    assert str(graph.reverse()) == str(graph.freeze().reverse())
+
+
+def algorithms():
+    graph = Graph.from_file('data/tinyG.txt')
+    frozen = graph.freeze()
+    assert BreadthFirstSearch(graph, 0).dist_to == \
+        BreadthFirstSearch(frozen, 0).dist_to
+    assert ConnectedComponents(graph).ids == ConnectedComponents(frozen).ids
+    dag = Digraph.from_file('data/tinyDAG.txt')
+    assert TopologicalSort(dag).order == TopologicalSort(dag.freeze()).order
+    ewd = WeightedDigraph.from_file('data/tinyEWD.txt')
+    assert DijkstraSP(ewd, 0)._dist_to == DijkstraSP(ewd.freeze(), 0)._dist_to
+    ewg = WeightedGraph.from_file('data/tinyEWG.txt')
+    assert KruskalMST(ewg).weight() == KruskalMST(ewg.freeze()).weight()
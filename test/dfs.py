@@ -0,0 +1,146 @@
+import random
+import sys
+
+from src.graph import Graph
+from src.digraph import Digraph, DirectedCycle
+from src.dfs import depth_first, PRE, POST, TREE, NONTREE
+from src.dfs import DepthFirstPaths, DepthFirstOrder, KosarajuSharirSCC
+from src.dfs import Cycle, TarjanSCC, TopologicalSort
+from src.cc import ConnectedComponents
+from src.weighted_digraph import WeightedDigraph
+from src.weighted_dfs import WeightedTarjanSCC, WeightedTopologicalSort
+from src.marks import Marks
+from src.union_find import IntUnionFind
+
+
+def path_digraph(V):
+    graph = Digraph(V)
+    for v in range(V - 1):
+        graph.add_edge(v, v + 1)
+    return graph
+
+
+def events():
+    graph = Digraph(3)
+    graph.add_edge(0, 1)
+    graph.add_edge(0, 2)
+    graph.add_edge(1, 2)
+    assert list(depth_first(graph, 0, Marks(3))) == [
+        (PRE, 0, None, None), (TREE, 0, 1, 1), (PRE, 1, None, None),
+        (TREE, 1, 2, 2), (PRE, 2, None, None), (POST, 2, None, None),
+        (POST, 1, None, None), (NONTREE, 0, 2, 2), (POST, 0, None, None)]
+
+
+def deep_path():
+    V = sys.getrecursionlimit() * 10
+    graph = path_digraph(V)
+    order = DepthFirstOrder(graph)
+    assert order.postorder == list(range(V))[::-1]
+    assert KosarajuSharirSCC(graph).count == V
+    assert not DirectedCycle(graph).has_cycle()
+    graph.add_edge(V - 1, 0)
+    assert len(DirectedCycle(graph).cycle()) == V + 1
+    cc = ConnectedComponents(graph)
+    assert cc.count() == 1 and cc.size[0] == V
+
+
+def depth_first_paths():
+    graph = Graph.from_file('data/tinyCG.txt')
+    paths = DepthFirstPaths(graph, 0)
+    for v in graph.vertices():
+        assert paths.has_path(v)
+        path = list(paths.path_to(v))
+        assert path[0] == 0 and path[-1] == v
+        for x, y in zip(path, path[1:]):
+            assert y in graph.adj(x)
+
+
+def partition(ids):
+    members = {}
+    for v, c in enumerate(ids):
+        members.setdefault(c, []).append(v)
+    return sorted(members.values())
+
+
+def tarjan():
+    for fname in ('data/tinyDG.txt', 'data/tinyDAG.txt'):
+        graph = Digraph.from_file(fname)
+        kosaraju, tarjan = KosarajuSharirSCC(graph), TarjanSCC(graph)
+        assert tarjan.count == kosaraju.count
+        assert partition(tarjan.ids) == partition(kosaraju.ids)
+        assert list(tarjan.sizes) == [len(c) for c in tarjan.components()]
+        dag = tarjan.condensation()
+        assert dag is tarjan.condensation() and dag.V == tarjan.count
+        for c in dag.vertices():
+            assert all(d < c for d in dag.adj(c))
+    cycle = path_digraph(sys.getrecursionlimit() * 10)
+    cycle.add_edge(cycle.V - 1, 0)
+    assert TarjanSCC(cycle).count == 1
+    unweighted = Digraph.from_file('data/tinyDG.txt')
+    weighted = WeightedDigraph(unweighted.V)
+    for v in unweighted.vertices():
+        for w in unweighted.adj(v):
+            weighted.add_edge(v, w, 0.5)
+    tarjan, expected = WeightedTarjanSCC(weighted), TarjanSCC(unweighted)
+    assert tarjan.count == 5 and list(tarjan.ids) == list(expected.ids)
+    dag = tarjan.condensation()
+    assert [list(dag.adj(c)) for c in dag.vertices()] == \
+        [list(expected.condensation().adj(c)) for c in dag.vertices()]
+
+
+def topological_sort():
+    for graph in (Digraph.from_file('data/tinyDAG.txt'),
+                  Digraph.from_file('data/tinyDAG.txt', compact=True)):
+        topo = TopologicalSort(graph)
+        assert topo.has_order() and not topo.has_cycle()
+        assert sorted(topo.order) == list(graph.vertices())
+        for v in graph.vertices():
+            assert topo.order[topo.rank(v)] == v
+            assert all(topo.rank(v) < topo.rank(w) for w in graph.adj(v))
+    graph = Digraph.from_file('data/tinyDG.txt')
+    topo = TopologicalSort(graph)
+    assert topo.order is None and topo.rank(0) is None
+    cycle = topo.cycle()
+    assert cycle[0] == cycle[-1] and len(set(cycle)) == len(cycle) - 1
+    for v, w in zip(cycle, cycle[1:]):
+        assert w in graph.adj(v)
+    graph = path_digraph(sys.getrecursionlimit() * 10)
+    assert TopologicalSort(graph).order == list(graph.vertices())
+    graph.add_edge(graph.V - 1, 0)
+    assert len(TopologicalSort(graph).cycle()) == graph.V + 1
+
+
+def weighted_topological_sort():
+    graph = WeightedDigraph.from_file('data/tinyEWDAG.txt')
+    topo = WeightedTopologicalSort(graph)
+    for v in graph.vertices():
+        assert all(topo.rank(v) < topo.rank(e.target()) for e in graph.adj(v))
+    graph.add_edge(6, 5, 0.5)           # closes 5->1->3->6->5
+    cycle = WeightedTopologicalSort(graph).cycle()
+    assert cycle and not WeightedTopologicalSort(graph).has_order()
+    assert cycle[0].origin() == cycle[-1].target()
+    for e, f in zip(cycle, cycle[1:]):
+        assert e.target() == f.origin()
+
+
+def undirected_cycle():
+    def graph(V, edges):
+        g = Graph(V)
+        for v, w in edges:
+            g.add_edge(v, w)
+        return g
+
+    assert not Cycle(graph(3, [(0, 1), (1, 2)])).has_cycle()
+    assert Cycle(graph(3, [(0, 1), (1, 2), (2, 0)])).has_cycle()
+    assert Cycle(graph(1, [(0, 0)])).has_cycle()             # self-loop
+    assert Cycle(graph(2, [(0, 1), (0, 0)])).has_cycle()     # on a root
+    assert Cycle(graph(3, [(0, 1), (1, 2), (2, 2)])).has_cycle()
+    assert Cycle(graph(2, [(0, 1), (1, 0)])).has_cycle()     # parallel
+    rnd = random.Random(5)
+    for _ in range(300):
+        V = rnd.randint(1, 8)
+        edges = [(rnd.randrange(V), rnd.randrange(V))
+                 for _ in range(rnd.randint(0, V))]
+        uf = IntUnionFind(V)
+        merged = uf.union_many([v for v, w in edges], [w for v, w in edges])
+        assert Cycle(graph(V, edges)).has_cycle() == (not all(merged))
@@ -0,0 +1,64 @@
+import random
+
+from src.bfs import BreadthFirstSearch
+from src.digraph import Digraph, DynamicDAG, SymbolDigraph
+
+
+def reverse_cache():
+    graph = Digraph.from_file('data/tinyDG.txt')
+    for g in (graph, graph.freeze()):
+        reverse = g.reverse()
+        assert reverse is g.reverse() and reverse.E == g.E
+        for v in g.vertices():
+            assert sorted(g.predecessors(v)) == \
+                sorted(u for u in g.vertices() for w in g.adj(u) if w == v)
+            assert g.indegree(v) == len(g.predecessors(v))
+    reverse, indegree = graph.reverse(), graph.indegree(0)
+    graph.add_edge(1, 0)       # both caches are dropped
+    assert graph.reverse() is not reverse and 1 in graph.predecessors(0)
+    assert graph.indegree(0) == indegree + 1
+    assert graph.indegree(0) == len(graph.predecessors(0))
+
+
+def reaches(graph, source, target):
+    return BreadthFirstSearch(graph, source).has_path(target)
+
+
+def dynamic_dag():
+    rng = random.Random(7)
+    dag = DynamicDAG(40)
+    for _ in range(400):
+        v, w = rng.randrange(40), rng.randrange(40)
+        closes_cycle = reaches(dag, w, v)
+        try:
+            dag.add_edge(v, w)
+            assert not closes_cycle
+        except ValueError:
+            assert closes_cycle and v not in dag.predecessors(w)
+        assert [dag.rank(x) for x in dag.order()] == list(range(40))
+        for x in dag.vertices():
+            assert all(dag.rank(x) < dag.rank(y) for y in dag.adj(x))
+            assert dag.indegree(x) == len(dag.predecessors(x))
+    try:
+        DynamicDAG.from_file('data/tinyDG.txt')
+        assert False
+    except ValueError:
+        pass
+
+
+class SymbolDAG(SymbolDigraph):
+    graph_class = DynamicDAG
+
+
+def dynamic_jobs():
+    jobs = SymbolDAG.from_file('data/jobs.txt', sep='/')
+    dag, E = jobs.graph, jobs.graph.E
+    assert dag.rank(jobs.int('Algorithms')) < dag.rank(jobs.int('Databases'))
+    try:
+        jobs.add_edge('Databases', 'Algorithms')
+        assert False
+    except ValueError:
+        assert dag.E == E
+    jobs.add_edge('Databases', 'Calculus')      # Calculus was ranked first
+    assert dag.rank(jobs.int('Databases')) < dag.rank(jobs.int('Calculus')) \
+        < dag.rank(jobs.int('Linear Algebra'))
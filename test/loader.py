@@ -0,0 +1,39 @@
+import os
+import tempfile
+
+from src.graph import Graph, SymbolGraph
+from src.digraph import SymbolDigraph
+from src.weighted_digraph import WeightedDigraph
+from src.loader import read_edges, save, load
+
+
+def chunked():
+    whole = read_edges('data/mediumEWD.txt')
+    for chunk_size in (1, 7, 64, 1000):
+        assert read_edges('data/mediumEWD.txt', chunk_size) == whole
+    V, tails, heads, weights = read_edges('data/tinyDAG.txt', 5)
+    assert V == 13 and len(tails) == 15 and weights is None
+
+
+def round_trip():
+    fd, fname = tempfile.mkstemp()
+    os.close(fd)
+    try:
+        for cls, data in [(Graph, 'data/tinyG.txt'),
+                          (WeightedDigraph, 'data/tinyEWD.txt')]:
+            graph = cls.from_file(data)
+            save(graph, fname)
+            loaded = load(fname)
+            assert type(loaded) is cls._frozen_class()
+            assert str(loaded) == str(graph)
+    finally:
+        os.remove(fname)
+
+
+def symbol_graphs():
+    sg = SymbolGraph.from_file('data/routes.txt')
+    assert sg.graph.V == 10 and sg.graph.E == 18
+    assert sg.name(sg.int('JFK')) == 'JFK'
+    sdg = SymbolDigraph.from_file('data/jobs.txt', sep='/')
+    assert sdg.graph.V == 13 and sdg.graph.E == 15
+    assert type(sdg.graph).__name__ == 'Digraph'
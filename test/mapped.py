@@ -0,0 +1,60 @@
+import os
+import tempfile
+
+from src.digraph import Digraph
+from src.weighted_digraph import WeightedDigraph
+from src.loader import save
+from src.mapped import open_graph, MappedDigraph, MappedWeightedDigraph
+from src.bfs import BreadthFirstSearch
+from src.sp import DijkstraSP
+from programming.wordnet.sap import SAP
+
+
+def mapped(graph):
+    fd, fname = tempfile.mkstemp()
+    os.close(fd)
+    save(graph, fname)
+    try:
+        return open_graph(fname)
+    finally:
+        os.remove(fname)        # the mapping outlives the directory entry
+
+
+def traversals():
+    graph = Digraph.from_file('data/tinyDG.txt')
+    shared = mapped(graph)
+    assert isinstance(shared, MappedDigraph)
+    assert str(shared) == str(graph)
+    for v in graph.vertices():
+        assert BreadthFirstSearch(graph, v).dist_to == \
+            BreadthFirstSearch(shared, v).dist_to
+    sap, shared_sap = SAP(graph), SAP(shared)
+    for v in graph.vertices():
+        for w in graph.vertices():
+            assert sap.length(v, w) == shared_sap.length(v, w)
+            assert sap.ancestor(v, w) == shared_sap.ancestor(v, w)
+    shared.close()
+
+
+def weighted():
+    graph = WeightedDigraph.from_file('data/tinyEWD.txt')
+    shared = mapped(graph)
+    assert isinstance(shared, MappedWeightedDigraph)
+    assert DijkstraSP(graph, 0)._dist_to == DijkstraSP(shared, 0)._dist_to
+    assert str(shared.reverse()) == str(graph.freeze().reverse())
+    shared.close()
+
+
+def close():
+    shared = mapped(Digraph.from_file('data/tinyDG.txt'))
+    targets = shared.targets
+    try:
+        shared.close()
+    except BufferError:
+        pass
+    else:
+        assert False, "closing under a live view"
+    assert list(targets[:3]) == list(shared.targets[:3])
+    del targets
+    shared.close()
+    assert shared.targets is None
@@ -0,0 +1,20 @@
+from src.marks import Marks
+
+
+def marks():
+    marks = Marks(10)
+    for v in (1, 3, 3, 9):
+        marks.add(v)
+    assert len(marks) == 3 and list(marks) == [1, 3, 9]
+    assert 3 in marks and 4 not in marks
+    marks.discard(3)
+    assert 3 not in marks
+
+
+def reset():
+    marks = Marks(4)
+    for epoch in range(600):    # wraps the byte stamps twice
+        assert len(marks) == 0
+        marks.add(epoch % 4)
+        assert epoch % 4 in marks and (epoch + 1) % 4 not in marks
+        marks.reset()
@@ -0,0 +1,67 @@
+import random
+
+from src.maxflow import FlowNetwork, FordFulkerson, ResidualGraph
+from src.maxflow import EdmondsKarp, Dinic, PushRelabel
+
+ENGINES = (EdmondsKarp, Dinic, PushRelabel)
+
+
+def feasible(network, s, t, value):
+    "capacities respected, flow conserved, `value` leaving s"
+    balance = [0.0] * network.V
+    for e in network.edges():
+        assert -1e-9 <= e.flow <= e.capacity + 1e-9
+        balance[e.origin()] -= e.flow
+        balance[e.target()] += e.flow
+    for v in network.vertices():
+        if v not in (s, t):
+            assert abs(balance[v]) < 1e-9
+    assert abs(balance[t] - value) < 1e-9
+    assert abs(balance[s] + value) < 1e-9
+
+
+def random_network(V, E, seed, integral=False):
+    rng = random.Random(seed)
+    network = FlowNetwork(V)
+    for _ in range(E):
+        v, w = rng.randrange(V), rng.randrange(V)
+        if v != w:
+            capacity = rng.randint(0, 9) if integral else rng.uniform(0, 10)
+            network.add_edge(v, w, float(capacity))
+    return network
+
+
+def tiny():
+    network = FlowNetwork.from_file('data/tinyFN.txt')
+    assert network.E == 8
+    ff = FordFulkerson(network, 0, 5)
+    assert ff.value() == 4.0
+    assert [v for v in network.vertices() if ff.in_cut(v)] == [0, 2]
+    feasible(network, 0, 5, 4.0)
+    for engine in ENGINES:
+        network = FlowNetwork.from_file('data/tinyFN.txt')
+        maxflow = engine(network, 0, 5)
+        assert maxflow.value() == 4.0
+        assert [v for v in network.vertices() if maxflow.in_cut(v)] == [0, 2]
+        assert maxflow.min_cut() == [0, 4, 5]   # 0->1, 2->3, 2->4
+        feasible(network, 0, 5, 4.0)
+
+
+def engines_agree():
+    for seed in range(30):
+        V = random.Random(seed).randint(2, 30)
+        s, t = 0, V - 1
+        network = random_network(V, 4 * V, seed, integral=seed % 2)
+        expected = FordFulkerson(network, s, t).value()
+        residual = ResidualGraph.from_network(random_network(V, 4 * V, seed,
+                                                             seed % 2))
+        for engine in ENGINES:
+            network = random_network(V, 4 * V, seed, integral=seed % 2)
+            maxflow = engine(network, s, t)
+            assert abs(maxflow.value() - expected) < 1e-9
+            feasible(network, s, t, maxflow.value())
+            assert maxflow.in_cut(s) and not maxflow.in_cut(t)
+            cut = sum(residual.capacity[2 * k] for k in maxflow.min_cut())
+            assert abs(cut - expected) < 1e-9
+            # reusing one residual graph resets it to the zero flow first
+            assert abs(engine(residual, s, t).value() - expected) < 1e-9
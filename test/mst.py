@@ -0,0 +1,61 @@
+import random
+
+from src.weighted_graph import WeightedGraph
+from src.union_find import IntUnionFind
+from src.mst import KruskalMST, LazyPrimMST, EagerPrimtMST
+
+MSTS = (KruskalMST, LazyPrimMST, EagerPrimtMST)
+
+
+def spanning_forest(graph, edges):
+    "edges are graph edges without a cycle, one tree per component"
+    components = IntUnionFind(graph.V)
+    for e in graph.edges():
+        components.union(e.v, e.w)
+    forest = IntUnionFind(graph.V)
+    for e in edges:
+        assert any(x is e for x in graph.adj(e.v))  # Edge == is by weight
+        assert forest.union(e.v, e.w)
+    assert forest.n_sets == components.n_sets
+    assert len(edges) == graph.V - components.n_sets
+
+
+def agree(graph):
+    weights = set()
+    for cls in MSTS:
+        mst = cls(graph)
+        spanning_forest(graph, mst.edges())
+        weights.add(round(mst.weight(), 9))
+    assert len(weights) == 1
+    return weights.pop()
+
+
+def tiny():
+    graph = WeightedGraph.from_file('data/tinyEWG.txt')
+    assert agree(graph) == 1.81
+    assert all(len(cls(graph).edges()) == 7 for cls in MSTS)
+
+
+def ties():
+    rnd = random.Random(3)
+    n = 12
+    graph = WeightedGraph(n * n)
+    for v in range(n * n):
+        if (v + 1) % n:
+            graph.add_edge(v, v + 1, float(rnd.choice([1, 2])))
+        if v + n < n * n:
+            graph.add_edge(v, v + n, float(rnd.choice([1, 2])))
+    agree(graph)
+    graph.add_edge(0, n * n - 1, 1.0)       # two parallel edges of the
+    graph.add_edge(0, n * n - 1, 1.0)       # same weight
+    agree(graph)
+
+
+def forest():
+    tiny = WeightedGraph.from_file('data/tinyEWG.txt')
+    graph = WeightedGraph(2 * tiny.V + 1)   # two copies and a lone vertex
+    for e in tiny.edges():
+        graph.add_edge(e.v, e.w, e.weight)
+        graph.add_edge(e.v + tiny.V, e.w + tiny.V, e.weight)
+    assert agree(graph) == 3.62
+    assert all(len(cls(graph).edges()) == 14 for cls in MSTS)
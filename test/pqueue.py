@@ -1,4 +1,4 @@
-from src.pqueue import pqueue, INVALID
+from src.pqueue import pqueue, IndexMinPQ, RadixHeap, INVALID
 
 data = [(5, 'write code'), (7, 'release product'),
         (1, 'write spec'), (3, 'create tests')]
@@ -62,3 +62,64 @@ def random_updates():
     assert len(vals) == q.size
     list(dequeues(q))
     assert not has_invalids(q)
+
+
+def index_min_pq():
+    import random
+    rnd = random.Random(5)
+    for arity in (2, 3, 4):
+        q = IndexMinPQ(50, arity)
+        keys = {}
+        for i in rnd.sample(range(50), 40):
+            keys[i] = rnd.randint(0, 20)
+            q.insert(i, keys[i])
+        for i in rnd.sample(sorted(keys), 20):
+            keys[i] = keys[i] - rnd.randint(0, 5)
+            q.decrease_key(i, keys[i])
+        for i in rnd.sample(sorted(keys), 10):
+            keys[i] = rnd.randint(0, 30)
+            q.update(keys[i], i)
+        assert len(q) == 40
+        assert q.min_index() == min(keys, key=lambda i: (keys[i], i))
+        popped = [q.del_min() for _ in range(len(q))]
+        assert popped == sorted(keys, key=lambda i: (keys[i], i))
+        assert q.empty() and not any(i in q for i in keys)
+    try:
+        q.insert(1, 5.0)
+        q.decrease_key(1, 6.0)
+    except ValueError:
+        pass
+    else:
+        assert False, "increasing a key through decrease_key"
+
+
+def radix_heap():
+    import random
+    rnd = random.Random(9)
+    q, popped, last = RadixHeap(), [], 0
+    live = []
+    for _ in range(2000):
+        if live and rnd.random() < 0.4:
+            key, value = q.pop()
+            assert key == min(live)[0] and key >= last
+            live.remove((key, value))
+            popped.append(key)
+            last = key
+        else:
+            key = last + rnd.choice([0, 1, 2, 7, 1 << 20, 1 << 40])
+            q.push(key, len(popped))
+            live.append((key, len(popped)))
+        assert len(q) == len(live)
+    try:
+        q.push(last - 1, None)
+    except ValueError:
+        pass
+    else:
+        assert False, "pushing below the last popped key"
+    q.push((1 << 64) - 1, None)
+    try:
+        q.push(1 << 64, None)
+    except ValueError:
+        pass
+    else:
+        assert False, "pushing a key of more than 64 bits"
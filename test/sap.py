@@ -0,0 +1,80 @@
+import os
+import random
+import tempfile
+
+from src.bfs import BreadthFirstSearch
+from src.digraph import Digraph
+from programming.wordnet.sap import SAP
+from programming.wordnet.ancestors import AncestorIndex
+
+
+def digraph1():
+    sap = SAP(Digraph.from_file('data/digraph1.txt'))
+    assert (sap.length(3, 11), sap.ancestor(3, 11)) == (4, 1)
+    assert (sap.length(9, 12), sap.ancestor(9, 12)) == (3, 5)
+    assert (sap.length(7, 2), sap.ancestor(7, 2)) == (4, 0)
+    assert (sap.length(1, 6), sap.ancestor(1, 6)) == (-1, -1)
+    assert (sap.length(5, 5), sap.ancestor(5, 5)) == (0, 5)
+    assert sap.hyperlength([7, 11], set([2, 12])) == 2
+    assert sap.hyperancestor([7, 11], set([2, 12])) == 10
+    assert sap.hyperlength([], [1]) == -1
+
+
+def full_search():
+    "the bounded search agrees with full BFSes from both sides"
+    rnd = random.Random(7)
+    graph = Digraph(200)
+    for _ in range(300):
+        v, w = rnd.sample(range(200), 2)
+        graph.add_edge(max(v, w), min(v, w))
+    sap = SAP(graph)
+    for _ in range(300):
+        v, w = rnd.randrange(200), rnd.randrange(200)
+        bfs_v = BreadthFirstSearch(graph, v)
+        bfs_w = BreadthFirstSearch(graph, w)
+        common = [(bfs_v.dist_to[x] + bfs_w.dist_to[x], x)
+                  for x in range(200)
+                  if bfs_v.has_path(x) and bfs_w.has_path(x)]
+        expected = min(common) if common else (-1, -1)
+        assert (sap.length(v, w), sap.ancestor(v, w)) == expected
+
+
+def caches():
+    graph = Digraph.from_file('data/digraph1.txt')
+    plain = SAP(graph)
+    cached = SAP(graph, cache_size=8)
+    joined = SAP(graph, ancestor_cache_size=4)
+    both = SAP(graph, cache_size=8, ancestor_cache_size=4)
+    queries = [(3, 11), (11, 3), (9, 12), (1, 6), ([7, 11], [2, 12]),
+               ((12, 2), set([11, 7])), (5, 5), ([], [1])] * 3
+    for v, w in queries:
+        expected = (plain.length(v, w), plain.ancestor(v, w))
+        for sap in (cached, joined, both):
+            assert (sap.length(v, w), sap.ancestor(v, w)) == expected
+    # one miss per unordered pair, every other lookup a hit
+    assert (cached.cache.misses, len(cached.cache)) == (6, 6)
+    assert cached.cache.hits == 2 * len(queries) - 6
+    assert joined.ancestors(11) == {11: 0, 10: 1, 5: 2, 1: 3, 0: 4}
+
+
+def ancestor_index():
+    rnd = random.Random(3)
+    graph = Digraph(100)
+    for _ in range(150):
+        v, w = rnd.sample(range(100), 2)
+        graph.add_edge(max(v, w), min(v, w))
+    fd, fname = tempfile.mkstemp()
+    os.close(fd)
+    try:
+        AncestorIndex.build(graph).save(fname)
+        index = AncestorIndex.load(fname)
+    finally:
+        os.remove(fname)
+    sap = SAP(graph)
+    queries = [(rnd.randrange(100), rnd.randrange(100)) for _ in range(200)]
+    queries += [(rnd.sample(range(100), 3), rnd.sample(range(100), 2))
+                for _ in range(50)]
+    queries += [([], [1]), ([4], 4)]
+    for v, w in queries:
+        assert (index.length(v, w), index.ancestor(v, w)) == \
+            (sap.length(v, w), sap.ancestor(v, w))
@@ -0,0 +1,158 @@
+import random
+from itertools import product
+
+from src.weighted_digraph import WeightedDigraph
+from src.marks import INF
+from src.sp import BellmanFord, DijkstraSP, SPWorkspace, shortest_path
+from src.sp import BidirectionalDijkstraSP
+from src.sp import DialSP, RadixHeapSP, DeltaSteppingSP, engine_for
+
+
+def optimal(graph, sp):
+    for v in graph.vertices():
+        for e in graph.adj(v):
+            assert sp.dist_to(e.target()) <= sp.dist_to(v) + e.weight + 1e-9
+
+
+def bellman_ford():
+    graph = WeightedDigraph.from_file('data/tinyEWD.txt')
+    dijkstra = DijkstraSP(graph, 0)
+    for slf, lll in product((False, True), repeat=2):
+        sp = BellmanFord(graph, 0, slf=slf, lll=lll)
+        assert not sp.has_negative_cycle()
+        assert all(abs(sp.dist_to(v) - dijkstra.dist_to(v)) < 1e-9
+                   for v in graph.vertices())
+        negative = WeightedDigraph.from_file('data/tinyEWDn.txt')
+        sp = BellmanFord(negative, 0, slf=slf, lll=lll)
+        assert not sp.has_negative_cycle()
+        optimal(negative, sp)
+
+
+def negative_cycle():
+    for slf, lll in product((False, True), repeat=2):
+        sp = BellmanFord(WeightedDigraph.from_file('data/tinyEWDnc.txt'), 0,
+                         slf=slf, lll=lll)
+        cycle = sp.negative_cycle()
+        assert sum(e.weight for e in cycle) < 0
+        for e, f in zip(cycle, cycle[1:] + cycle[:1]):
+            assert f.target() == e.origin()
+    V = 100000                          # a long ring, no recursion involved
+    graph = WeightedDigraph(V)
+    for v in range(V):
+        graph.add_edge(v, (v + 1) % V, 1.0 if v else -V)
+    assert len(BellmanFord(graph, 0).negative_cycle()) == V
+
+
+def point_to_point():
+    graph = WeightedDigraph.from_file('data/tinyEWD.txt')
+    trees = [DijkstraSP(graph, s) for s in graph.vertices()]
+    exact = lambda v, t: trees[v].dist_to(t)
+    workspace = SPWorkspace(graph)
+    for s, t in product(graph.vertices(), repeat=2):
+        path = trees[s].path_to(t)
+        assert None not in path
+        for heuristic in (None, exact):
+            dist, edges = shortest_path(graph, s, t, heuristic, workspace)
+            assert abs(dist - trees[s].dist_to(t)) < 1e-9
+            assert abs(sum(e.weight for e in edges) - dist) < 1e-9
+            assert [e.origin() for e in edges] + [t] == \
+                [s] + [e.target() for e in edges]
+    isolated = WeightedDigraph(2)
+    try:
+        shortest_path(isolated, 0, 1, workspace=workspace)
+        assert False
+    except ValueError:
+        pass
+    assert shortest_path(isolated, 0, 1) == (INF, None)
+    assert shortest_path(isolated, 1, 1) == (0.0, [])
+
+
+def bidirectional():
+    graph = WeightedDigraph.from_file('data/tinyEWD.txt')
+    for g in (graph, graph.freeze()):
+        workspaces = BidirectionalDijkstraSP.workspaces(g)
+        for s in g.vertices():
+            tree = DijkstraSP(g, s)
+            for t in g.vertices():
+                sp = BidirectionalDijkstraSP(g, s, t, workspaces)
+                assert abs(sp.dist_to(t) - tree.dist_to(t)) < 1e-9
+                path = sp.path_to(t)
+                assert abs(sum(e.weight for e in path) - tree.dist_to(t)) \
+                    < 1e-9
+                assert [e.origin() for e in path] + [t] == \
+                    [s] + [e.target() for e in path]
+    assert graph.reverse() is graph.reverse()
+    graph.add_edge(7, 0, 0.01)          # drops the cached reverse
+    assert BidirectionalDijkstraSP(graph, 7, 0).dist_to(0) == 0.01
+    sp = BidirectionalDijkstraSP(WeightedDigraph(2), 0, 1)
+    assert not sp.has_path_to(1) and sp.path_to(1) == []
+
+
+def integer_engines():
+    rnd = random.Random(4)
+    V = 300
+    graph = WeightedDigraph(V)
+    for _ in range(1500):
+        graph.add_edge(rnd.randrange(V), rnd.randrange(V),
+                       float(rnd.choice([0, 1, 2, 3, 10, 40])))
+    for s in (0, 17):
+        tree = DijkstraSP(graph, s)
+        for sp in (DialSP(graph, s), RadixHeapSP(graph, s),
+                   DeltaSteppingSP(graph, s), DeltaSteppingSP(graph, s, 0.5)):
+            for t in graph.vertices():
+                assert sp.dist_to(t) == tree.dist_to(t)
+                path = sp.path_to(t)
+                assert sum(e.weight for e in path) == sp.dist_to(t) or \
+                    not sp.has_path_to(t)
+    graph = WeightedDigraph.from_file('data/mediumEWD.txt')
+    tree, sp = DijkstraSP(graph, 0), DeltaSteppingSP(graph, 0)
+    assert all(abs(sp.dist_to(t) - tree.dist_to(t)) < 1e-9
+               for t in graph.vertices())
+    try:
+        DialSP(graph, 0)
+        assert False
+    except ValueError:
+        pass
+
+
+def radix_exact():
+    big = float(1 << 53)
+    graph = WeightedDigraph(3)
+    graph.add_edge(0, 1, big)
+    graph.add_edge(1, 2, 1.0)
+    graph.add_edge(0, 2, big + 2)
+    sp = RadixHeapSP(graph, 0)
+    assert sp.dist_to(2) == (1 << 53) + 1       # a double rounds it off
+    assert [e.origin() for e in sp.path_to(2)] == [0, 1]
+    graph.add_edge(2, 1, float(1 << 63))
+    graph.add_edge(1, 0, float(1 << 63))
+    sp = RadixHeapSP(graph, 1)
+    assert sp.dist_to(0) == 1 << 63
+    try:
+        RadixHeapSP(graph, 2)                   # 2->1->0 is 2^64
+    except ValueError:
+        pass
+    else:
+        assert False, "a distance of 2^64"
+
+
+def delta_default():
+    for weights in ((0.0, 0.0, 0.0), (1, 0, 0)):
+        graph = WeightedDigraph(3)
+        for (v, w), weight in zip([(0, 1), (1, 2), (0, 2)], weights):
+            graph.add_edge(v, w, weight)
+        sp, tree = DeltaSteppingSP(graph, 0), DijkstraSP(graph, 0)
+        assert sp.delta > 0
+        assert [sp.dist_to(v) for v in range(3)] == \
+            [tree.dist_to(v) for v in range(3)]
+        assert sp.dist_to(2) == 0 and len(sp.path_to(2)) == 1
+
+
+def engine_selection():
+    assert engine_for(None, (-1.0, 5.0, True)) is BellmanFord
+    assert engine_for(None, (0.0, 255.0, True)) is DialSP
+    assert engine_for(None, (1.0, 1e6, True)) is RadixHeapSP
+    assert engine_for(None, (0.5, 3.5, False)) is DeltaSteppingSP
+    assert engine_for(None, (1e-6, 3.5, False)) is DijkstraSP
+    graph = WeightedDigraph.from_file('data/tinyEWD.txt')
+    assert engine_for(graph) is DeltaSteppingSP
@@ -1,4 +1,4 @@
-from src.union_find import UnionFind
+from src.union_find import UnionFind, IntUnionFind
 
 edges = [
     ["0", "1"],
@@ -21,3 +21,22 @@ def union_find():
     assert uf.find("4") != uf.find("5")
     assert uf.find("5") == uf.find("6")
     assert uf.find("7") == uf.find("0")
+
+
+def int_union_find():
+    uf = IntUnionFind(8)
+    assert uf.union(0, 1) and uf.union(2, 1) and not uf.union(0, 2)
+    assert uf.connected(0, 2) and not uf.connected(0, 3)
+    assert uf.size(2) == 3 and uf.n_sets == 6
+    merged = uf.union_many([3, 4, 3, 5, 6], [4, 5, 5, 0, 7], n_sets=3)
+    assert list(merged) == [1, 1, 0, 1, 0] and uf.n_sets == 3
+    roots = uf.find_many(range(8))
+    assert len(set(roots[:6])) == 1 and roots[6] == 6 and roots[7] == 7
+
+
+def long_chain():
+    N = 100000
+    uf = IntUnionFind(N)
+    for x in range(1, N):       # union by size keeps the trees flat,
+        uf.parents[x] = x - 1   # so build a degenerate chain by hand
+    assert uf.find(N - 1) == 0 and uf.find(N - 1) == 0
@@ -0,0 +1,52 @@
+import os
+import shutil
+import tempfile
+
+from src.digraph import Digraph
+from programming.wordnet.wdgraph import WordNet
+from programming.wordnet.outcast import Outcast, batch
+
+
+def files(tmp):
+    "a WordNet over data/digraph1.txt, noun 'nv' naming synset v"
+    graph = Digraph.from_file('data/digraph1.txt')
+    synsets = os.path.join(tmp, 'synsets.txt')
+    hypernyms = os.path.join(tmp, 'hypernyms.txt')
+    with open(synsets, 'w') as f:
+        for v in graph.vertices():
+            nouns = 'n%d' % v + (' both' if v in (7, 12) else '')
+            f.write('%d,%s,gloss of %d\n' % (v, nouns, v))
+    with open(hypernyms, 'w') as f:
+        for v in graph.vertices():
+            f.write(','.join(str(x) for x in [v] + list(graph.adj(v))) + '\n')
+    return synsets, hypernyms
+
+
+def distance_matrix():
+    tmp = tempfile.mkdtemp()
+    try:
+        wordnet = WordNet(*files(tmp))
+        nouns = ['n3', 'n11', 'both', 'n1', 'n6', 'missing']
+        dists = wordnet.distance_matrix(nouns)
+        for i, a in enumerate(nouns):
+            for j, b in enumerate(nouns):
+                if a == b:
+                    assert dists[i][j] == (-1 if a == 'missing' else 0)
+                else:
+                    assert dists[i][j] == wordnet.dist(a, b)
+        assert dists[0][1] == 4 and dists[2][1] == 2
+        assert Outcast(wordnet).outcast(['n3', 'n4', 'n5', 'n12']) == 'n12'
+    finally:
+        shutil.rmtree(tmp)
+
+
+def outcast_batch():
+    tmp = tempfile.mkdtemp()
+    try:
+        synsets, hypernyms = files(tmp)
+        queries = os.path.join(tmp, 'queries.txt')
+        with open(queries, 'w') as f:
+            f.write('n3 n4 n5 n12\n\nn11 n12 n10 n2\n')
+        assert batch(queries, synsets, hypernyms, 2) == ['n12', 'n2']
+    finally:
+        shutil.rmtree(tmp)